@@ -0,0 +1,298 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import copy
+import io
+import os
+import re
+import tarfile
+import time
+from collections import Counter
+from contextlib import contextmanager
+from unittest.mock import patch
+
+from docker.errors import ImageNotFound
+from wadebug.wa_actions import docker_utils
+
+
+"""
+Synthetic Docker hosts for benchmarks.
+
+FakeDockerEnvironment stands in for docker.from_env() with a fleet of WhatsApp
+Business API containers and images. Like the Docker SDK, every client builds new
+container objects from the daemon's answers, and every request goes through
+the client's response hooks. Requests are counted by kind in `calls`.
+"""
+
+WEB_REPOSITORY = "docker.whatsapp.biz/web"
+COREAPP_REPOSITORY = "docker.whatsapp.biz/coreapp"
+MYSQL_REPOSITORY = "mysql"
+OTHER_REPOSITORY = "nginx"
+IMAGE_REPOSITORIES = (
+    WEB_REPOSITORY,
+    COREAPP_REPOSITORY,
+    MYSQL_REPOSITORY,
+    OTHER_REPOSITORY,
+)
+WA_VERSION = "v2.31.4"
+MYSQL_PASSWORD = "mysql_password"
+CONTAINER_LOG_LINE = b"2020-01-01 00:00:00 wa-service INFO message\n"
+CONTAINER_LOG_LINES = 200
+# requests to the daemon made by one Container.exec_run: create, start, inspect
+EXEC_RUN_REQUESTS = 3
+
+
+class FakeDockerEnvironment(object):
+    def __init__(self, num_containers, num_images=None, num_other_containers=0):
+        """num_other_containers are added, of unrelated images, e.g. on shared hosts."""
+        self.calls = Counter()
+        # keyword arguments of each docker.from_env() call
+        self.clients_created = []
+        self.containers = [build_container_spec(i) for i in range(num_containers)]
+        self.images = [
+            build_image_spec(i)
+            for i in range(
+                max(len(IMAGE_REPOSITORIES), num_images or 2 * num_containers)
+            )
+        ]
+        for i in range(num_other_containers):
+            image = build_other_image_spec(len(self.images))
+            self.images.append(image)
+            self.containers.append(
+                build_container_spec(len(self.containers), image=image)
+            )
+
+    def from_env(self, *args, **kwargs):
+        self.clients_created.append(kwargs)
+        return FakeDockerClient(self)
+
+    @contextmanager
+    def patch(self):
+        """Patch docker.from_env() to return clients of this environment.
+
+        The Docker client of the process is created again within, and after.
+        """
+        docker_utils.forget_docker_client()
+        try:
+            with patch("docker.from_env", self.from_env):
+                yield
+        finally:
+            docker_utils.forget_docker_client()
+
+    def count(self, client, request, times=1):
+        self.calls[request] += times
+        for _ in range(times):
+            for hook in client.api.hooks["response"]:
+                hook(None)
+
+    @property
+    def total_calls(self):
+        return sum(self.calls.values())
+
+
+def build_container_spec(index, image=None):
+    if image is not None:
+        repository = image["RepoTags"][0].rsplit(":", 1)[0]
+        image_id = image["Id"]
+    elif index == 0:
+        repository = MYSQL_REPOSITORY
+    elif index % 10 == 9:
+        repository = OTHER_REPOSITORY
+    elif index % 2:
+        repository = COREAPP_REPOSITORY
+    else:
+        repository = WEB_REPOSITORY
+    if image is None:
+        # the first images are the ones of containers, see build_image_spec
+        image_id = get_image_id(IMAGE_REPOSITORIES.index(repository))
+
+    env = [
+        "WA_DB_ENGINE=MYSQL",
+        "WA_DB_HOSTNAME=mysql",
+        "WA_DB_PORT=3306",
+        "WA_DB_USERNAME=root",
+        "WA_DB_PASSWORD={}".format(MYSQL_PASSWORD),
+        "MYSQL_ROOT_PASSWORD={}".format(MYSQL_PASSWORD),
+        "PATH=/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin",
+    ]
+    return {
+        "Id": "{:064x}".format(index),
+        "Name": "/{}_{}".format(repository.rsplit("/", 1)[-1], index),
+        "Image": image_id,
+        # every 20th container is stopped
+        "State": {"Status": "exited" if index % 20 == 19 else "running"},
+        "Config": {
+            "Env": env,
+            "Labels": {},
+            "Image": "{}:{}".format(repository, WA_VERSION),
+        },
+        "HostConfig": {
+            "PortBindings": {"443/tcp": [{"HostIp": "", "HostPort": "9090"}]}
+        },
+    }
+
+
+def build_image_spec(index):
+    repository = IMAGE_REPOSITORIES[index % len(IMAGE_REPOSITORIES)]
+    if index < len(IMAGE_REPOSITORIES):
+        tag = WA_VERSION
+    else:
+        tag = "v2.{}.{}".format(21 + index % 20, index)
+    return {
+        "Id": get_image_id(index),
+        "RepoTags": ["{}:{}".format(repository, tag)],
+        "RepoDigests": ["{}@sha256:{:064x}".format(repository, index)],
+        "Labels": {},
+        "Created": int(time.time()),
+    }
+
+
+def build_other_image_spec(index):
+    repository = "registry.example.com/team{}/service".format(index)
+    return {
+        "Id": get_image_id(index),
+        "RepoTags": ["{}:latest".format(repository)],
+        "RepoDigests": ["{}@sha256:{:064x}".format(repository, index)],
+        "Labels": {},
+        "Created": int(time.time()),
+    }
+
+
+def get_image_id(index):
+    return "sha256:{:064x}".format(index)
+
+
+class FakeDockerClient(object):
+    def __init__(self, environment):
+        self.environment = environment
+        self.api = FakeAPIClient(self)
+        self.containers = FakeContainerCollection(self)
+
+
+class FakeAPIClient(object):
+    def __init__(self, client):
+        self.client = client
+        self.hooks = {"response": []}
+        self.headers = {}
+
+    def inspect_container(self, container_id):
+        self.client.environment.count(self.client, "inspect_container")
+        return copy.deepcopy(find_container_spec(self.client, container_id))
+
+    def images(self, filters=None):
+        self.client.environment.count(self.client, "images")
+        references = (filters or {}).get("reference")
+        return [
+            copy.deepcopy(spec)
+            for spec in self.client.environment.images
+            if references is None or matches_references(spec, references)
+        ]
+
+    def diff(self, container_id):
+        self.client.environment.count(self.client, "diff")
+        return [
+            {"Kind": 1, "Path": "/usr/local/waent/logs/wa-service-0-crash.log"},
+            {"Kind": 0, "Path": "/usr/local/waent/logs/wa-service.log"},
+        ]
+
+
+def find_container_spec(client, container_id):
+    for spec in client.environment.containers:
+        if spec["Id"].startswith(container_id):
+            return spec
+    raise KeyError(container_id)
+
+
+class FakeContainerCollection(object):
+    def __init__(self, client):
+        self.client = client
+
+    def list(self, all=False, filters=None, **kwargs):
+        filters = filters or {}
+        specs = [
+            spec
+            for spec in self.client.environment.containers
+            if (all or spec["State"]["Status"] == "running")
+            and ("ancestor" not in filters or spec["Image"] in filters["ancestor"])
+            and ("label" not in filters or filters["label"] in spec["Config"]["Labels"])
+        ]
+        self.client.environment.count(self.client, "containers_list")
+        # the SDK inspects every container it lists to build its attrs
+        self.client.environment.count(self.client, "inspect_container", len(specs))
+        return [FakeContainer(self.client, copy.deepcopy(spec)) for spec in specs]
+
+
+def matches_references(image_spec, references):
+    """Like the "reference" filter of the daemon, on repositories and repo tags."""
+    for repo_tag in image_spec["RepoTags"]:
+        repository = repo_tag.rsplit(":", 1)[0]
+        for reference in references:
+            # "*" matches any characters but "/", like path.Match in Go
+            pattern = "[^/]*".join(re.escape(part) for part in reference.split("*"))
+            if re.fullmatch(pattern, repo_tag) or re.fullmatch(pattern, repository):
+                return True
+    return False
+
+
+class FakeImage(object):
+    def __init__(self, attrs):
+        self.attrs = attrs
+
+
+class FakeContainer(object):
+    def __init__(self, client, attrs):
+        self.client = client
+        self.attrs = attrs
+
+    @property
+    def image(self):
+        # like the SDK, every access requests the image from the daemon
+        self.client.environment.count(self.client, "images_get")
+        for spec in self.client.environment.images:
+            if spec["Id"] == self.attrs["Image"]:
+                return FakeImage(copy.deepcopy(spec))
+        raise ImageNotFound("No such image: {}".format(self.attrs["Image"]))
+
+    @property
+    def id(self):
+        return self.attrs["Id"]
+
+    @property
+    def short_id(self):
+        return self.id[:12]
+
+    @property
+    def name(self):
+        return self.attrs["Name"].lstrip("/")
+
+    @property
+    def status(self):
+        return self.attrs["State"]["Status"]
+
+    def exec_run(self, cmd, **kwargs):
+        self.client.environment.count(self.client, "exec_run", EXEC_RUN_REQUESTS)
+        if cmd[0] == "curl":
+            return 0, b"200:0.05"
+        return 0, b""
+
+    def logs(self, **kwargs):
+        self.client.environment.count(self.client, "logs")
+        return CONTAINER_LOG_LINE * CONTAINER_LOG_LINES
+
+    def get_archive(self, path):
+        self.client.environment.count(self.client, "get_archive")
+        tar_data = io.BytesIO()
+        with tarfile.open(fileobj=tar_data, mode="w") as tar:
+            content = CONTAINER_LOG_LINE * CONTAINER_LOG_LINES
+            tarinfo = tarfile.TarInfo(name=os.path.basename(path))
+            tarinfo.size = len(content)
+            tar.addfile(tarinfo, io.BytesIO(content))
+        return iter([tar_data.getvalue()]), {"name": os.path.basename(path)}
+
+    def put_archive(self, path, data):
+        self.client.environment.count(self.client, "put_archive")
+        return True
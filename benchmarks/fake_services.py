@@ -0,0 +1,98 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import json
+import re
+from contextlib import ExitStack
+from unittest.mock import patch
+
+
+"""
+Instant stand-ins for the WhatsApp Business API and MySQL, so that benchmarks
+of actions only measure wadebug itself and its Docker calls.
+"""
+
+MYSQL_VERSION = "5.7.30"
+WEBHOOK_URL = "https://example.com/webhook"
+
+CONFIG = {
+    "webapp": {
+        "baseUrl": "https://localhost:9090",
+        "user": "admin",
+        "password": "password",
+    },
+    "db": {"host": "mysql", "port": 3306, "user": "root", "password": "password"},
+}
+
+API_RESPONSES = {
+    "/v1/users/login": (200, {"users": [{"token": "token"}]}),
+    "/v1/settings/application": (
+        200,
+        {"settings": {"application": {"webhooks": {"url": WEBHOOK_URL}}}},
+    ),
+    "/v1/certificates/webhooks/ca": (
+        404,
+        {"errors": [{"code": 1006, "details": "No certificate uploaded"}]},
+    ),
+    "/v1/support": (200, {"support": {"debug_info": "debug info"}}),
+}
+
+
+class FakeResponse(object):
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self.payload = payload
+        self.content = json.dumps(payload).encode()
+
+    def json(self):
+        return self.payload
+
+
+def fake_api_request(url, **kwargs):
+    for endpoint, (status_code, payload) in API_RESPONSES.items():
+        if url.endswith(endpoint):
+            return FakeResponse(status_code, payload)
+    return FakeResponse(404, {"errors": [{"code": 1006, "details": url}]})
+
+
+class FakeCursor(object):
+    def __init__(self):
+        self.result = None
+
+    def execute(self, sql, args=None):
+        if sql == "SELECT version()":
+            self.result = {"version()": MYSQL_VERSION}
+        else:
+            # privileges check: SELECT <privilege>,<privilege> FROM mysql.user
+            columns = re.match(r"SELECT (.*) FROM", sql).group(1).split(",")
+            self.result = {column: "Y" for column in columns}
+
+    def fetchone(self):
+        return self.result
+
+
+class FakeConnection(object):
+    def cursor(self):
+        return FakeCursor()
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def patch_services():
+    """Patch HTTP requests and MySQL connections with instant fakes."""
+    stack = ExitStack()
+    stack.enter_context(patch("requests.get", fake_api_request))
+    stack.enter_context(patch("requests.post", fake_api_request))
+    stack.enter_context(patch("pymysql.connect", lambda **kwargs: FakeConnection()))
+    return stack
@@ -0,0 +1,158 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import json
+import subprocess
+import sys
+from collections import namedtuple
+
+import click
+
+"""
+Start-up time of wadebug commands, measured with `python -X importtime`.
+
+    $ python -m benchmarks.import_time --command ls
+
+Each command runs in a fresh interpreter, through the `wadebug` entry point
+(cli.safe_main) of a released version. The time reported is the one spent
+importing modules, by wadebug.cli and by the command itself, which is most of
+the start-up of commands that do not run actions.
+"""
+
+COMMANDS = ("--help", "--version", "ls")
+# version reported by wadebug, like an installed release and unlike a checkout
+RELEASED_VERSION = "0.1.5"
+# modules that take long to import, only actions talking to a backend need them
+HEAVY_MODULES = (
+    "distutils",
+    "docker",
+    "http.server",
+    "pkg_resources",
+    "pydash",
+    "pymysql",
+    "requests",
+    "yaml",
+)
+TOP_MODULES = 15
+IMPORTTIME_PREFIX = "import time:"
+IMPORTTIME_PREFIX_LENGTH = len(IMPORTTIME_PREFIX)
+
+ImportTime = namedtuple("ImportTime", ["module", "self_us", "cumulative_us"])
+CommandImportTimes = namedtuple(
+    "CommandImportTimes", ["command", "total_ms", "imports"]
+)
+
+RUN_COMMAND = """
+import sys
+from wadebug import cli
+cli.get_version = lambda: sys.argv[1]
+sys.argv = ["wadebug"] + sys.argv[2:]
+try:
+    cli.safe_main()
+except SystemExit:
+    pass
+"""
+
+
+def measure_command(command):
+    """Imports done by `wadebug <command>` in a fresh interpreter."""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", RUN_COMMAND, RELEASED_VERSION]
+        + command.split(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    imports = parse_importtime(process.stderr)
+    # imports done by the interpreter itself are at the start, before wadebug
+    first = next(i for i, imp in enumerate(imports) if imp.module.startswith("wadebug"))
+    wadebug_imports = imports[first:]
+    return CommandImportTimes(
+        command=command,
+        total_ms=round(sum(imp.self_us for imp in wadebug_imports) / 1000, 1),
+        imports=wadebug_imports,
+    )
+
+
+def parse_importtime(output):
+    """ImportTime of each line of `-X importtime` output, in import order."""
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith(IMPORTTIME_PREFIX):
+            continue
+        self_us, cumulative_us, module = line[IMPORTTIME_PREFIX_LENGTH:].split("|")
+        if not self_us.strip().isdigit():
+            continue  # header
+        imports.append(ImportTime(module.strip(), int(self_us), int(cumulative_us)))
+    return imports
+
+
+def measure(commands=COMMANDS, repeat=1):
+    """Fastest of `repeat` measures of each command."""
+    for command in commands:
+        yield min(
+            (measure_command(command) for _ in range(repeat)),
+            key=lambda times: times.total_ms,
+        )
+
+
+def print_report(times):
+    click.secho(
+        "wadebug {}: {}ms importing {} modules".format(
+            times.command, times.total_ms, len(times.imports)
+        ),
+        bold=True,
+    )
+    slowest = sorted(times.imports, key=lambda imp: imp.self_us, reverse=True)
+    for imp in slowest[:TOP_MODULES]:
+        click.echo("{:>10.1f}ms  {}".format(imp.self_us / 1000, imp.module))
+    heavy = [imp.module for imp in times.imports if imp.module in HEAVY_MODULES]
+    if heavy:
+        click.secho("Heavy modules imported: {}".format(", ".join(heavy)), fg="yellow")
+    click.echo()
+
+
+@click.command()
+@click.option(
+    "--command",
+    "commands",
+    multiple=True,
+    help="Arguments of wadebug to measure, repeat for more (default: {}).".format(
+        ", ".join(COMMANDS)
+    ),
+)
+@click.option(
+    "--repeat",
+    type=click.IntRange(min=1),
+    default=5,
+    help="Runs of each command, the fastest one is reported.",
+)
+@click.option("--json", "json_output", is_flag=True, help="Output results as json.")
+def main(commands, repeat, json_output):
+    """Measure the time wadebug commands spend importing modules."""
+    results = measure(commands or COMMANDS, repeat)
+    if json_output:
+        click.echo(
+            json.dumps(
+                [
+                    {
+                        "command": times.command,
+                        "total_ms": times.total_ms,
+                        "modules": len(times.imports),
+                    }
+                    for times in results
+                ]
+            )
+        )
+    else:
+        for times in results:
+            print_report(times)
+
+
+if __name__ == "__main__":
+    main()
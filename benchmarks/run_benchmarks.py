@@ -0,0 +1,169 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from collections import namedtuple
+from unittest.mock import patch
+
+import click
+from benchmarks.fake_docker import FakeDockerEnvironment
+from benchmarks.fake_services import CONFIG, patch_services
+from wadebug import wa_actions
+from wadebug.wa_actions import log_utils
+
+
+"""
+Benchmarks of every action and of log collection on synthetic Docker hosts.
+
+    $ python -m benchmarks.run_benchmarks --sizes 1 --sizes 1000
+
+For each fleet size, each scenario reports its wall time, the requests it sent
+to the Docker daemon (exec_run included, counted separately too) and its peak
+memory allocated in Python. HTTP and MySQL answer instantly.
+"""
+
+FLEET_SIZES = (1, 10, 100, 1000)
+# not a real daemon: coroutines use the Docker SDK too (see async_docker_utils)
+FAKE_DOCKER_HOST = "tcp://127.0.0.1:2375"
+
+BenchmarkResult = namedtuple(
+    "BenchmarkResult",
+    [
+        "scenario",
+        "containers",
+        "wall_ms",
+        "docker_requests",
+        "exec_runs",
+        "peak_memory_kb",
+    ],
+)
+
+
+def get_scenarios():
+    """Dict of scenario name -> function running it once."""
+    scenarios = {}
+    for act in sorted(wa_actions.get_all_actions(), key=lambda a: a.user_facing_name):
+        scenarios[act.user_facing_name] = make_action_scenario(act)
+    scenarios["get_logs"] = run_get_logs
+    return scenarios
+
+
+def make_action_scenario(act):
+    def run_action():
+        for res in wa_actions.run_actions([act], CONFIG):
+            if res.result == "wadebug_error":
+                raise Exception(
+                    "{} failed:\n{}".format(act.user_facing_name, res.details)
+                )
+
+    return run_action
+
+
+def run_get_logs():
+    logs_start_dt, logs_end_dt = log_utils.get_container_logs_start_end_datetimes(
+        None,
+        None,
+        log_utils.CONTAINER_LOG_TIMEZONE,
+        log_utils.CONTAINER_LOG_DURATION_HOURS,
+    )
+    log_utils.check_access()
+    log_utils.get_logs(logs_start_dt, logs_end_dt)
+
+
+def run_benchmarks(sizes=FLEET_SIZES, repeat=1):
+    """Run all scenarios on a fake Docker host of each size, yielding results."""
+    scenarios = get_scenarios()
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir, patch_services(), patch.dict(
+        os.environ, {"DOCKER_HOST": FAKE_DOCKER_HOST}
+    ):
+        # log collection writes to the current directory
+        os.chdir(workdir)
+        try:
+            for size in sizes:
+                environment = FakeDockerEnvironment(size)
+                with environment.patch():
+                    for name, scenario in scenarios.items():
+                        yield benchmark(name, scenario, environment, size, repeat)
+        finally:
+            os.chdir(cwd)
+
+
+def benchmark(name, scenario, environment, size, repeat=1):
+    """Best wall time of `repeat` runs, then calls and peak memory of one more.
+
+    Memory is measured on a separate run since tracing allocations slows the
+    code down.
+    """
+    wall_times = []
+    for _ in range(repeat):
+        environment.calls.clear()
+        start = time.perf_counter()
+        scenario()
+        wall_times.append(time.perf_counter() - start)
+    calls = dict(environment.calls)
+
+    tracemalloc.start()
+    try:
+        scenario()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return BenchmarkResult(
+        scenario=name,
+        containers=size,
+        wall_ms=round(min(wall_times) * 1000, 1),
+        docker_requests=sum(calls.values()),
+        exec_runs=calls.get("exec_run", 0),
+        peak_memory_kb=round(peak_memory / 1024),
+    )
+
+
+def print_table(results):
+    row_format = "{:<26} {:>10} {:>10} {:>10} {:>10} {:>10}"
+    click.secho(
+        row_format.format(
+            "Scenario", "Containers", "Wall ms", "Requests", "exec_run", "Peak KB"
+        ),
+        bold=True,
+    )
+    for result in results:
+        click.echo(row_format.format(*result))
+
+
+@click.command()
+@click.option(
+    "--sizes",
+    type=click.IntRange(min=1),
+    multiple=True,
+    help="Number of containers of a fake host, repeat for more (default: {}).".format(
+        ", ".join(str(s) for s in FLEET_SIZES)
+    ),
+)
+@click.option(
+    "--repeat",
+    type=click.IntRange(min=1),
+    default=3,
+    help="Runs of each scenario, the fastest one is reported.",
+)
+@click.option("--json", "json_output", is_flag=True, help="Output results as json.")
+def main(sizes, repeat, json_output):
+    """Benchmark actions and log collection on fake Docker hosts."""
+    results = run_benchmarks(sizes or FLEET_SIZES, repeat)
+    if json_output:
+        click.echo(json.dumps([r._asdict() for r in results]))
+    else:
+        print_table(results)
+
+
+if __name__ == "__main__":
+    main()
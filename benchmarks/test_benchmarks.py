@@ -0,0 +1,77 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import os
+import unittest
+from unittest.mock import patch
+
+from benchmarks import run_benchmarks
+from benchmarks.fake_docker import FakeDockerEnvironment
+from benchmarks.fake_services import CONFIG, patch_services
+from wadebug import wa_actions
+from wadebug.wa_actions import docker_utils, sessions
+
+
+class TestFakeDockerEnvironment(unittest.TestCase):
+    def test_should_count_requests_like_the_docker_sdk(self):
+        environment = FakeDockerEnvironment(10)
+
+        with environment.patch():
+            containers = docker_utils.get_all_containers()
+
+        assert len(containers) == 10
+        # one request to list containers, then one to inspect each of them
+        assert environment.calls == {"containers_list": 1, "inspect_container": 10}
+
+
+class TestDockerInventory(unittest.TestCase):
+    def test_should_list_containers_and_images_once_per_run(self):
+        environment = FakeDockerEnvironment(10)
+
+        with patch_services(), environment.patch(), patch.dict(
+            os.environ, {"DOCKER_HOST": run_benchmarks.FAKE_DOCKER_HOST}
+        ):
+            results = list(
+                wa_actions.run_actions(wa_actions.get_all_actions(), CONFIG, jobs=4)
+            )
+
+        assert "wadebug_error" not in [res.result for res in results]
+        # containers of WhatsApp images, then labeled ones
+        assert environment.calls["containers_list"] == 2
+        # all but the container of an unrelated image
+        assert environment.calls["inspect_container"] == 9
+        assert environment.calls["images"] == 1
+        assert environment.calls["images_get"] == 0
+        # one client, and one pool of connections, for all actions
+        assert len(environment.clients_created) == 1
+
+    def test_should_not_inspect_unrelated_containers(self):
+        environment = FakeDockerEnvironment(10, num_other_containers=500)
+
+        with environment.patch():
+            run_context = sessions.new_run_context()
+            wa_containers = run_context.run(docker_utils.get_wa_containers)
+            expiration_map = run_context.run(docker_utils.get_expiration_map)
+
+        assert len(wa_containers) == 9
+        assert expiration_map
+        assert environment.calls["inspect_container"] == 9
+        assert environment.calls["images_get"] == 0
+
+
+class TestRunBenchmarks(unittest.TestCase):
+    def test_docker_requests_should_grow_linearly_with_containers(self):
+        results = list(run_benchmarks.run_benchmarks(sizes=(10, 100)))
+
+        requests = {(r.scenario, r.containers): r.docker_requests for r in results}
+        for scenario in run_benchmarks.get_scenarios():
+            # 10 times the containers, allowing for fixed requests of each run
+            assert requests[scenario, 100] <= 10 * requests[scenario, 10] + 50, (
+                "{} made {} Docker requests with 10 containers and {} with 100".format(
+                    scenario, requests[scenario, 10], requests[scenario, 100]
+                )
+            )
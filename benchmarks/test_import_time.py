@@ -0,0 +1,55 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import os
+import unittest
+
+from benchmarks import import_time
+
+
+# milliseconds `wadebug ls` or `wadebug --help` may spend importing modules.
+# They took about 600ms when every dependency was imported up front, and
+# about 170ms once backends were imported on first use.
+IMPORT_TIME_BUDGET_MS = 350
+# wall time depends on the machine and on coverage tracing, the budget is
+# only checked when this is set, e.g. on a quiet machine before a release
+TIMING_BENCHMARKS_VARIABLE = "WADEBUG_TIMING_BENCHMARKS"
+
+
+class TestImportTime(unittest.TestCase):
+    def test_commands_should_not_import_heavy_modules(self):
+        for times in import_time.measure(import_time.COMMANDS):
+            modules = {imp.module for imp in times.imports}
+            assert not modules & set(import_time.HEAVY_MODULES), (
+                "wadebug {} imported {}".format(
+                    times.command, sorted(modules & set(import_time.HEAVY_MODULES))
+                )
+            )
+
+    @unittest.skipUnless(
+        os.environ.get(TIMING_BENCHMARKS_VARIABLE),
+        "set {}=1 to check the import time budget".format(TIMING_BENCHMARKS_VARIABLE),
+    )
+    def test_commands_should_start_within_budget(self):
+        for times in import_time.measure(import_time.COMMANDS, repeat=3):
+            assert times.total_ms < IMPORT_TIME_BUDGET_MS, (
+                "wadebug {} spent {}ms importing modules, budget is {}ms".format(
+                    times.command, times.total_ms, IMPORT_TIME_BUDGET_MS
+                )
+            )
+
+    def test_should_parse_importtime_output(self):
+        imports = import_time.parse_importtime(
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   wadebug.results\n"
+            "import time:      1000 |       1120 | wadebug.cli\n"
+        )
+
+        assert imports == [
+            import_time.ImportTime("wadebug.results", 120, 120),
+            import_time.ImportTime("wadebug.cli", 1000, 1120),
+        ]
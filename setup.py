@@ -14,8 +14,6 @@ from setuptools import find_packages, setup
 dependencies = [
     "click",
     "docker",
-    'enum34;python_version<"3.4"',
-    "outdated",
     "pydash",
     "PyMySQL",
     "pytest",
@@ -35,11 +33,13 @@ setup(
     author="Thiago Moraes",
     author_email="tmoraes@fb.com",
     description="Investigate issues with WhatsApp Business API setup.",
-    packages=find_packages(exclude=["tests"]),
+    packages=find_packages(exclude=["tests", "benchmarks"]),
     include_package_data=True,
     zip_safe=False,
     platforms="any",
     install_requires=dependencies,
+    # importlib.metadata, contextvars, asyncio.run and time.time_ns
+    python_requires=">=3.8",
     entry_points={"console_scripts": ["wadebug = wadebug.cli:safe_main"]},
     classifiers=[
         # As from http://pypi.python.org/pypi?%3Aaction=list_classifiers
@@ -59,8 +59,8 @@ setup(
         "Operating System :: Unix",
         "Operating System :: Microsoft :: Windows",
         "Programming Language :: Python",
-        "Programming Language :: Python :: 2",
         "Programming Language :: Python :: 3",
+        "Programming Language :: Python :: 3 :: Only",
         "Topic :: Software Development :: Libraries :: Python Modules",
     ],
 )
@@ -5,39 +5,39 @@
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import json
 import pprint
 
-import pkg_resources
-import requests
 from wadebug import exceptions
+from wadebug.log_upload import ResumableUpload, UploadSessionError
+from wadebug.version import get_version
 
 
 class Events:
     RUN_ACTIONS = "run_actions"
     RUN_ACTIONS_AND_SEND_RESULTS = "run_actions_and_send_results"
     SEND_LOGS = "send_logs"
+    SEND_EVENTS_BATCH = "send_events_batch"
 
 
 class Analytics:
+    GRAPH_URL = "https://graph.facebook.com/v3.1"
     API_ENDPOINT = "https://graph.facebook.com/v3.1/wa_debug_logs"
+    UPLOAD_ENDPOINT = "https://graph.facebook.com/v3.1/260133211267543/uploads"
     CLIENT_TOKEN = "260133211267543|a2471a9f36e4eaf6b9b79bb60b7887ee"
     TIMEOUT = 30
 
-    # set VERSION on first import of this class
-    VERSION = "unknown"
-    try:
-        VERSION = pkg_resources.get_distribution("wadebug").version
-    except Exception:
-        pass  # ignore when building from WhatsApp internal build system
-
     @staticmethod
     def send_event(event, data, phone_number=None, files_param=None):
+        # imported here, so that commands not sending data start fast
+        import requests
+
         postData = {
             "access_token": Analytics.CLIENT_TOKEN,
             "event_type": event,
             "event_data": data,
             "phone_number": phone_number,
-            "version": Analytics.VERSION,
+            "version": get_version(),
         }
 
         try:
@@ -61,6 +61,36 @@ class Analytics:
 
     @staticmethod
     def send_logs_to_fb(zipped_logs_file_handle, phone_number=None):
+        """Upload the archive in chunks, then send the event referencing it.
+
+        Falls back to send_logs_archive when no upload session can be created.
+        """
+        # imported here, so that commands not sending data start fast
+        import requests
+
+        upload = ResumableUpload(
+            Analytics.UPLOAD_ENDPOINT, Analytics.GRAPH_URL, Analytics.CLIENT_TOKEN
+        )
+        try:
+            handle = upload.upload(
+                zipped_logs_file_handle, "wadebug_logs.zip", "application/zip"
+            )
+        except UploadSessionError:
+            return Analytics.send_logs_archive(zipped_logs_file_handle, phone_number)
+        except requests.exceptions.RequestException:
+            raise exceptions.FBNetworkError(
+                "Network Error. Please ensure you can connect to www.facebook.com"
+            )
+        return Analytics.send_event(
+            Events.SEND_LOGS,
+            data=json.dumps({"logs_archive_handle": handle}),
+            phone_number=phone_number,
+        )
+
+    @staticmethod
+    def send_logs_archive(zipped_logs_file_handle, phone_number=None):
+        """Send the archive in the multipart body of the event, in one request."""
+        zipped_logs_file_handle.seek(0)
         files_param = {
             "logs_archive": (
                 "wadebug_logs.zip",
@@ -74,3 +104,17 @@ class Analytics:
             files_param=files_param,
             phone_number=phone_number,
         )
+
+    @staticmethod
+    def send_batch(compressed_events):
+        """Send events as gzip-compressed json lines, see analytics_spool."""
+        files_param = {
+            "events_batch": (
+                "wadebug_events.jsonl.gz",
+                compressed_events,
+                "application/gzip",
+            )
+        }
+        return Analytics.send_event(
+            Events.SEND_EVENTS_BATCH, data="none", files_param=files_param
+        )
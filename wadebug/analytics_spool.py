@@ -0,0 +1,171 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import errno
+import gzip
+import json
+import os
+import time
+
+from wadebug.analytics import Analytics
+from wadebug.file_utils import write_json_atomically
+
+
+"""
+Events kept on disk until they can be sent to Facebook, many at once.
+
+Events are only spooled when Facebook cannot be reached. Each one is a file of
+the spool directory. The next event sent takes all pending events along, as
+one gzip-compressed batch, and they are deleted once Facebook accepted them.
+Events of runs on hosts that cannot reach Facebook are kept for MAX_AGE, and
+the spool never grows past MAX_BYTES: the oldest events are dropped first.
+"""
+
+SPOOL_FOLDER = "analytics_spool"
+EVENT_SUFFIX = ".json"
+LOCK_FILE = "flush.lock"
+
+# bytes of events kept at most
+MAX_BYTES = 5 * 1024 * 1024
+# seconds an event is kept before being dropped
+MAX_AGE = 7 * 24 * 3600
+# pending events sent in one request
+MAX_BATCH_EVENTS = 500
+# seconds after which the lock of a flush that never finished is ignored
+LOCK_MAX_AGE = 10 * 60
+
+
+class AnalyticsSpool(object):
+    def __init__(self, cache_dir, max_bytes=MAX_BYTES, max_age=MAX_AGE):
+        self.directory = os.path.join(cache_dir, SPOOL_FOLDER)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    def append(self, event, data, phone_number=None):
+        """Add an event to send with the next flush, see Analytics.send_event."""
+        # names sort in the order events were added
+        path = os.path.join(
+            self.directory,
+            "{:020d}-{}{}".format(time.time_ns(), os.getpid(), EVENT_SUFFIX),
+        )
+        # flushes only see complete events
+        write_json_atomically(path, build_event(event, data, phone_number))
+        self.prune()
+        return path
+
+    def get_pending(self):
+        """Paths of events waiting to be sent, oldest first."""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        return [
+            os.path.join(self.directory, name)
+            for name in sorted(names)
+            if name.endswith(EVENT_SUFFIX)
+        ]
+
+    def prune(self):
+        """Drop events older than max_age, then the oldest past max_bytes."""
+        kept = []
+        for path in self.get_pending():
+            try:
+                if time.time() - os.path.getmtime(path) > self.max_age:
+                    os.remove(path)
+                else:
+                    kept.append((path, os.path.getsize(path)))
+            except OSError:
+                pass
+
+        total_bytes = sum(size for _, size in kept)
+        for path, size in kept:
+            if total_bytes <= self.max_bytes:
+                break
+            remove_quietly(path)
+            total_bytes -= size
+
+    def flush(self, events=()):
+        """Send pending events in gzip-compressed batches, return how many.
+
+        events, built with build_event, are sent with the last batch, so that
+        they were not sent when this raises. Pending events are only deleted
+        once their batch is accepted. Raises the errors of
+        Analytics.send_batch, e.g. FBNetworkError when offline. Pending events
+        are left to another process flushing at the same time.
+        """
+        locked = self._acquire_lock()
+        try:
+            pending = self.get_pending() if locked else []
+            batches = []
+            while pending:
+                batches.append(pending[:MAX_BATCH_EVENTS])
+                pending = pending[MAX_BATCH_EVENTS:]
+            # events are sent even without pending events
+            batches = batches or [[]]
+            sent = 0
+            for index, batch in enumerate(batches):
+                batch_events = []
+                for path in batch:
+                    try:
+                        with open(path, "r") as f:
+                            batch_events.append(json.load(f))
+                    except (OSError, ValueError):
+                        # a corrupted event would fail every flush
+                        remove_quietly(path)
+                if index == len(batches) - 1:
+                    batch_events.extend(events)
+                if batch_events:
+                    Analytics.send_batch(compress_events(batch_events))
+                for path in batch:
+                    remove_quietly(path)
+                sent += len(batch_events)
+            return sent
+        finally:
+            if locked:
+                remove_quietly(self.get_lock_path())
+
+    def get_lock_path(self):
+        return os.path.join(self.directory, LOCK_FILE)
+
+    def _acquire_lock(self):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.get_lock_path()
+        try:
+            if time.time() - os.path.getmtime(path) > LOCK_MAX_AGE:
+                remove_quietly(path)
+        except OSError:
+            pass
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except OSError as e:
+            if e.errno == errno.EEXIST:
+                return False
+            raise
+
+
+def build_event(event, data, phone_number=None):
+    """Event sent in batches, see Analytics.send_event for its arguments."""
+    return {
+        "event_type": event,
+        "event_data": data,
+        "phone_number": phone_number,
+        "created_at": time.time(),
+    }
+
+
+def compress_events(events):
+    """Events as gzip-compressed json lines."""
+    lines = "".join(json.dumps(event) + "\n" for event in events)
+    return gzip.compress(lines.encode("utf-8"))
+
+
+def remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
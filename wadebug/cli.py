@@ -8,14 +8,28 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 import json
 import os
 import sys
+import time
 
 import click
-import pkg_resources
-from wadebug import cli_utils, results, ui, wa_actions
-from wadebug.cli_param import wadebug_option
-from wadebug.cli_reusable_params import json_output, logs_since, opt_out, send_logs
-from wadebug.config import Config, ConfigLoadError
-from wadebug.wa_actions import log_utils
+from wadebug import cli_utils, results, ui, upgrade_check, wa_actions
+from wadebug.cli_param import Duration, wadebug_option
+from wadebug.cli_reusable_params import (
+    budget,
+    isolate,
+    jobs,
+    json_output,
+    json_stream,
+    logs_since,
+    no_cache,
+    opt_out,
+    profile,
+    send_logs,
+    timeout,
+    timings,
+)
+from wadebug.config import Config, ConfigLoadError, get_cache_dir
+from wadebug.version import UNKNOWN_VERSION, get_version
+from wadebug.wa_actions import last_run, log_utils, result_cache
 
 
 # Disabling warning as using unicode_literals is considered ok
@@ -23,39 +37,51 @@ from wadebug.wa_actions import log_utils
 # http://python-future.org/imports.html#should-i-import-unicode-literals
 click.disable_unicode_literals_warning = True
 LOGS_SINCE_PARAM_FORMAT = "%Y-%m-%d %H:%M:%S"
+DEFAULT_JOBS = 4
+DEFAULT_TIMEOUT = 30
+DEFAULT_WATCH_INTERVAL = 60
+WATCH_TIME_FORMAT = "%H:%M:%S"
+STREAM_RESULT_RECORD = "result"
+STREAM_SUMMARY_RECORD = "summary"
+STREAM_ERROR_RECORD = "error"
+DEFAULT_METRICS_ADDRESS = "0.0.0.0"
+DEFAULT_METRICS_PORT = 9563
+# seconds to wait at exit for an upgrade check still running
+UPGRADE_CHECK_WAIT = 1
 
-__VERSION__ = "unknown"
 
-try:
-    __VERSION__ = pkg_resources.get_distribution("wadebug").version
-except Exception:
-    pass  # ignore when building from WhatsApp internal build system
+def safe_main():
+    run()
 
 
-def safe_main():
-    if __VERSION__ != "unknown":
-        prompt_upgrade(__VERSION__)
+def start_upgrade_check():
+    """UpgradeCheck running in the background, None for unknown versions.
 
-    run()
+    Only started by commands running actions, see debug_implementation.
+    """
+    version = get_version()
+    if version == UNKNOWN_VERSION:
+        return None
+    # the config file is not needed to find the cache
+    return upgrade_check.UpgradeCheck(version, get_cache_dir()).start()
 
 
-def prompt_upgrade(version):
-    from outdated import check_outdated
+def prompt_upgrade(check):
+    latest_version = check.get_newer_version(timeout=UPGRADE_CHECK_WAIT)
+    if check.exception is not None and Config().development_mode:
+        raise check.exception
 
-    try:
-        is_outdated, latest_version = check_outdated("wadebug", version)
-        if is_outdated:
-            click.secho(
-                "The current version of wadebug ({}) is out of date. "
-                "Run `pip3 install wadebug --upgrade` "
-                "to upgrade to the latest version ({})\n".format(
-                    version, latest_version
-                ),
-                fg="yellow",
-            )
-    except Exception:
-        if Config().development_mode:
-            raise
+    if latest_version:
+        # on stderr, so that it never mixes with json output
+        click.secho(
+            "\nThe current version of wadebug ({}) is out of date. "
+            "Run `pip3 install wadebug --upgrade` "
+            "to upgrade to the latest version ({})".format(
+                check.version, latest_version
+            ),
+            fg="yellow",
+            err=True,
+        )
 
 
 def run():
@@ -73,11 +99,33 @@ def run():
         )
 
 
+def print_version(ctx, param, value):
+    # the version is only looked up when asked for
+    if value and not ctx.resilient_parsing:
+        click.echo("{}, version {}".format(ctx.find_root().info_name, get_version()))
+        ctx.exit()
+
+
 @click.group(invoke_without_command=True)
 @click.pass_context
-@click.version_option(__VERSION__)
+@click.option(
+    "--version",
+    is_flag=True,
+    expose_value=False,
+    is_eager=True,
+    callback=print_version,
+    help="Show the version and exit.",
+)
 @wadebug_option(opt_out)
 @wadebug_option(json_output)
+@wadebug_option(json_stream)
+@wadebug_option(jobs)
+@wadebug_option(timeout)
+@wadebug_option(budget)
+@wadebug_option(isolate)
+@wadebug_option(no_cache)
+@wadebug_option(profile)
+@wadebug_option(timings)
 def main(ctx, **kwargs):
     """Investigate issues with WhatsApp Business API setup."""
 
@@ -94,14 +142,15 @@ def main(ctx, **kwargs):
 @wadebug_option(json_output)
 def ls(ctx, **kwargs):
     """Print a list of possible debug actions."""
-    acts = wa_actions.get_all_actions()
+    # described by the manifest, listing does not import actions
+    descriptions = wa_actions.get_action_descriptions()
     if ctx.obj.get("json", False):
-        click.echo(json.dumps({"actions": [act.user_facing_name for act in acts]}))
+        click.echo(json.dumps({"actions": [name for name, _ in descriptions]}))
         return
 
     click.secho("{:<20}  {}".format("Action", "Description"), bold=True)
-    for act in acts:
-        click.secho("{:<20}  {}".format(act.user_facing_name, act.short_description))
+    for name, short_description in descriptions:
+        click.secho("{:<20}  {}".format(name, short_description))
     click.echo()
 
 
@@ -149,6 +198,14 @@ def logs(ctx, **kwargs):
 @click.pass_context
 @wadebug_option(opt_out)
 @wadebug_option(json_output)
+@wadebug_option(json_stream)
+@wadebug_option(jobs)
+@wadebug_option(timeout)
+@wadebug_option(budget)
+@wadebug_option(isolate)
+@wadebug_option(no_cache)
+@wadebug_option(profile)
+@wadebug_option(timings)
 def full_debug(ctx, **kwargs):
     """Execute all debug routines, executed by default."""
     acts = wa_actions.get_all_actions()
@@ -156,7 +213,10 @@ def full_debug(ctx, **kwargs):
     debug_implementation(
         acts,
         json_output=ctx.obj.get("json", False),
+        json_stream=ctx.obj.get("json_stream", False),
         opt_out=ctx.obj.get("opt_out", False),
+        run_options=get_run_options(ctx),
+        timings=ctx.obj.get("timings", False),
     )
 
 
@@ -165,13 +225,21 @@ def full_debug(ctx, **kwargs):
 @click.argument("actions", default=None, required=True, nargs=-1)
 @wadebug_option(opt_out)
 @wadebug_option(json_output)
+@wadebug_option(json_stream)
+@wadebug_option(jobs)
+@wadebug_option(timeout)
+@wadebug_option(budget)
+@wadebug_option(isolate)
+@wadebug_option(no_cache)
+@wadebug_option(profile)
+@wadebug_option(timings)
 def partial_debug(ctx, actions, **kwargs):
     """Execute debug routines provided. 'wadebug ls' to actions available."""
     acts, acts_not_found = process_input_actions(actions)
 
     if acts_not_found:
-        if ctx.obj.get("json", False):
-            handle_invalid_actions(acts_not_found)
+        if is_json_output(ctx):
+            handle_invalid_actions(acts_not_found, ctx.obj.get("json_stream", False))
         else:
             handle_invalid_actions_interactive(acts_not_found)
         sys.exit(-1)
@@ -179,9 +247,227 @@ def partial_debug(ctx, actions, **kwargs):
     debug_implementation(
         acts,
         json_output=ctx.obj.get("json", False),
+        json_stream=ctx.obj.get("json_stream", False),
         opt_out=ctx.obj.get("opt_out", False),
+        run_options=get_run_options(ctx),
+        timings=ctx.obj.get("timings", False),
+    )
+
+
+@main.command("rerun")
+@click.pass_context
+@click.option(
+    "--failed",
+    is_flag=True,
+    help="Only execute the routines that did not pass, reusing the results of "
+    "the others.",
+)
+@wadebug_option(opt_out)
+@wadebug_option(json_output)
+@wadebug_option(json_stream)
+@wadebug_option(jobs)
+@wadebug_option(timeout)
+@wadebug_option(budget)
+@wadebug_option(isolate)
+@wadebug_option(timings)
+def rerun(ctx, failed, **kwargs):
+    """Execute again the debug routines of the last full or partial run."""
+    last_results = last_run.load(Config().cache_dir)
+    if last_results is None:
+        if is_json_output(ctx):
+            handle_no_last_run(ctx.obj.get("json_stream", False))
+        else:
+            handle_no_last_run_interactive()
+        sys.exit(-1)
+
+    acts, reused_results = last_run.get_actions_to_rerun(last_results, failed)
+    run_options = get_run_options(ctx)
+    # routines are executed again, not read from the cache
+    run_options["cache"] = None
+    run_options["reused_results"] = reused_results
+
+    debug_implementation(
+        acts,
+        json_output=ctx.obj.get("json", False),
+        json_stream=ctx.obj.get("json_stream", False),
+        opt_out=ctx.obj.get("opt_out", False),
+        run_options=run_options,
+        timings=ctx.obj.get("timings", False),
+    )
+
+
+def handle_no_last_run(json_stream=False):
+    echo_json_error({"error": "No previous run found to execute again."}, json_stream)
+
+
+def handle_no_last_run_interactive():
+    click.echo("No previous run found to execute again.")
+    click.echo("Please run wadebug full or wadebug partial first.")
+
+
+@main.command("watch")
+@click.pass_context
+@click.argument("actions", default=None, required=False, nargs=-1)
+@click.option(
+    "--interval",
+    type=Duration(),
+    default=DEFAULT_WATCH_INTERVAL,
+    help="Time between the start of two runs (e.g.: 30s, 5m, default: 60s).",
+)
+@wadebug_option(json_output)
+@wadebug_option(json_stream)
+@wadebug_option(jobs)
+@wadebug_option(timeout)
+@wadebug_option(budget)
+@wadebug_option(isolate)
+@wadebug_option(no_cache)
+def watch(ctx, actions, interval, **kwargs):
+    """Re-run debug routines periodically, printing only results that changed.
+
+    Runs all routines when none is provided. Usage is not sent to WhatsApp.
+    """
+    if actions:
+        acts, acts_not_found = process_input_actions(actions)
+        if acts_not_found:
+            if is_json_output(ctx):
+                handle_invalid_actions(
+                    acts_not_found, ctx.obj.get("json_stream", False)
+                )
+            else:
+                handle_invalid_actions_interactive(acts_not_found)
+            sys.exit(-1)
+    else:
+        acts = wa_actions.get_all_actions()
+
+    if is_json_output(ctx):
+        watch_json(
+            acts, interval, get_run_options(ctx), ctx.obj.get("json_stream", False)
+        )
+    else:
+        watch_interactive(acts, interval, get_run_options(ctx))
+
+
+def watch_json(acts, interval, run_options, json_stream=False):
+    """Print results that changed as json lines, one result per line.
+
+    With json_stream, lines are tagged with the "record" field of --json-stream.
+    """
+    config = load_config()
+
+    def handle_failed_run(e):
+        # the next cycle runs again, a watch is not ended by one failed run
+        echo_json_error(
+            {"error": "Run of the actions failed.", "details": str(e)}, json_stream
+        )
+
+    for cycle, changed in wa_actions.watch_actions(
+        acts, config, interval, on_error=handle_failed_run, **run_options
+    ):
+        for res in changed:
+            line = dict(res.to_dict(), cycle=cycle)
+            if json_stream:
+                line["record"] = STREAM_RESULT_RECORD
+            click.echo(json.dumps(line))
+
+
+def watch_interactive(acts, interval, run_options):
+    config = load_config_interactive()
+    click.echo(
+        "Running {} actions every {:g} seconds. Press Ctrl+C to stop.".format(
+            len(acts), interval
+        )
     )
 
+    def handle_failed_run(e):
+        # the next cycle runs again, a watch is not ended by one failed run
+        click.echo()
+        click.secho(
+            "{} - Run of the actions failed: {}".format(
+                time.strftime(WATCH_TIME_FORMAT), e
+            ),
+            fg="red",
+        )
+
+    try:
+        for _, changed in wa_actions.watch_actions(
+            acts, config, interval, on_error=handle_failed_run, **run_options
+        ):
+            if not changed:
+                continue
+
+            click.echo()
+            click.secho(
+                "{} - {} results changed:".format(
+                    time.strftime(WATCH_TIME_FORMAT), len(changed)
+                ),
+                bold=True,
+            )
+            for res in changed:
+                ui.print_result_header(res)
+                if isinstance(res, results._NotOK):
+                    ui.print_result_details(res)
+    except KeyboardInterrupt:
+        click.echo()
+
+
+@main.command("serve-metrics")
+@click.pass_context
+@click.argument("actions", default=None, required=False, nargs=-1)
+@click.option(
+    "--port",
+    type=click.IntRange(1, 65535),
+    default=DEFAULT_METRICS_PORT,
+    help="Port to serve metrics on (default: {}).".format(DEFAULT_METRICS_PORT),
+)
+@click.option(
+    "--address",
+    default=DEFAULT_METRICS_ADDRESS,
+    help="Address to listen on (default: {}).".format(DEFAULT_METRICS_ADDRESS),
+)
+@click.option(
+    "--interval",
+    type=Duration(),
+    default=DEFAULT_WATCH_INTERVAL,
+    help="Time between the start of two runs (e.g.: 30s, 5m, default: 60s).",
+)
+@wadebug_option(jobs)
+@wadebug_option(timeout)
+@wadebug_option(budget)
+@wadebug_option(isolate)
+def serve_metrics(ctx, actions, port, address, interval, **kwargs):
+    """Serve results of debug routines as Prometheus metrics on /metrics.
+
+    Routines run periodically in the background, scrapes read the results of
+    the last run. Runs all routines when none is provided. Usage is not sent
+    to WhatsApp.
+    """
+    if actions:
+        acts, acts_not_found = process_input_actions(actions)
+        if acts_not_found:
+            handle_invalid_actions_interactive(acts_not_found)
+            sys.exit(-1)
+    else:
+        acts = wa_actions.get_all_actions()
+
+    # http.server takes a while to import, other commands do not need it
+    from wadebug.wa_actions import metrics
+
+    config = load_config_interactive()
+    click.echo(
+        "Serving metrics of {} actions run every {:g} seconds on "
+        "http://{}:{}{}. Press Ctrl+C to stop.".format(
+            len(acts), interval, address, port, metrics.METRICS_PATH
+        )
+    )
+
+    run_options = get_run_options(ctx)
+    # durations and observations of cached results would be those of old runs
+    run_options["cache"] = None
+    try:
+        metrics.serve_metrics(acts, config, address, port, interval, **run_options)
+    except KeyboardInterrupt:
+        click.echo()
+
 
 def process_input_actions(actions):
     acts = []
@@ -195,66 +481,199 @@ def process_input_actions(actions):
     return acts, acts_not_found
 
 
-def handle_invalid_actions(acts_not_found):
-    click.echo(
-        json.dumps(
-            {
-                "error": "Can't find action(s) requested.",
-                "actions_not_found": acts_not_found,
-            }
-        )
+def handle_invalid_actions(acts_not_found, json_stream=False):
+    echo_json_error(
+        {
+            "error": "Can't find action(s) requested.",
+            "actions_not_found": acts_not_found,
+        },
+        json_stream,
     )
 
 
+def echo_json_error(error, json_stream=False):
+    """Print the dict error as json, as an "error" record with json_stream."""
+    if json_stream:
+        error = dict(error, record=STREAM_ERROR_RECORD)
+    click.echo(json.dumps(error))
+
+
 def handle_invalid_actions_interactive(acts_not_found):
     click.echo("Can't find the following action(s) requested:\n\t", nl=False)
     click.echo("\n\t".join(acts_not_found))
     click.echo("Please run wadebug ls to list all available actions.")
 
 
-def debug_implementation(acts, json_output, opt_out):
-    if json_output:
-        debug_json(acts, opt_out)
-    else:
-        debug_interactive(acts, opt_out)
+def get_run_options(ctx):
+    """Keyword arguments for wa_actions.run_actions set on the command line."""
+    return {
+        "jobs": ctx.obj.get("jobs", DEFAULT_JOBS),
+        "timeout": ctx.obj.get("timeout", DEFAULT_TIMEOUT),
+        "budget": ctx.obj.get("budget"),
+        "isolate": ctx.obj.get("isolate", False),
+        "profile_dir": ctx.obj.get("profile"),
+        "cache": get_result_cache(ctx),
+    }
 
 
-def debug_json(acts, opt_out):
-    result = execute_actions(acts)
+def get_result_cache(ctx):
+    # profiles of cached results would be empty
+    if ctx.obj.get("no_cache", False) or ctx.obj.get("profile"):
+        return None
+    return result_cache.ResultCache(Config().cache_dir)
 
-    if not opt_out and not Config().disable_send_data:
-        cli_utils.send_results_to_fb(result)
 
+def is_json_output(ctx):
+    return ctx.obj.get("json", False) or ctx.obj.get("json_stream", False)
 
-def debug_interactive(acts, opt_out):
-    result = execute_actions_interactive(acts)
 
-    if not opt_out and not Config().disable_send_data:
-        cli_utils.send_results_to_fb(
-            result,
-            success_callback=send_usage_result_interactive_success,
-            failure_callback=send_result_interactive_failure,
+def debug_implementation(
+    acts, json_output, opt_out, run_options=None, timings=False, json_stream=False
+):
+    # runs in the background, the notice is printed once the command is done
+    check = start_upgrade_check()
+    try:
+        if json_stream:
+            debug_json_stream(acts, opt_out, run_options)
+        elif json_output:
+            # results in json always have their timings
+            debug_json(acts, opt_out, run_options)
+        else:
+            debug_interactive(acts, opt_out, run_options, timings)
+    finally:
+        if check is not None:
+            prompt_upgrade(check)
+
+
+def debug_json(acts, opt_out, run_options=None):
+    phone_number_lookup = start_phone_number_lookup(opt_out)
+    result = execute_actions(acts, run_options)
+    # run_id is not shown in json, spooled results are sent along
+    save_and_send_results(result, phone_number_lookup, batched=True)
+
+
+def debug_json_stream(acts, opt_out, run_options=None):
+    phone_number_lookup = start_phone_number_lookup(opt_out)
+    result = execute_actions_stream(acts, run_options)
+    save_and_send_results(result, phone_number_lookup, batched=True)
+
+
+def debug_interactive(acts, opt_out, run_options=None, timings=False):
+    phone_number_lookup = start_phone_number_lookup(opt_out)
+    result = execute_actions_interactive(acts, run_options, timings)
+    save_and_send_results(
+        result,
+        phone_number_lookup,
+        success_callback=send_usage_result_interactive_success,
+        failure_callback=send_result_interactive_failure,
+        timeout_callback=send_result_interactive_timeout,
+    )
+
+
+def start_phone_number_lookup(opt_out):
+    """Future of the phone number to send results with, None when not sending.
+
+    Started before actions run, it logs in to the API in the meantime.
+    """
+    if opt_out or Config().disable_send_data:
+        return None
+    return cli_utils.start_phone_number_lookup()
+
+
+def save_and_send_results(
+    result,
+    phone_number_lookup,
+    success_callback=None,
+    failure_callback=None,
+    timeout_callback=None,
+    batched=False,
+):
+    """Save result as the last run while uploading it, if phone_number_lookup.
+
+    Results are already printed, waiting for the upload only delays the exit,
+    by cli_utils.UPLOAD_WAIT seconds at most. Batched results are sent with
+    the spooled ones, see cli_utils.send_results_to_fb_batched, callbacks are
+    not called for them.
+    """
+    upload = None
+    if phone_number_lookup is not None and batched:
+        upload = cli_utils.send_results_to_fb_batched_in_background(
+            result, phone_number_lookup
+        )
+    elif phone_number_lookup is not None:
+        upload = cli_utils.send_results_to_fb_in_background(
+            result, phone_number_lookup, success_callback, failure_callback
         )
 
+    last_run.save(Config().cache_dir, result)
+
+    if upload is not None and not cli_utils.wait_for_upload(upload):
+        if timeout_callback:
+            timeout_callback()
+
 
-def execute_actions(actions):
+def execute_actions(actions, run_options=None):
     result = {}
     config = load_config()
 
-    for act in actions:
-        res = act.run(config)
+    for res in wa_actions.run_actions(actions, config, **(run_options or {})):
         result[res.action.user_facing_name] = res.to_dict()
 
+    result = order_results(actions, result)
     click.echo(json.dumps(result))
 
     return result
 
 
+def execute_actions_stream(actions, run_options=None):
+    """Print each result as a json line as soon as it is available.
+
+    Lines are tagged with a "record" field: "result" for results, then a last
+    "summary" line once all actions finished. Consumers can act on results of
+    a run that is still in progress, or was killed.
+    """
+    result = {}
+    counts = {}
+    config = load_config()
+    started_at = time.monotonic()
+
+    for res in wa_actions.run_actions(actions, config, **(run_options or {})):
+        result[res.action.user_facing_name] = res.to_dict()
+        counts[res.result] = counts.get(res.result, 0) + 1
+        click.echo(json.dumps(dict(res.to_dict(), record=STREAM_RESULT_RECORD)))
+
+    click.echo(
+        json.dumps(
+            {
+                "record": STREAM_SUMMARY_RECORD,
+                "total": len(result),
+                "results": counts,
+                "duration_ms": round((time.monotonic() - started_at) * 1000, 1),
+            }
+        )
+    )
+
+    return order_results(actions, result)
+
+
+def order_results(actions, result):
+    """Sort results in the order actions were requested.
+
+    Actions finish in any order when executed concurrently. Sorting keeps the
+    output stable between runs.
+    """
+    return {
+        act.user_facing_name: result[act.user_facing_name]
+        for act in actions
+        if act.user_facing_name in result
+    }
+
+
 def load_config():
     return Config().values
 
 
-def execute_actions_interactive(actions):
+def execute_actions_interactive(actions, run_options=None, timings=False):
     config = load_config_interactive()
 
     # execution logic is duplicated so that we print results as they appear
@@ -269,19 +688,26 @@ def execute_actions_interactive(actions):
     result = {}
     problems = []
 
-    for act in actions:
-        res = act.run(config)
+    for res in wa_actions.run_actions(actions, config, **(run_options or {})):
         result[res.action.user_facing_name] = res.to_dict()
 
         ui.print_result_header(res)
+        if timings:
+            ui.print_result_timings(res)
         if isinstance(res, results._NotOK):
             ui.print_result_details(res)
             problems.append(res)
 
+    result = order_results(actions, result)
+
     click.echo()
     if problems:
         click.echo("! WADebug found {} issues.".format(len(problems)))
 
+    profile_dir = (run_options or {}).get("profile_dir")
+    if profile_dir:
+        ui.print_profile_summary_location(profile_dir)
+
     return result
 
 
@@ -478,6 +904,15 @@ def send_result_interactive_failure(e):
     click.secho("Could not send report to Facebook:\n{}".format(e), fg="red")
 
 
+def send_result_interactive_timeout():
+    click.secho(
+        "Could not send report to Facebook within {} seconds".format(
+            cli_utils.UPLOAD_WAIT
+        ),
+        fg="red",
+    )
+
+
 def send_usage_result_json_success(output):
     run_id = output["run_id"]
     return {
@@ -6,6 +6,7 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import functools
+import re
 
 import click
 from wadebug import exceptions
@@ -96,3 +97,27 @@ class wadebug_option(_WADebugParam):
 class wadebug_argument(_WADebugParam):
     def __init__(self, reusable_param):
         super(wadebug_option, self).__init__(reusable_param, "argument")
+
+
+class Duration(click.ParamType):
+    """A length of time such as 500ms, 10s, 2m or 1h, converted to seconds.
+
+    Numbers without a unit are seconds.
+    """
+
+    name = "duration"
+    units = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+    def convert(self, value, param, ctx):
+        if isinstance(value, (int, float)):
+            return float(value)
+
+        match = re.match(r"^\s*(\d+(?:\.\d+)?)\s*(ms|s|m|h)?\s*$", value)
+        if not match or float(match.group(1)) <= 0:
+            self.fail(
+                "{} is not a valid duration (e.g.: 500ms, 10s, 2m)".format(value),
+                param,
+                ctx,
+            )
+
+        return float(match.group(1)) * self.units[match.group(2) or "s"]
@@ -5,7 +5,8 @@
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
-from wadebug.cli_param import ReusableParam
+import click
+from wadebug.cli_param import Duration, ReusableParam
 
 
 opt_out = ReusableParam(
@@ -26,6 +27,15 @@ json_output = ReusableParam(
     default=False,
 )
 
+json_stream = ReusableParam(
+    "--json-stream",
+    "json_stream",
+    help="Pass this flag to output each result as a line of json as soon as it "
+    "is available, followed by a line summarizing the run.",
+    is_flag=True,
+    default=False,
+)
+
 send_logs = ReusableParam(
     "--send",
     "send",
@@ -41,3 +51,67 @@ logs_since = ReusableParam(
     "Use the datetime format yyyy-MM-dd HH:mm:ss enclosed in quotes "
     "(e.g.: '2018-09-19 14:55:02')",
 )
+
+jobs = ReusableParam(
+    "--jobs",
+    "jobs",
+    help="Number of actions to execute at the same time (default: 4). "
+    "Use --jobs 1 to execute actions one after another.",
+    type=click.IntRange(min=1),
+)
+
+timeout = ReusableParam(
+    "--timeout",
+    "timeout",
+    help="Seconds each action has to finish before being reported as timed out "
+    "(default: 30). Some slower actions allow themselves more time. Timed out "
+    "actions keep running in the background, holding their connections to "
+    "Docker, MySQL and HTTP endpoints until they finish, unless --isolate is "
+    "passed.",
+    type=click.FloatRange(min=0.1),
+)
+
+budget = ReusableParam(
+    "--budget",
+    "budget",
+    help="Maximum time for the whole run (e.g.: 10s, 1m). The most important and "
+    "fastest actions run first; actions that do not fit are skipped.",
+    type=Duration(),
+)
+
+isolate = ReusableParam(
+    "--isolate",
+    "isolate",
+    help="Pass this flag to execute each action in a process of its own. Actions "
+    "that hang past their timeout are then killed instead of abandoned.",
+    is_flag=True,
+    default=False,
+)
+
+timings = ReusableParam(
+    "--timings",
+    "timings",
+    help="Pass this flag to show how long each action took and how many calls "
+    "it made to Docker, HTTP endpoints and MySQL.",
+    is_flag=True,
+    default=False,
+)
+
+no_cache = ReusableParam(
+    "--no-cache",
+    "no_cache",
+    help="Pass this flag to execute all actions again. By default, results of "
+    "actions whose containers, images and config did not change are reused for "
+    "up to an hour.",
+    is_flag=True,
+    default=False,
+)
+
+profile = ReusableParam(
+    "--profile",
+    "profile",
+    help="Directory where to write a cProfile profile of each action, a merged "
+    "profile and a summary of the slowest functions. Actions then run one at a "
+    "time.",
+    type=click.Path(file_okay=False, writable=True),
+)
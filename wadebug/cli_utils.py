@@ -6,48 +6,148 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import json
+from concurrent.futures import wait
 
+from wadebug import exceptions
 from wadebug.analytics import Analytics, Events
+from wadebug.analytics_spool import AnalyticsSpool, build_event
 from wadebug.config import Config
+from wadebug.wa_actions.base import run_in_thread
 from wadebug.wa_actions.wabiz_api import WABizAPI
 
 
-def send_results_to_fb(result, success_callback=None, failure_callback=None):
-    phone_number = None
+# seconds commands wait at exit for a report still being uploaded
+UPLOAD_WAIT = 10
+
+
+def get_phone_number():
+    """Phone number of the WhatsApp Business API client, None if unavailable."""
     try:
         config = Config().values
         if config:
             api = WABizAPI(**config.get("webapp"))
-            phone_number = api.get_phone_number()
+            return api.get_phone_number()
     except Exception:
         pass
+    return None
 
-    try:
-        event = Events.RUN_ACTIONS_AND_SEND_RESULTS
-        data = json.dumps(result)
 
+def start_phone_number_lookup():
+    """Look up the phone number on a daemon thread, returning a Future of it.
+
+    It logs in to the API, so it is worth starting before actions run.
+    """
+    return run_in_thread(get_phone_number)
+
+
+def send_results_to_fb_in_background(
+    result, phone_number_lookup=None, success_callback=None, failure_callback=None
+):
+    """send_results_to_fb on a daemon thread, returning a Future of it.
+
+    A copy of result is sent, the caller can keep using it. Callbacks are
+    called from that thread. See wait_for_upload.
+    """
+    return run_in_thread(
+        send_results_to_fb,
+        dict(result),
+        success_callback,
+        failure_callback,
+        phone_number_lookup,
+    )
+
+
+def wait_for_upload(upload, timeout=None):
+    """Wait up to timeout seconds (default: UPLOAD_WAIT) for upload to finish.
+
+    Returns whether it did. Uploads run on daemon threads, an upload still
+    running at exit is lost.
+    """
+    done, _ = wait([upload], UPLOAD_WAIT if timeout is None else timeout)
+    return bool(done)
+
+
+def send_results_to_fb(
+    result, success_callback=None, failure_callback=None, phone_number_lookup=None
+):
+    """Send result right away, for its run_id.
+
+    If Facebook cannot be reached, result is spooled to be sent by a later run.
+    Once it is reached, results spooled until then are sent too.
+    """
+    phone_number = lookup_phone_number(phone_number_lookup)
+    event = Events.RUN_ACTIONS_AND_SEND_RESULTS
+    data = json.dumps(result)
+
+    try:
         run_id = Analytics.send_event(event, data, phone_number)
         result["run_id"] = run_id
 
         if success_callback:
             success_callback(result)
     except Exception as e:
+        if isinstance(e, exceptions.FBNetworkError):
+            try:
+                get_analytics_spool().append(event, data, phone_number)
+            except OSError:
+                pass
         if failure_callback:
             failure_callback(e)
+    else:
+        try:
+            get_analytics_spool().flush()
+        except Exception:
+            # left in the spool for the next run
+            pass
 
 
-def send_logs_to_fb(
-    zipped_logs_file_handle, success_callback=None, failure_callback=None
-):
-    phone_number = None
+def send_results_to_fb_batched(result, phone_number_lookup=None):
+    """Send result right away, with the results spooled by earlier runs.
+
+    For runs that do not need a run_id, e.g. in json: results spooled while
+    Facebook could not be reached are sent in the same compressed batch. If
+    it still cannot be reached, result is spooled too.
+    """
+    phone_number = lookup_phone_number(phone_number_lookup)
+    event = Events.RUN_ACTIONS_AND_SEND_RESULTS
+    data = json.dumps(result)
+    spool = get_analytics_spool()
+
     try:
-        config = Config().values
-        if config:
-            api = WABizAPI(**config.get("webapp"))
-            phone_number = api.get_phone_number()
+        if spool.get_pending():
+            spool.flush([build_event(event, data, phone_number)])
+        else:
+            Analytics.send_event(event, data, phone_number)
+    except exceptions.FBNetworkError:
+        try:
+            spool.append(event, data, phone_number)
+        except OSError:
+            pass
     except Exception:
         pass
 
+
+def send_results_to_fb_batched_in_background(result, phone_number_lookup=None):
+    """send_results_to_fb_batched on a daemon thread, returning a Future of it."""
+    return run_in_thread(send_results_to_fb_batched, dict(result), phone_number_lookup)
+
+
+def get_analytics_spool():
+    return AnalyticsSpool(Config().cache_dir)
+
+
+def lookup_phone_number(phone_number_lookup=None):
+    """Result of phone_number_lookup, or the phone number looked up now."""
+    if phone_number_lookup is None:
+        return get_phone_number()
+    return phone_number_lookup.result()
+
+
+def send_logs_to_fb(
+    zipped_logs_file_handle, success_callback=None, failure_callback=None
+):
+    phone_number = get_phone_number()
+
     try:
         run_id = Analytics.send_logs_to_fb(zipped_logs_file_handle, phone_number)
 
@@ -6,13 +6,15 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import os
+import pkgutil
 from enum import Enum
 
-import pkg_resources
-import yaml
 from six import with_metaclass
 
 
+DEFAULT_CACHE_DIR = os.path.join("~", ".cache", "wadebug")
+
+
 class Singleton(type):
     _instances = {}
 
@@ -31,6 +33,10 @@ class ConfigLoadError(Enum):
 class Config(with_metaclass(Singleton)):
     SAMPLE_CONFIG_FILE = "wadebug.conf.yml.SAMPLE"
     CONFIG_FILE = "wadebug.conf.yml"
+    # connections kept open to the Docker daemon, above the default --jobs
+    DEFAULT_DOCKER_POOL_SIZE = 10
+    # seconds a request to the Docker daemon may take
+    DEFAULT_DOCKER_TIMEOUT = 60
 
     _disable_send_data = False
 
@@ -40,10 +46,23 @@ class Config(with_metaclass(Singleton)):
     _config = {}
 
     def __init__(self):
+        # imported here, yaml is only needed once a command reads the config
+        import yaml
+
+        self._docker_pool_size = get_env_number(
+            "WADEBUG_DOCKER_POOL_SIZE", self.DEFAULT_DOCKER_POOL_SIZE, int
+        )
+        self._docker_timeout = get_env_number(
+            "WADEBUG_DOCKER_TIMEOUT", self.DEFAULT_DOCKER_TIMEOUT, float
+        )
+        self._docker_keep_alive = (
+            os.environ.get("WADEBUG_DOCKER_KEEP_ALIVE", "True") == "True"
+        )
         try:
             self._development_mode = (
                 os.environ.get("WADEBUG_DEV_MODE", "False") == "True"
             )
+            self._cache_dir = get_cache_dir()
             self._config = self._load_config_from_file()
         except yaml.parser.ParserError as e:
             self._config_load_error = ConfigLoadError.CONFIG_INVALID
@@ -52,6 +71,8 @@ class Config(with_metaclass(Singleton)):
             self._config_load_error = ConfigLoadError.CONFIG_MISSING
 
     def _load_config_from_file(self):
+        import yaml
+
         with open(self.CONFIG_FILE, "r") as f:
             config = yaml.load(f, Loader=yaml.FullLoader)
         return config
@@ -60,6 +81,25 @@ class Config(with_metaclass(Singleton)):
     def development_mode(self):
         return self._development_mode
 
+    @property
+    def cache_dir(self):
+        """Directory where wadebug keeps data between runs, e.g. cached results."""
+        return self._cache_dir
+
+    @property
+    def docker_pool_size(self):
+        """Connections to the Docker daemon kept open by its client."""
+        return self._docker_pool_size
+
+    @property
+    def docker_timeout(self):
+        return self._docker_timeout
+
+    @property
+    def docker_keep_alive(self):
+        """Whether connections to the Docker daemon are reused between requests."""
+        return self._docker_keep_alive
+
     @property
     def disable_send_data(self):
         return self._disable_send_data
@@ -78,9 +118,7 @@ class Config(with_metaclass(Singleton)):
 
     def create_default_config_file(self):
         try:
-            config_file_stream = pkg_resources.resource_string(
-                __name__, self.SAMPLE_CONFIG_FILE
-            )
+            config_file_stream = pkgutil.get_data(__package__, self.SAMPLE_CONFIG_FILE)
             with open(self.CONFIG_FILE, "wb") as f:
                 f.write(config_file_stream)
             return True
@@ -91,3 +129,17 @@ class Config(with_metaclass(Singleton)):
     @property
     def create_exception(self):
         return self._config_create_exception
+
+
+def get_env_number(name, default, number_type):
+    """Positive number of environment variable name, default if unset or invalid."""
+    try:
+        value = number_type(os.environ[name])
+    except (KeyError, ValueError):
+        return default
+    return value if value > 0 else default
+
+
+def get_cache_dir():
+    """WADEBUG_CACHE_DIR, or the default, without loading the config file."""
+    return os.path.expanduser(os.environ.get("WADEBUG_CACHE_DIR", DEFAULT_CACHE_DIR))
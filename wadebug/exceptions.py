@@ -13,6 +13,12 @@ class Error(Exception):
     pass
 
 
+class DockerAPIError(Error):
+    """Raised when the Docker daemon returns an error response"""
+
+    pass
+
+
 class FBNetworkError(Error):
     """Raised when a network connection to FB cannot be made"""
 
@@ -0,0 +1,32 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import json
+import os
+import tempfile
+
+
+# suffix of files being written by write_json_atomically
+TEMP_SUFFIX = ".tmp"
+
+
+def write_json_atomically(path, data):
+    """Write data as json to path, creating its directory if needed.
+
+    data is written to a temporary file of the same directory first and then
+    renamed, so readers, or a crash, never leave path with half of it.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=TEMP_SUFFIX)
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
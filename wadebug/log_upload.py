@@ -0,0 +1,192 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import os
+import pprint
+import time
+
+from wadebug import exceptions
+
+
+"""
+Upload of large files to Facebook in chunks, resumed after failures.
+
+Follows the resumable upload protocol of the Graph API:
+
+    POST <upload_url>?file_name&file_length&file_type  -> {"id": session_id}
+    POST <graph_url>/<session_id> with a file_offset header and a chunk
+        -> {"file_offset": next offset}, or {"h": handle} once complete
+    GET <graph_url>/<session_id>  -> {"file_offset": offset acknowledged}
+
+Only one chunk of the file is in memory at a time. When a chunk fails, the
+upload asks for the acknowledged offset and goes on from there. A server
+answering an offset that does not advance counts as a failure too.
+"""
+
+# bytes sent per request
+CHUNK_SIZE = 4 * 1024 * 1024
+# consecutive failures of a chunk before giving up
+MAX_RETRIES = 5
+# seconds waited after the first failure, doubled after each one
+RETRY_BACKOFF = 1
+# seconds each request may take
+TIMEOUT = 30
+
+
+class RetriableUploadError(exceptions.Error):
+    """Raised when the upload server fails a request that can be retried"""
+
+    pass
+
+
+class UploadSessionError(exceptions.Error):
+    """Raised when the upload server does not create an upload session"""
+
+    pass
+
+
+class ResumableUpload(object):
+    def __init__(
+        self,
+        upload_url,
+        graph_url,
+        access_token,
+        chunk_size=CHUNK_SIZE,
+        max_retries=MAX_RETRIES,
+        retry_backoff=RETRY_BACKOFF,
+        timeout=TIMEOUT,
+        sleep=time.sleep,
+    ):
+        self.upload_url = upload_url
+        self.graph_url = graph_url
+        self.access_token = access_token
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.timeout = timeout
+        self.sleep = sleep
+
+    def upload(self, file_handle, file_name, file_type):
+        """Upload the content of file_handle, returning its handle.
+
+        Raises UploadSessionError when no upload session can be created, e.g.
+        the endpoint or the token is rejected, and FBNetworkError once a
+        chunk failed max_retries times in a row.
+        """
+        # imported here, so that commands not sending data start fast
+        import requests
+
+        file_handle.seek(0, os.SEEK_END)
+        file_length = file_handle.tell()
+
+        with requests.Session() as session:
+            session_id = self._create_session(
+                session, file_name, file_length, file_type
+            )
+            session_url = "{}/{}".format(self.graph_url, session_id)
+
+            offset = 0
+            failures = 0
+            acknowledged = True
+            while True:
+                try:
+                    if not acknowledged:
+                        # the failed chunk may have been received, or partly
+                        offset = self._get_offset(session, session_url)
+                        acknowledged = True
+                    res = self._send_chunk(session, session_url, file_handle, offset)
+                    if "h" not in res and int(res["file_offset"]) <= offset:
+                        raise RetriableUploadError(
+                            "Upload server did not advance past {}".format(offset)
+                        )
+                except (requests.exceptions.RequestException, RetriableUploadError):
+                    failures += 1
+                    self._wait_before_retry(failures, file_name)
+                    acknowledged = False
+                    continue
+
+                failures = 0
+                if "h" in res:
+                    return res["h"]
+                offset = int(res["file_offset"])
+
+    def _create_session(self, session, file_name, file_length, file_type):
+        """Id of a new upload session, retried like chunks."""
+        import requests
+
+        failures = 0
+        while True:
+            try:
+                return self._request(
+                    session,
+                    "POST",
+                    self.upload_url,
+                    params={
+                        "file_name": file_name,
+                        "file_length": file_length,
+                        "file_type": file_type,
+                    },
+                )["id"]
+            except (requests.exceptions.RequestException, RetriableUploadError) as e:
+                failures += 1
+                if failures > self.max_retries:
+                    raise UploadSessionError(
+                        "Could not create upload session: {}".format(e)
+                    )
+                self.sleep(self._get_backoff(failures))
+            except (ValueError, KeyError) as e:
+                # rejected, retrying would not help
+                raise UploadSessionError("Upload session was not created: {}".format(e))
+
+    def _wait_before_retry(self, failures, file_name):
+        """Back off after failures in a row, raise FBNetworkError past retries."""
+        if failures > self.max_retries:
+            raise exceptions.FBNetworkError(
+                "Network Error. Could not upload {} after {} attempts. "
+                "Please ensure you can connect to www.facebook.com".format(
+                    file_name, failures
+                )
+            )
+        self.sleep(self._get_backoff(failures))
+
+    def _get_backoff(self, failures):
+        """Seconds to wait after failures in a row."""
+        return self.retry_backoff * 2 ** (failures - 1)
+
+    def _send_chunk(self, session, session_url, file_handle, offset):
+        file_handle.seek(offset)
+        return self._request(
+            session,
+            "POST",
+            session_url,
+            headers={"file_offset": str(offset)},
+            data=file_handle.read(self.chunk_size),
+        )
+
+    def _get_offset(self, session, session_url):
+        """Offset up to which the server received the file."""
+        return int(self._request(session, "GET", session_url)["file_offset"])
+
+    def _request(self, session, method, url, params=None, **kwargs):
+        res = session.request(
+            method,
+            url,
+            params=dict(params or {}, access_token=self.access_token),
+            timeout=self.timeout,
+            **kwargs
+        )
+        if res.status_code >= 500:
+            raise RetriableUploadError(
+                "Upload server responded {}".format(res.status_code)
+            )
+        try:
+            body = res.json()
+        except ValueError:
+            raise ValueError("Invalid JSON response")
+        if body.get("error"):
+            raise ValueError(pprint.pformat(body))
+        return body
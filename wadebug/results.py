@@ -8,7 +8,20 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 from wadebug.config import Config
 
 
+# keys of Result.stats, added to to_dict() when the stats were recorded
+STATS_FIELDS = ("duration_ms", "cpu_time_ms", "calls")
+# keys of Result.stats only present when the action recorded them
+OPTIONAL_STATS_FIELDS = ("observations",)
+
+
 class Result:
+    # dict with the STATS_FIELDS of the action run that produced this result,
+    # when it was recorded (see wa_actions.run_stats)
+    stats = None
+
+    # whether this result was reused from a previous run (see result_cache)
+    cached = False
+
     def to_dict(self):
         ret = {
             "class": self.action.__name__,
@@ -23,6 +36,11 @@ class Result:
         if Config().development_mode and hasattr(self, "traceback"):
             ret["traceback"] = self.traceback
 
+        if self.stats:
+            ret.update(self.stats)
+        if self.cached:
+            ret["cached"] = True
+
         return ret
 
     @property
@@ -33,12 +51,19 @@ class Result:
 
 class OK(Result):
     def to_dict(self):
-        return {
+        ret = {
             "class": self.action.__name__,
             "user_facing_name": self.action.user_facing_name,
             "result": self.__class__.__name__,
         }
 
+        if self.stats:
+            ret.update(self.stats)
+        if self.cached:
+            ret["cached"] = True
+
+        return ret
+
     def __init__(self, action):
         self.action = action
 
@@ -69,7 +94,42 @@ class Problem(_NotOK):
     pass
 
 
+class TimedOut(_NotOK):
+    @property
+    def result(self):
+        return "timed_out"
+
+
 class WADebugError(_NotOK):
     @property
     def result(self):
         return "wadebug_error"
+
+
+def from_dict(action, payload):
+    """Rebuild a result of action from its to_dict() payload."""
+    result_class = {
+        "ok": OK,
+        "warning": Warning,
+        "skipped": Skipped,
+        "problem": Problem,
+        "timed_out": TimedOut,
+        "wadebug_error": WADebugError,
+    }[payload["result"].lower()]
+
+    if result_class is OK:
+        res = OK(action)
+    else:
+        res = result_class(
+            action, payload["message"], payload["details"], payload["remediation"]
+        )
+        if "traceback" in payload:
+            res.traceback = payload["traceback"]
+
+    if all(field in payload for field in STATS_FIELDS):
+        res.stats = {
+            field: payload[field]
+            for field in STATS_FIELDS + OPTIONAL_STATS_FIELDS
+            if field in payload
+        }
+    return res
@@ -5,12 +5,15 @@
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import json
 import unittest
 from io import BytesIO
 
 from unittest.mock import patch
 
 from wadebug.analytics import Analytics, Events
+from wadebug.log_upload import ResumableUpload, UploadSessionError
+from wadebug.version import get_version
 
 
 def mocked_requests_post(*args, **kwargs):
@@ -32,7 +35,7 @@ class TestAnalytics(unittest.TestCase):
             "event_type": Events.RUN_ACTIONS_AND_SEND_RESULTS,
             "event_data": "test_payload",
             "phone_number": None,
-            "version": Analytics.VERSION,
+            "version": get_version(),
         }
         run_id = Analytics.send_event(
             Events.RUN_ACTIONS_AND_SEND_RESULTS, "test_payload"
@@ -52,19 +55,55 @@ class TestAnalytics(unittest.TestCase):
         expected_post_data = {
             "access_token": Analytics.CLIENT_TOKEN,
             "event_type": Events.SEND_LOGS,
-            "event_data": "none",
+            "event_data": json.dumps({"logs_archive_handle": "1234handle"}),
             "phone_number": None,
-            "version": Analytics.VERSION,
+            "version": get_version(),
         }
-        expected_files_param = {
-            "logs_archive": ("wadebug_logs.zip", dummy_log_file, "application/zip")
-        }
-        run_id = Analytics.send_logs_to_fb(dummy_log_file)
+        with patch.object(
+            ResumableUpload, "upload", return_value="1234handle"
+        ) as mock_upload:
+            run_id = Analytics.send_logs_to_fb(dummy_log_file)
+
+        mock_upload.assert_called_with(
+            dummy_log_file, "wadebug_logs.zip", "application/zip"
+        )
         assert mock_request_post.call_count == 1
         mock_request_post.assert_called_with(
             url=Analytics.API_ENDPOINT,
             data=expected_post_data,
             timeout=Analytics.TIMEOUT,
-            files=expected_files_param,
+            files=None,
         )
         assert run_id is not None
+
+    @patch("requests.post", side_effect=mocked_requests_post)
+    def test_send_logs_to_fb_without_upload_session(self, mock_request_post):
+        dummy_log_file = BytesIO(b"not important")
+        dummy_log_file.seek(0, 2)
+
+        with patch.object(
+            ResumableUpload, "upload", side_effect=UploadSessionError("rejected")
+        ):
+            run_id = Analytics.send_logs_to_fb(dummy_log_file)
+
+        _, kwargs = mock_request_post.call_args
+        assert kwargs["data"]["event_data"] == "none"
+        assert kwargs["files"]["logs_archive"][1] is dummy_log_file
+        # sent from the start
+        assert dummy_log_file.tell() == 0
+        assert run_id is not None
+
+    @patch("requests.post", side_effect=mocked_requests_post)
+    def test_send_batch(self, mock_request_post):
+        compressed_events = b"not important"
+        Analytics.send_batch(compressed_events)
+
+        _, kwargs = mock_request_post.call_args
+        assert kwargs["data"]["event_type"] == Events.SEND_EVENTS_BATCH
+        assert kwargs["files"] == {
+            "events_batch": (
+                "wadebug_events.jsonl.gz",
+                compressed_events,
+                "application/gzip",
+            )
+        }
@@ -0,0 +1,131 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import gzip
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from wadebug import analytics_spool, exceptions
+from wadebug.analytics import Analytics, Events
+from wadebug.analytics_spool import AnalyticsSpool
+
+
+def decompress_events(compressed_events):
+    lines = gzip.decompress(compressed_events).decode("utf-8").splitlines()
+    return [json.loads(line) for line in lines]
+
+
+class TestAnalyticsSpool(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.spool = AnalyticsSpool(self.cache_dir)
+
+    def age(self, path, seconds):
+        mtime = time.time() - seconds
+        os.utime(path, (mtime, mtime))
+
+    def test_should_send_pending_events_as_one_compressed_batch(self):
+        self.spool.append(Events.RUN_ACTIONS_AND_SEND_RESULTS, "first", "+1555")
+        self.spool.append(Events.RUN_ACTIONS_AND_SEND_RESULTS, "second")
+
+        with patch.object(Analytics, "send_batch") as mock_send_batch:
+            assert self.spool.flush() == 2
+
+        mock_send_batch.assert_called_once()
+        events = decompress_events(mock_send_batch.call_args[0][0])
+        assert [e["event_data"] for e in events] == ["first", "second"]
+        assert events[0]["phone_number"] == "+1555"
+        assert events[0]["event_type"] == Events.RUN_ACTIONS_AND_SEND_RESULTS
+        assert self.spool.get_pending() == []
+
+    def test_should_keep_events_when_batch_is_not_sent(self):
+        self.spool.append(Events.RUN_ACTIONS_AND_SEND_RESULTS, "{}")
+
+        with patch.object(
+            Analytics, "send_batch", side_effect=exceptions.FBNetworkError("offline")
+        ):
+            with self.assertRaises(exceptions.FBNetworkError):
+                self.spool.flush()
+
+        assert len(self.spool.get_pending()) == 1
+        # the lock is released for the next flush
+        assert not os.path.exists(self.spool.get_lock_path())
+
+    def test_should_split_batches_past_max_batch_events(self):
+        for _ in range(3):
+            self.spool.append(Events.RUN_ACTIONS_AND_SEND_RESULTS, "{}")
+
+        with patch.object(analytics_spool, "MAX_BATCH_EVENTS", 2), patch.object(
+            Analytics, "send_batch"
+        ) as mock_send_batch:
+            assert self.spool.flush() == 3
+
+        assert [
+            len(decompress_events(call[0][0]))
+            for call in mock_send_batch.call_args_list
+        ] == [2, 1]
+
+    def test_should_not_flush_while_another_flush_holds_the_lock(self):
+        self.spool.append(Events.RUN_ACTIONS_AND_SEND_RESULTS, "{}")
+        open(self.spool.get_lock_path(), "w").close()
+
+        with patch.object(Analytics, "send_batch") as mock_send_batch:
+            assert self.spool.flush() == 0
+            mock_send_batch.assert_not_called()
+
+            # until it is too old to be a flush still running
+            self.age(self.spool.get_lock_path(), analytics_spool.LOCK_MAX_AGE + 1)
+            assert self.spool.flush() == 1
+
+    def test_should_drop_events_past_max_age(self):
+        old = self.spool.append(Events.RUN_ACTIONS_AND_SEND_RESULTS, "old")
+        self.age(old, self.spool.max_age + 1)
+
+        recent = self.spool.append(Events.RUN_ACTIONS_AND_SEND_RESULTS, "recent")
+
+        assert self.spool.get_pending() == [recent]
+
+    def test_should_drop_oldest_events_past_max_bytes(self):
+        first = self.spool.append(Events.RUN_ACTIONS_AND_SEND_RESULTS, "x" * 100)
+        # room for two events, whatever the length of their created_at
+        self.spool.max_bytes = os.path.getsize(first) * 2 + 10
+
+        second = self.spool.append(Events.RUN_ACTIONS_AND_SEND_RESULTS, "x" * 100)
+        third = self.spool.append(Events.RUN_ACTIONS_AND_SEND_RESULTS, "x" * 100)
+
+        assert self.spool.get_pending() == [second, third]
+
+    def test_should_send_events_with_the_last_batch(self):
+        for _ in range(3):
+            self.spool.append(Events.RUN_ACTIONS_AND_SEND_RESULTS, "pending")
+        event = analytics_spool.build_event(Events.RUN_ACTIONS_AND_SEND_RESULTS, "new")
+
+        with patch.object(analytics_spool, "MAX_BATCH_EVENTS", 2), patch.object(
+            Analytics, "send_batch"
+        ) as mock_send_batch:
+            assert self.spool.flush([event]) == 4
+
+        assert [
+            [e["event_data"] for e in decompress_events(call[0][0])]
+            for call in mock_send_batch.call_args_list
+        ] == [["pending", "pending"], ["pending", "new"]]
+
+    def test_should_send_events_while_another_flush_holds_the_lock(self):
+        self.spool.append(Events.RUN_ACTIONS_AND_SEND_RESULTS, "pending")
+        open(self.spool.get_lock_path(), "w").close()
+        event = analytics_spool.build_event(Events.RUN_ACTIONS_AND_SEND_RESULTS, "new")
+
+        with patch.object(Analytics, "send_batch") as mock_send_batch:
+            assert self.spool.flush([event]) == 1
+
+        events = decompress_events(mock_send_batch.call_args[0][0])
+        assert [e["event_data"] for e in events] == ["new"]
+        assert len(self.spool.get_pending()) == 1
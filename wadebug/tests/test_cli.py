@@ -5,13 +5,22 @@
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import json
 import os
+import tempfile
+import threading
+import time
 import traceback
 import unittest
 from unittest.mock import patch
 
 import pytest
-from wadebug import cli
+from click.testing import CliRunner
+from wadebug import cli, results, upgrade_check
+from wadebug.analytics import Analytics
+from wadebug.analytics_spool import AnalyticsSpool
+from wadebug.wa_actions import last_run
+from wadebug.wa_actions.implementations.dummy_action import DummyOKAction
 
 
 class TestCli(unittest.TestCase):
@@ -26,6 +35,36 @@ class TestCli(unittest.TestCase):
                 )
             )
 
+    @patch("wadebug.cli.get_version", return_value="0.1.5")
+    @patch("wadebug.upgrade_check.UpgradeCheck.start")
+    def test_should_print_upgrade_notice_after_the_command(self, mock_start, *_):
+        check = upgrade_check.UpgradeCheck("0.1.5", "unused")
+        check.latest_version = "0.2.0"
+        check._done.set()
+        mock_start.return_value = check
+        calls = []
+
+        with patch(
+            "wadebug.cli.debug_json", side_effect=lambda *_: calls.append("run")
+        ), patch(
+            "click.secho", side_effect=lambda *args, **kwargs: calls.append(kwargs)
+        ):
+            cli.debug_implementation([], json_output=True, opt_out=True)
+
+        assert calls[0] == "run"
+        # on stderr, json output stays valid
+        assert calls[1]["err"]
+
+    @patch("wadebug.cli.get_version", return_value="0.1.5")
+    @patch("wadebug.upgrade_check.UpgradeCheck.start")
+    def test_should_not_check_for_upgrades_of_commands_without_actions(
+        self, mock_start, *_
+    ):
+        result = CliRunner().invoke(cli.main, ["ls"], obj={})
+
+        assert result.exit_code == 0
+        mock_start.assert_not_called()
+
     @patch("wadebug.cli.main", side_effect=Exception("something goes wrong!"))
     @patch.dict(os.environ, {"WADEBUG_DEV_MODE": "True"})
     def test_cli_should_throw_in_dev_mode(self, mock_main):
@@ -38,3 +77,245 @@ class TestCli(unittest.TestCase):
             )
         except Exception:
             pass
+
+
+class MockAction:
+    def __init__(self, user_facing_name):
+        self.__name__ = user_facing_name
+        self.user_facing_name = user_facing_name
+
+
+class TestExecuteActions(unittest.TestCase):
+    @patch("wadebug.cli.load_config", return_value={})
+    def test_should_keep_results_in_requested_order(self, *_):
+        actions = [MockAction("first"), MockAction("second"), MockAction("third")]
+        finished = [
+            results.OK(actions[2]),
+            results.OK(actions[0]),
+            results.OK(actions[1]),
+        ]
+
+        with patch("wadebug.wa_actions.run_actions", return_value=iter(finished)):
+            result = cli.execute_actions(actions, {"jobs": 3})
+
+        assert list(result.keys()) == ["first", "second", "third"]
+
+
+class TestWatch(unittest.TestCase):
+    @patch("wadebug.cli.load_config", return_value={})
+    def test_should_print_changed_results_as_json_lines(self, *_):
+        action = MockAction("action")
+        action.short_description = ""
+        cycles = [
+            (0, [results.OK(action)]),
+            (1, [results.Problem(action, "message", "details", "remediation")]),
+        ]
+
+        with patch(
+            "wadebug.cli.process_input_actions", return_value=([action], [])
+        ), patch("wadebug.wa_actions.watch_actions", return_value=iter(cycles)):
+            result = CliRunner().invoke(
+                cli.main, ["watch", "action", "--json"], obj={}
+            )
+
+        lines = [json.loads(line) for line in result.output.splitlines()]
+        assert [(line["cycle"], line["result"]) for line in lines] == [
+            (0, "OK"),
+            (1, "problem"),
+        ]
+
+    @patch("wadebug.cli.load_config", return_value={})
+    def test_should_print_failed_runs_and_keep_watching(self, *_):
+        action = MockAction("action")
+        action.short_description = ""
+
+        def watch_actions(acts, config, interval, on_error, **kwargs):
+            on_error(RuntimeError("docker is gone"))
+            yield 1, [results.OK(action)]
+
+        with patch(
+            "wadebug.cli.process_input_actions", return_value=([action], [])
+        ), patch("wadebug.wa_actions.watch_actions", watch_actions):
+            result = CliRunner().invoke(
+                cli.main, ["watch", "action", "--json"], obj={}
+            )
+
+        assert result.exit_code == 0
+        error, res = [json.loads(line) for line in result.output.splitlines()]
+        assert error["details"] == "docker is gone"
+        assert (res["cycle"], res["result"]) == (1, "OK")
+
+
+class TestJsonStream(unittest.TestCase):
+    def test_should_print_a_line_per_result_then_a_summary(self):
+        with tempfile.TemporaryDirectory() as cache_dir, patch.dict(
+            os.environ, {"WADEBUG_CACHE_DIR": cache_dir}
+        ):
+            result = CliRunner().invoke(
+                cli.main,
+                [
+                    "partial",
+                    "dummy_ok_action",
+                    "dummy_problem_action",
+                    "--json-stream",
+                    "--do-not-send-usage",
+                ],
+                obj={},
+            )
+
+        lines = [json.loads(line) for line in result.output.splitlines()]
+        assert [line["record"] for line in lines] == ["result", "result", "summary"]
+        assert {line["user_facing_name"] for line in lines[:2]} == {
+            "dummy_ok_action",
+            "dummy_problem_action",
+        }
+        assert lines[2]["total"] == 2
+        assert lines[2]["results"] == {"ok": 1, "problem": 1}
+
+    def test_should_print_invalid_actions_as_an_error_record(self):
+        result = CliRunner().invoke(
+            cli.main, ["partial", "no_such_action", "--json-stream"], obj={}
+        )
+
+        line = json.loads(result.output)
+        assert line["record"] == "error"
+        assert line["actions_not_found"] == ["no_such_action"]
+
+    @patch("wadebug.cli.load_config", return_value={})
+    def test_should_stream_the_results_of_watch(self, *_):
+        action = MockAction("action")
+        action.short_description = ""
+
+        with patch(
+            "wadebug.cli.process_input_actions", return_value=([action], [])
+        ), patch(
+            "wadebug.wa_actions.watch_actions",
+            return_value=iter([(0, [results.OK(action)])]),
+        ):
+            result = CliRunner().invoke(
+                cli.main, ["--json-stream", "watch", "action"], obj={}
+            )
+
+        line = json.loads(result.output)
+        assert (line["record"], line["cycle"], line["result"]) == ("result", 0, "OK")
+
+    @patch("wadebug.cli.load_config", return_value={})
+    def test_should_print_results_before_the_run_is_interrupted(self, *_):
+        action = MockAction("action")
+        action.short_description = ""
+
+        def run_actions(*args, **kwargs):
+            yield results.OK(action)
+            raise KeyboardInterrupt()
+
+        with patch("wadebug.wa_actions.run_actions", side_effect=run_actions):
+            result = CliRunner().invoke(
+                cli.main, ["full", "--json-stream", "--do-not-send-usage"], obj={}
+            )
+
+        assert json.loads(result.output.splitlines()[0])["user_facing_name"] == (
+            "action"
+        )
+        assert "summary" not in result.output
+
+
+class TestResultsUpload(unittest.TestCase):
+    @patch("wadebug.cli_utils.UPLOAD_WAIT", 0.1)
+    @patch("wadebug.cli_utils.get_phone_number", return_value=None)
+    def test_should_not_wait_for_a_slow_upload_past_upload_wait(self, *_):
+        uploaded = threading.Event()
+        with tempfile.TemporaryDirectory() as cache_dir, patch.dict(
+            os.environ, {"WADEBUG_CACHE_DIR": cache_dir}
+        ), patch.object(
+            Analytics, "send_event", side_effect=lambda *args: uploaded.wait(5)
+        ):
+            started_at = time.monotonic()
+            result = CliRunner().invoke(
+                cli.main, ["partial", "dummy_ok_action", "--json"], obj={}
+            )
+            elapsed = time.monotonic() - started_at
+            uploaded.set()
+
+        assert "dummy_ok_action" in json.loads(result.output)
+        assert elapsed < 2
+
+    @patch("wadebug.cli_utils.get_phone_number", return_value=None)
+    def test_should_send_results_in_json_right_away(self, *_):
+        with tempfile.TemporaryDirectory() as cache_dir, patch.dict(
+            os.environ, {"WADEBUG_CACHE_DIR": cache_dir}
+        ), patch.object(Analytics, "send_event") as mock_send_event:
+            result = CliRunner().invoke(
+                cli.main, ["partial", "dummy_ok_action", "--json"], obj={}
+            )
+            pending = AnalyticsSpool(cache_dir).get_pending()
+
+        assert result.exit_code == 0
+        mock_send_event.assert_called_once()
+        assert pending == []
+
+
+class TestServeMetrics(unittest.TestCase):
+    @patch("wadebug.cli.load_config_interactive", return_value={})
+    @patch("wadebug.wa_actions.metrics.serve_metrics")
+    def test_should_serve_metrics_of_actions_on_port(self, mock_serve, *_):
+        action = MockAction("action")
+        with patch("wadebug.cli.process_input_actions", return_value=([action], [])):
+            result = CliRunner().invoke(
+                cli.main,
+                ["serve-metrics", "action", "--port", "9100", "--interval", "5m"],
+                obj={},
+            )
+
+        assert result.exit_code == 0
+        args, kwargs = mock_serve.call_args
+        assert args == ([action], {}, cli.DEFAULT_METRICS_ADDRESS, 9100, 300)
+        assert kwargs["jobs"] == cli.DEFAULT_JOBS
+        # durations of cached results would be those of old runs
+        assert kwargs["cache"] is None
+
+
+class TestRerun(unittest.TestCase):
+    def test_should_only_execute_failed_actions_again(self):
+        with tempfile.TemporaryDirectory() as cache_dir, patch.dict(
+            os.environ, {"WADEBUG_CACHE_DIR": cache_dir}
+        ):
+            last_run.save(
+                cache_dir,
+                {
+                    "dummy_ok_action": {
+                        "user_facing_name": "dummy_ok_action",
+                        "result": "OK",
+                    },
+                    "dummy_problem_action": {
+                        "user_facing_name": "dummy_problem_action",
+                        "result": "problem",
+                    },
+                },
+            )
+
+            with patch.object(
+                DummyOKAction, "_run", side_effect=Exception("should not run")
+            ):
+                result = CliRunner().invoke(
+                    cli.main,
+                    ["rerun", "--failed", "--json", "--do-not-send-usage"],
+                    obj={},
+                )
+
+            output = json.loads(result.output)
+            assert list(output) == ["dummy_ok_action", "dummy_problem_action"]
+            assert output["dummy_ok_action"]["result"] == "OK"
+            assert output["dummy_ok_action"]["cached"]
+            assert output["dummy_problem_action"]["result"] == "problem"
+            assert "duration_ms" in output["dummy_problem_action"]
+            # the merged results are the new last run
+            assert last_run.load(cache_dir) == list(output.values())
+
+    def test_should_fail_without_last_run(self):
+        with tempfile.TemporaryDirectory() as cache_dir, patch.dict(
+            os.environ, {"WADEBUG_CACHE_DIR": cache_dir}
+        ):
+            result = CliRunner().invoke(cli.main, ["rerun", "--json"], obj={})
+
+        assert result.exit_code != 0
+        assert "error" in json.loads(result.output)
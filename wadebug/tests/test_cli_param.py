@@ -0,0 +1,27 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import unittest
+
+import click
+from wadebug.cli_param import Duration
+
+
+class TestDuration(unittest.TestCase):
+    def test_should_convert_durations_to_seconds(self):
+        duration = Duration()
+
+        assert duration.convert("500ms", None, None) == 0.5
+        assert duration.convert("10s", None, None) == 10
+        assert duration.convert("2m", None, None) == 120
+        assert duration.convert("1h", None, None) == 3600
+        assert duration.convert("15", None, None) == 15
+
+    def test_should_fail_on_invalid_durations(self):
+        for value in ["", "ten seconds", "10x", "0s", "-5s"]:
+            with self.assertRaises(click.BadParameter):
+                Duration().convert(value, None, None)
@@ -5,13 +5,17 @@
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import os
+import tempfile
+import threading
 import unittest
 from io import BytesIO
 
 from unittest.mock import Mock, patch
 
-from wadebug import cli_utils
-from wadebug.analytics import Analytics
+from wadebug import cli_utils, exceptions
+from wadebug.analytics import Analytics, Events
+from wadebug.analytics_spool import AnalyticsSpool
 
 
 class TestSendResultsToFB(unittest.TestCase):
@@ -40,6 +44,120 @@ class TestSendResultsToFB(unittest.TestCase):
             mock_failure_callback.assert_called_with(mock_exception)
 
 
+class TestSpoolResults(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        patcher = patch.dict(os.environ, {"WADEBUG_CACHE_DIR": self.cache_dir})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.spool = AnalyticsSpool(self.cache_dir)
+
+    def test_should_spool_result_not_sent_for_network_error(self):
+        mock_failure_callback = Mock()
+        network_error = exceptions.FBNetworkError("offline")
+
+        with patch.object(Analytics, "send_event", side_effect=network_error):
+            cli_utils.send_results_to_fb(
+                {"dummy_action": {"result": "OK"}},
+                failure_callback=mock_failure_callback,
+                phone_number_lookup=Mock(result=Mock(return_value=None)),
+            )
+
+        mock_failure_callback.assert_called_with(network_error)
+        assert len(self.spool.get_pending()) == 1
+
+    def test_should_flush_spool_once_result_is_sent(self):
+        self.spool.append(Events.RUN_ACTIONS_AND_SEND_RESULTS, "{}")
+
+        with patch.object(
+            Analytics, "send_event", return_value="1234abcd"
+        ), patch.object(Analytics, "send_batch") as mock_send_batch:
+            cli_utils.send_results_to_fb(
+                {}, phone_number_lookup=Mock(result=Mock(return_value=None))
+            )
+
+        mock_send_batch.assert_called_once()
+        assert self.spool.get_pending() == []
+
+    def test_should_send_batched_result_right_away(self):
+        with patch.object(
+            Analytics, "send_event", return_value="1234abcd"
+        ) as mock_send_event, patch.object(Analytics, "send_batch") as mock_send_batch:
+            cli_utils.send_results_to_fb_batched(
+                {"dummy_action": {"result": "OK"}},
+                Mock(result=Mock(return_value=None)),
+            )
+
+        mock_send_event.assert_called_once()
+        mock_send_batch.assert_not_called()
+        assert self.spool.get_pending() == []
+
+    def test_should_send_batched_result_with_spooled_results(self):
+        self.spool.append(Events.RUN_ACTIONS_AND_SEND_RESULTS, "{}")
+
+        with patch.object(Analytics, "send_event") as mock_send_event, patch.object(
+            Analytics, "send_batch"
+        ) as mock_send_batch:
+            cli_utils.send_results_to_fb_batched(
+                {"dummy_action": {"result": "OK"}},
+                Mock(result=Mock(return_value=None)),
+            )
+
+        mock_send_event.assert_not_called()
+        # one request for both
+        mock_send_batch.assert_called_once()
+        assert self.spool.get_pending() == []
+
+    def test_should_spool_batched_result_when_facebook_is_unreachable(self):
+        self.spool.append(Events.RUN_ACTIONS_AND_SEND_RESULTS, "{}")
+
+        with patch.object(
+            Analytics, "send_batch", side_effect=exceptions.FBNetworkError("offline")
+        ):
+            cli_utils.send_results_to_fb_batched(
+                {"dummy_action": {"result": "OK"}},
+                Mock(result=Mock(return_value=None)),
+            )
+
+        assert len(self.spool.get_pending()) == 2
+
+
+class TestSendResultsToFBInBackground(unittest.TestCase):
+    def test_should_send_a_copy_of_result_with_phone_number_looked_up(self):
+        mock_success_callback = Mock()
+        mock_result = {"dummy_action": {"result": "OK"}}
+
+        with patch.object(
+            cli_utils, "get_phone_number", return_value="+15555550100"
+        ), patch.object(Analytics, "send_event", return_value="1234abcd"):
+            lookup = cli_utils.start_phone_number_lookup()
+            upload = cli_utils.send_results_to_fb_in_background(
+                mock_result, lookup, mock_success_callback
+            )
+
+            assert cli_utils.wait_for_upload(upload, timeout=5)
+            assert Analytics.send_event.call_args[0][2] == "+15555550100"
+
+        sent = mock_success_callback.call_args[0][0]
+        assert sent["run_id"] == "1234abcd"
+        # the caller's result is left as is
+        assert "run_id" not in mock_result
+
+    def test_should_stop_waiting_for_upload_after_timeout(self):
+        sent = threading.Event()
+
+        with patch.object(
+            cli_utils, "get_phone_number", return_value=None
+        ), patch.object(
+            Analytics, "send_event", side_effect=lambda *args: sent.wait(5)
+        ):
+            upload = cli_utils.send_results_to_fb_in_background({})
+
+            assert not cli_utils.wait_for_upload(upload, timeout=0.05)
+            sent.set()
+            assert cli_utils.wait_for_upload(upload, timeout=5)
+
+
 class TestSendLogsToFB(unittest.TestCase):
     def test_should_call_success_callback_with_run_id(self):
         mock_success_callback = Mock()
@@ -5,6 +5,7 @@
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import os
 import unittest
 
 from unittest.mock import patch
@@ -51,3 +52,29 @@ class TestConfig(unittest.TestCase):
         ):
             assert Config().load_error == ConfigLoadError.CONFIG_MISSING
             assert Config().values == {}
+
+    def test_should_read_docker_client_settings_from_environment(self):
+        with patch.dict(
+            os.environ,
+            {
+                "WADEBUG_DOCKER_POOL_SIZE": "32",
+                "WADEBUG_DOCKER_TIMEOUT": "5.5",
+                "WADEBUG_DOCKER_KEEP_ALIVE": "False",
+            },
+        ):
+            config = Config()
+
+        assert config.docker_pool_size == 32
+        assert config.docker_timeout == 5.5
+        assert config.docker_keep_alive is False
+
+    def test_should_ignore_invalid_docker_client_settings(self):
+        with patch.dict(
+            os.environ,
+            {"WADEBUG_DOCKER_POOL_SIZE": "many", "WADEBUG_DOCKER_TIMEOUT": "-1"},
+        ):
+            config = Config()
+
+        assert config.docker_pool_size == Config.DEFAULT_DOCKER_POOL_SIZE
+        assert config.docker_timeout == Config.DEFAULT_DOCKER_TIMEOUT
+        assert config.docker_keep_alive is True
@@ -0,0 +1,39 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import json
+import os
+import tempfile
+import unittest
+
+from wadebug.file_utils import write_json_atomically
+
+
+class TestWriteJsonAtomically(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def test_should_create_the_directory_and_replace_the_file(self):
+        path = os.path.join(self.directory, "cache", "data.json")
+
+        write_json_atomically(path, {"first": 1})
+        write_json_atomically(path, {"second": 2})
+
+        with open(path) as f:
+            assert json.load(f) == {"second": 2}
+        assert os.listdir(os.path.dirname(path)) == ["data.json"]
+
+    def test_should_keep_the_previous_file_when_writing_fails(self):
+        path = os.path.join(self.directory, "data.json")
+        write_json_atomically(path, {"first": 1})
+
+        with self.assertRaises(TypeError):
+            write_json_atomically(path, {"unserializable": object()})
+
+        with open(path) as f:
+            assert json.load(f) == {"first": 1}
+        assert os.listdir(self.directory) == ["data.json"]
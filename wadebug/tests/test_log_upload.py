@@ -0,0 +1,173 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import json
+import os
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from urllib.parse import parse_qs, urlparse
+
+from wadebug import exceptions
+from wadebug.log_upload import ResumableUpload, UploadSessionError
+
+ACCESS_TOKEN = "app|token"
+
+
+class FakeUploadServer(ThreadingHTTPServer):
+    """Stand-in for the resumable upload protocol of the Graph API.
+
+    failures lists, for each chunk request in order, None to handle it, or the
+    number of its bytes to keep before answering 503.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, failures=(), session_failures=0, stuck=False):
+        super(FakeUploadServer, self).__init__(
+            ("127.0.0.1", 0), FakeUploadRequestHandler
+        )
+        self.failures = list(failures)
+        # requests to create a session answered 503 first
+        self.session_failures = session_failures
+        # whether chunks are answered without advancing the offset
+        self.stuck = stuck
+        self.sessions = {}
+        self.chunk_sizes = []
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:{}".format(self.server_address[1])
+
+
+class FakeUploadRequestHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if query.get("access_token") != [ACCESS_TOKEN]:
+            return self.respond(400, {"error": {"message": "Invalid token"}})
+
+        if url.path == "/uploads":
+            if self.server.session_failures:
+                self.server.session_failures -= 1
+                return self.respond(503, {})
+            session_id = "upload:{}".format(len(self.server.sessions))
+            self.server.sessions[session_id] = {
+                "length": int(query["file_length"][0]),
+                "data": b"",
+            }
+            return self.respond(200, {"id": session_id})
+
+        session = self.server.sessions[url.path[1:]]
+        chunk = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.chunk_sizes.append(len(chunk))
+        if int(self.headers["file_offset"]) != len(session["data"]):
+            return self.respond(400, {"error": {"message": "Wrong file_offset"}})
+
+        if self.server.stuck:
+            return self.respond(200, {"file_offset": len(session["data"])})
+
+        failure = self.server.failures.pop(0) if self.server.failures else None
+        if failure is not None:
+            session["data"] += chunk[:failure]
+            return self.respond(503, {})
+
+        session["data"] += chunk
+        if len(session["data"]) == session["length"]:
+            return self.respond(200, {"h": "handle:{}".format(url.path[1:])})
+        return self.respond(200, {"file_offset": len(session["data"])})
+
+    def do_GET(self):
+        session = self.server.sessions[urlparse(self.path).path[1:]]
+        self.respond(200, {"file_offset": len(session["data"])})
+
+    def respond(self, status, body):
+        content = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestResumableUpload(unittest.TestCase):
+    def start_server(self, failures=(), **kwargs):
+        server = FakeUploadServer(failures, **kwargs)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def upload(self, server, content, **kwargs):
+        upload = ResumableUpload(
+            server.url + "/uploads",
+            server.url,
+            ACCESS_TOKEN,
+            chunk_size=10,
+            sleep=lambda seconds: None,
+            **kwargs
+        )
+        return upload.upload(BytesIO(content), "logs.zip", "application/zip")
+
+    def test_should_upload_file_in_chunks(self):
+        server = self.start_server()
+        content = os.urandom(25)
+
+        handle = self.upload(server, content)
+
+        assert handle == "handle:upload:0"
+        assert server.sessions["upload:0"]["data"] == content
+        assert server.chunk_sizes == [10, 10, 5]
+
+    def test_should_resume_from_acknowledged_offset_after_failure(self):
+        # the second chunk is only partly received
+        server = self.start_server(failures=[None, 4])
+        content = os.urandom(25)
+
+        self.upload(server, content)
+
+        assert server.sessions["upload:0"]["data"] == content
+        # the rest of the file is sent from offset 14, not from the start
+        assert server.chunk_sizes == [10, 10, 10, 1]
+
+    def test_should_raise_network_error_after_max_retries(self):
+        server = self.start_server(failures=[0, 0, 0])
+
+        with self.assertRaises(exceptions.FBNetworkError):
+            self.upload(server, os.urandom(25), max_retries=2)
+
+    def test_should_not_retry_errors_of_the_server(self):
+        server = self.start_server()
+        upload = ResumableUpload(
+            server.url + "/uploads", server.url, "wrong|token", chunk_size=10
+        )
+
+        with self.assertRaises(UploadSessionError):
+            upload.upload(BytesIO(b"logs"), "logs.zip", "application/zip")
+        assert server.sessions == {}
+
+    def test_should_retry_creating_the_session(self):
+        server = self.start_server(session_failures=2)
+        content = os.urandom(25)
+
+        self.upload(server, content)
+
+        assert server.sessions["upload:0"]["data"] == content
+
+    def test_should_fail_when_offset_does_not_advance(self):
+        server = self.start_server(stuck=True)
+
+        with self.assertRaises(exceptions.FBNetworkError):
+            self.upload(server, os.urandom(25), max_retries=2)
+
+        assert len(server.chunk_sizes) == 3
@@ -0,0 +1,45 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import unittest
+
+from wadebug import results
+from wadebug.wa_actions.implementations.dummy_action import (
+    DummyOKAction,
+    DummyProblemAction,
+)
+
+
+class TestFromDict(unittest.TestCase):
+    def test_should_rebuild_ok_result(self):
+        res = results.from_dict(DummyOKAction, results.OK(DummyOKAction).to_dict())
+
+        assert isinstance(res, results.OK)
+        assert res.action is DummyOKAction
+
+    def test_should_rebuild_not_ok_results(self):
+        for result_class in [
+            results.Warning,
+            results.Skipped,
+            results.Problem,
+            results.TimedOut,
+            results.WADebugError,
+        ]:
+            original = result_class(DummyProblemAction, "message", "details", "fix")
+
+            res = results.from_dict(DummyProblemAction, original.to_dict())
+
+            assert res.__class__ is result_class
+            assert res.to_dict() == original.to_dict()
+
+    def test_should_keep_stats(self):
+        original = results.Problem(DummyProblemAction, "message", "details", "fix")
+        original.stats = {"duration_ms": 1.5, "cpu_time_ms": 0.5, "calls": {"sql": 1}}
+
+        res = results.from_dict(DummyProblemAction, original.to_dict())
+
+        assert res.stats == original.stats
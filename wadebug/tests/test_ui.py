@@ -54,3 +54,24 @@ class TestUi(unittest.TestCase):
                 call("    traceback line 1\n    traceback line 2"),
             ]
         )
+
+    @patch("click.secho")
+    def test_result_timings_are_printed_when_recorded(self, mock_secho):
+        mock_result = results.OK("mock_action")
+        mock_result.stats = {
+            "duration_ms": 120.5,
+            "cpu_time_ms": 3.2,
+            "calls": {"sql": 1, "docker_api": 4},
+        }
+
+        ui.print_result_timings(mock_result)
+
+        mock_secho.assert_called_once_with(
+            "    120.5ms (cpu 3.2ms) - 4 docker_api, 1 sql", dim=True
+        )
+
+    @patch("click.secho")
+    def test_result_timings_are_not_printed_when_not_recorded(self, mock_secho):
+        ui.print_result_timings(results.OK("mock_action"))
+
+        mock_secho.assert_not_called()
@@ -0,0 +1,110 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from wadebug import upgrade_check
+from wadebug.upgrade_check import UpgradeCheck
+
+
+class TestUpgradeCheck(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def write_cache(self, version, latest_version, checked_at):
+        with open(
+            os.path.join(self.cache_dir, upgrade_check.UPGRADE_CHECK_FILE), "w"
+        ) as f:
+            json.dump(
+                {
+                    "version": version,
+                    "latest_version": latest_version,
+                    "checked_at": checked_at,
+                },
+                f,
+            )
+
+    @patch("wadebug.upgrade_check.get_latest_version", return_value="0.2.0")
+    def test_should_ask_pypi_and_cache_the_answer(self, get_latest_version):
+        check = UpgradeCheck("0.1.5", self.cache_dir).start()
+
+        assert check.get_newer_version(timeout=5) == "0.2.0"
+        check = UpgradeCheck("0.1.5", self.cache_dir).start()
+        assert check.get_newer_version(timeout=5) == "0.2.0"
+        assert get_latest_version.call_count == 1
+        get_latest_version.assert_called_with(upgrade_check.TIMEOUT)
+
+    @patch(
+        "wadebug.upgrade_check.get_latest_version",
+        side_effect=Exception("no route to PyPI"),
+    )
+    def test_should_cache_failed_checks(self, get_latest_version):
+        check = UpgradeCheck("0.1.5", self.cache_dir).start()
+
+        assert check.get_newer_version(timeout=5) is None
+        assert str(check.exception) == "no route to PyPI"
+        assert (
+            UpgradeCheck("0.1.5", self.cache_dir).start().get_newer_version(0) is None
+        )
+        assert get_latest_version.call_count == 1
+
+    @patch("wadebug.upgrade_check.get_latest_version", return_value="0.1.5")
+    def test_should_check_again_when_cache_expired_or_version_changed(
+        self, get_latest_version
+    ):
+        self.write_cache("0.1.5", "0.2.0", time.time() - upgrade_check.MAX_AGE - 1)
+        assert (
+            UpgradeCheck("0.1.5", self.cache_dir).start().get_newer_version(5) is None
+        )
+
+        self.write_cache("0.1.4", "0.2.0", time.time())
+        assert (
+            UpgradeCheck("0.1.5", self.cache_dir).start().get_newer_version(5) is None
+        )
+
+        assert get_latest_version.call_count == 2
+
+    def test_should_not_wait_longer_than_timeout(self):
+        answered = threading.Event()
+
+        def slow_get_latest_version(timeout):
+            answered.wait(5)
+            return "0.2.0"
+
+        with patch(
+            "wadebug.upgrade_check.get_latest_version",
+            side_effect=slow_get_latest_version,
+        ):
+            check = UpgradeCheck("0.1.5", self.cache_dir).start()
+            started_at = time.monotonic()
+            assert check.get_newer_version(timeout=0.05) is None
+            assert time.monotonic() - started_at < 1
+            # a run exiting now does not ask PyPI again on the next one
+            assert UpgradeCheck("0.1.5", self.cache_dir).load() is not None
+            answered.set()
+            assert check.get_newer_version(timeout=5) == "0.2.0"
+
+    @patch("requests.get")
+    def test_should_ask_pypi_with_a_timeout(self, mock_get):
+        mock_get.return_value.json.return_value = {"info": {"version": "0.2.0"}}
+
+        assert upgrade_check.get_latest_version(3) == "0.2.0"
+        mock_get.assert_called_once_with(
+            upgrade_check.PYPI_URL.format(upgrade_check.PACKAGE), timeout=3
+        )
+
+    def test_should_compare_versions_by_number(self):
+        assert upgrade_check.parse_version("0.1.10") > upgrade_check.parse_version(
+            "0.1.9"
+        )
+        assert upgrade_check.parse_version("0.2.0rc1") == (0, 2, 0)
@@ -12,6 +12,7 @@ import os
 import click
 from wadebug import results
 from wadebug.config import Config
+from wadebug.wa_actions import profiling
 
 
 table_left_alignment = 63
@@ -22,6 +23,7 @@ color_map = {
     results.Warning: "yellow",
     results.Problem: "red",
     results.Skipped: "blue",
+    results.TimedOut: "red",
     results.WADebugError: "red",
 }
 
@@ -30,6 +32,7 @@ indicator_icon_map = {
     results.Warning: "!",
     results.Problem: "✗",
     results.Skipped: "-",
+    results.TimedOut: "✗",
     results.WADebugError: "✗",
 }
 
@@ -78,10 +81,38 @@ def print_result_details(result):
         click.echo(add_indentation_to_result_field(result.traceback))
 
 
+def print_result_timings(result):
+    """Print the duration and calls recorded for result, if any."""
+    if not result.stats:
+        return
+
+    timings = "{}ms".format(result.stats["duration_ms"])
+    if result.stats["cpu_time_ms"] is not None:
+        timings += " (cpu {}ms)".format(result.stats["cpu_time_ms"])
+    calls = ", ".join(
+        "{} {}".format(count, backend)
+        for backend, count in sorted(result.stats["calls"].items())
+    )
+    if calls:
+        timings += " - " + calls
+    if result.cached:
+        timings = "cached result, from a run of " + timings
+
+    click.secho(add_indentation_to_result_field(timings), dim=True)
+
+
 def add_indentation_to_result_field(str):
     return "\n".join(["    " + line for line in str.split("\n")])
 
 
+def print_profile_summary_location(profile_dir):
+    click.secho(
+        "Profiles written to {}. See {} for the slowest functions.".format(
+            profile_dir, os.path.join(profile_dir, profiling.SUMMARY_FILENAME)
+        )
+    )
+
+
 def print_invalid_config_message(config_file_path, ex):
     """Message to print when invalid yaml file is provided as config."""
     click.secho(
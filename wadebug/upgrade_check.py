@@ -0,0 +1,135 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import json
+import os
+import re
+import threading
+import time
+
+from wadebug.file_utils import write_json_atomically
+
+
+"""
+Check for a newer version of wadebug on PyPI without delaying the run.
+
+The check runs on a daemon thread while actions execute, and its answer is
+cached on disk for a day. Failed checks are cached too, so hosts that cannot
+reach PyPI only try once a day, in the background. The attempt is cached
+before PyPI is asked, so that a check still running when wadebug exits
+counts as failed instead of being tried again by every run.
+"""
+
+PACKAGE = "wadebug"
+PYPI_URL = "https://pypi.org/pypi/{}/json"
+UPGRADE_CHECK_FILE = "upgrade_check.json"
+# seconds an answer of PyPI is reused for
+MAX_AGE = 24 * 3600
+# seconds PyPI has to answer
+TIMEOUT = 5
+
+
+class UpgradeCheck(object):
+    def __init__(self, version, cache_dir, max_age=MAX_AGE, timeout=TIMEOUT):
+        self.version = version
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        self.timeout = timeout
+        self.latest_version = None
+        self.exception = None
+        self._done = threading.Event()
+
+    def start(self):
+        """Use the cached answer if still valid, or ask PyPI in the background."""
+        cached = self.load()
+        if cached is not None:
+            self.latest_version = cached["latest_version"]
+            self._done.set()
+            return self
+
+        # failed until PyPI answers
+        self.save()
+        thread = threading.Thread(target=self._check, name="wadebug-upgrade-check")
+        thread.daemon = True
+        thread.start()
+        return self
+
+    def get_newer_version(self, timeout):
+        """Latest version if newer than this one, waiting up to timeout seconds.
+
+        None when up to date, or when the check did not finish in time.
+        """
+        if not self._done.wait(timeout):
+            return None
+        if self.latest_version and self.latest_version != self.version:
+            return self.latest_version
+        return None
+
+    def _check(self):
+        try:
+            latest_version = get_latest_version(self.timeout)
+            if parse_version(latest_version) > parse_version(self.version):
+                self.latest_version = latest_version
+            else:
+                self.latest_version = self.version
+        except Exception as e:
+            self.exception = e
+        finally:
+            self.save()
+            self._done.set()
+
+    def get_path(self):
+        return os.path.join(self.cache_dir, UPGRADE_CHECK_FILE)
+
+    def load(self):
+        """Check cached for this version, None if missing or expired.
+
+        Its latest_version is None when the check failed.
+        """
+        try:
+            with open(self.get_path(), "r") as f:
+                cached = json.load(f)
+            if (
+                cached["version"] == self.version
+                and time.time() - cached["checked_at"] <= self.max_age
+            ):
+                return cached
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return None
+
+    def save(self):
+        try:
+            write_json_atomically(
+                self.get_path(),
+                {
+                    "version": self.version,
+                    "latest_version": self.latest_version,
+                    "checked_at": time.time(),
+                },
+            )
+        except OSError:
+            # checked again next time
+            pass
+
+
+def get_latest_version(timeout):
+    """Latest release of wadebug on PyPI, raises when not answered in time."""
+    # imported here, requests takes a while to import
+    import requests
+
+    response = requests.get(PYPI_URL.format(PACKAGE), timeout=timeout)
+    response.raise_for_status()
+    return response.json()["info"]["version"]
+
+
+def parse_version(version):
+    """Numbers of a release version, e.g. (0, 1, 5) for "0.1.5" or "0.1.5rc1"."""
+    match = re.match(r"\d+(\.\d+)*", version)
+    if match is None:
+        raise ValueError("Invalid version: {}".format(version))
+    return tuple(int(part) for part in match.group().split("."))
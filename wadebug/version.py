@@ -0,0 +1,27 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import functools
+
+
+UNKNOWN_VERSION = "unknown"
+
+
+@functools.lru_cache(maxsize=None)
+def get_version():
+    """Installed version of wadebug, looked up on first use.
+
+    importlib.metadata is much faster to import than pkg_resources, which
+    wadebug used before.
+    """
+    try:
+        from importlib.metadata import version
+
+        return version("wadebug")
+    except Exception:
+        # ignore when building from WhatsApp internal build system
+        return UNKNOWN_VERSION
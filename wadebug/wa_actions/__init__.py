@@ -5,5 +5,22 @@
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
-from wadebug.wa_actions.base import get_action_by_name, get_all_actions  # noqa
-from wadebug.wa_actions.implementations import *  # noqa
+from wadebug.wa_actions.base import (  # noqa
+    get_action_by_classname,
+    get_action_by_name,
+    get_action_descriptions,
+    get_all_actions,
+    run_actions,
+)
+from wadebug.wa_actions.watch import watch_actions  # noqa
+
+
+def __getattr__(name):
+    # action classes, e.g. wa_actions.CheckNetworkAction, are imported on access.
+    # other names may be submodules not imported yet, left to the import system
+    if name[:1].isupper():
+        try:
+            return get_action_by_classname(name)
+        except KeyError:
+            pass
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
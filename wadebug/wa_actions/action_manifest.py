@@ -0,0 +1,112 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+# Generated by `python -m wadebug.wa_actions.manifest`, do not edit.
+# flake8: noqa
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+
+ACTIONS = {
+    "containers_status": {
+        "module": "wadebug.wa_actions.implementations.check_containers",
+        "class": "CheckContainersAreUp",
+        "short_description": "Check if WA containers are running",
+        "config_dependencies": []
+    },
+    "check_db_settings_exist": {
+        "module": "wadebug.wa_actions.implementations.check_db_settings_exist",
+        "class": "CheckDbSettingsExist",
+        "short_description": "Test if required db settings are passed",
+        "config_dependencies": []
+    },
+    "check_mysql_connection": {
+        "module": "wadebug.wa_actions.implementations.check_mysql_connection",
+        "class": "CheckMySQLConnection",
+        "short_description": "Test if MySQL database can be connected",
+        "config_dependencies": [
+            "db.host",
+            "db.port",
+            "db.user",
+            "db.password"
+        ]
+    },
+    "check_mysql_password": {
+        "module": "wadebug.wa_actions.implementations.check_mysql_password",
+        "class": "CheckMySQLPassword",
+        "short_description": "Test if database password has any invalid characters",
+        "config_dependencies": [
+            "db.password"
+        ]
+    },
+    "check_mysql_permissions": {
+        "module": "wadebug.wa_actions.implementations.check_mysql_permissions",
+        "class": "CheckMySQLPermissions",
+        "short_description": "Test if the database have permissions to create database or tables",
+        "config_dependencies": [
+            "db.host",
+            "db.port",
+            "db.user",
+            "db.password"
+        ]
+    },
+    "check_mysql_version": {
+        "module": "wadebug.wa_actions.implementations.check_mysql_version",
+        "class": "CheckMySQLVersion",
+        "short_description": "Check MySQL version",
+        "config_dependencies": [
+            "db.host",
+            "db.port",
+            "db.user",
+            "db.password"
+        ]
+    },
+    "check_network": {
+        "module": "wadebug.wa_actions.implementations.check_network",
+        "class": "CheckNetworkAction",
+        "short_description": "Test if required hosts can be reached on specific port from the first running coreapp container.",
+        "config_dependencies": []
+    },
+    "check_software_version": {
+        "module": "wadebug.wa_actions.implementations.check_software_version",
+        "class": "CheckSoftwareVersion",
+        "short_description": "Action to test whether software version is up-to-date",
+        "config_dependencies": []
+    },
+    "check_webapp_port": {
+        "module": "wadebug.wa_actions.implementations.check_webapp_port",
+        "class": "CheckWebappPortAction",
+        "short_description": "Check if webapp maps container port 443 to host",
+        "config_dependencies": []
+    },
+    "check_webhook": {
+        "module": "wadebug.wa_actions.implementations.check_webhook",
+        "class": "CheckWebhookAction",
+        "short_description": "Test if the webhook is accessible and responsive",
+        "config_dependencies": [
+            "webapp.baseUrl",
+            "webapp.user",
+            "webapp.password"
+        ]
+    },
+    "dummy_ok_action": {
+        "module": "wadebug.wa_actions.implementations.dummy_action",
+        "class": "DummyOKAction",
+        "short_description": "Action to test that things work. Always returns OK.",
+        "config_dependencies": []
+    },
+    "dummy_problem_action": {
+        "module": "wadebug.wa_actions.implementations.dummy_action",
+        "class": "DummyProblemAction",
+        "short_description": "Action to test that things work. Always returns Problem.",
+        "config_dependencies": []
+    },
+    "dummy_wadebug_error_action": {
+        "module": "wadebug.wa_actions.implementations.dummy_action",
+        "class": "DummyWADebugErrorAction",
+        "short_description": "Action to test that things work. Always throws an Exception.",
+        "config_dependencies": []
+    }
+}
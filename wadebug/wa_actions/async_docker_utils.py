@@ -0,0 +1,144 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import asyncio
+import json
+import os
+import struct
+
+from wadebug import exceptions
+from wadebug.wa_actions import run_stats
+from wadebug.wa_actions.base import run_in_thread
+
+"""
+Coroutine versions of Docker helpers, for actions implementing WAAction._arun.
+
+The Docker SDK blocks a thread for every request. Commands executed in containers
+are instead sent to the Docker Engine API over the daemon unix socket with
+asyncio, so many of them can be in flight on a single event loop. When Docker is
+not reached through a unix socket, the SDK is used on a thread instead.
+"""
+
+DEFAULT_DOCKER_HOST = "unix:///var/run/docker.sock"
+UNIX_SOCKET_SCHEME = "unix://"
+
+
+def get_docker_socket_path():
+    """Path of the Docker daemon unix socket, None when DOCKER_HOST is not one."""
+    docker_host = os.environ.get("DOCKER_HOST") or DEFAULT_DOCKER_HOST
+    if docker_host.startswith(UNIX_SOCKET_SCHEME):
+        return docker_host[len(UNIX_SOCKET_SCHEME):]
+    return None
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Await a blocking call executed on a thread, keeping the event loop free."""
+    return await asyncio.wrap_future(run_in_thread(func, *args, **kwargs))
+
+
+async def exec_run(container, cmd):
+    """Coroutine equivalent of container.exec_run(cmd).
+
+    Returns a tuple (exit_code, output) where output has stdout and stderr.
+    """
+    run_stats.count_call(run_stats.DOCKER_EXEC)
+    socket_path = get_docker_socket_path()
+    if not socket_path:
+        return tuple(await run_blocking(container.exec_run, cmd))
+
+    exec_instance = await docker_api_request(
+        socket_path,
+        "POST",
+        "/containers/{}/exec".format(container.id),
+        {"AttachStdout": True, "AttachStderr": True, "Cmd": cmd},
+    )
+    exec_id = json.loads(exec_instance.decode())["Id"]
+
+    stream = await docker_api_request(
+        socket_path,
+        "POST",
+        "/exec/{}/start".format(exec_id),
+        {"Detach": False, "Tty": False},
+    )
+
+    exec_details = await docker_api_request(
+        socket_path, "GET", "/exec/{}/json".format(exec_id)
+    )
+    exit_code = json.loads(exec_details.decode())["ExitCode"]
+
+    return exit_code, demultiplex_stream(stream)
+
+
+async def docker_api_request(socket_path, method, path, body=None):
+    """Send one HTTP request to the Docker Engine API and return the response body."""
+    payload = json.dumps(body).encode() if body is not None else b""
+    request_head = (
+        "{} {} HTTP/1.1\r\n"
+        "Host: docker\r\n"
+        "Content-Type: application/json\r\n"
+        "Content-Length: {}\r\n"
+        "Connection: close\r\n\r\n".format(method, path, len(payload))
+    )
+
+    run_stats.count_call(run_stats.DOCKER_API)
+    reader, writer = await asyncio.open_unix_connection(socket_path)
+    try:
+        writer.write(request_head.encode() + payload)
+        await writer.drain()
+        response = await reader.read()
+    finally:
+        writer.close()
+
+    status, response_body = parse_http_response(response)
+    if status >= 400:
+        raise exceptions.DockerAPIError(
+            "Docker API request {} {} failed with status {}:\n{}".format(
+                method, path, status, response_body.decode(errors="replace")
+            )
+        )
+    return response_body
+
+
+def parse_http_response(response):
+    """Split a raw HTTP/1.1 response into (status code, decoded body)."""
+    head, _, body = response.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ")[1])
+
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        body = decode_chunked_body(body)
+
+    return status, body
+
+
+def decode_chunked_body(body):
+    decoded = b""
+    while body:
+        size_line, _, body = body.partition(b"\r\n")
+        size = int(size_line.split(b";")[0], 16)
+        if size == 0:
+            break
+        decoded += body[:size]
+        body = body[size + 2:]
+    return decoded
+
+
+# https://docs.docker.com/engine/api/v1.40/#operation/ContainerAttach
+# without a tty, stdout and stderr are sent as frames with an 8 bytes header:
+# 1 byte for the stream type, 3 empty bytes and the frame size as uint32 big endian
+def demultiplex_stream(data):
+    output = b""
+    while len(data) >= 8:
+        (size,) = struct.unpack(">I", data[4:8])
+        output += data[8:8 + size]
+        data = data[8 + size:]
+    return output
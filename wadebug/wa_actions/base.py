@@ -5,10 +5,20 @@
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import asyncio
+import contextvars
+import functools
+import importlib
+import multiprocessing
+import os
+import threading
+import time
 import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, wait
 
-import pydash
 from six import with_metaclass
+from wadebug import results
+from wadebug.wa_actions import profiling, run_stats, sessions
 from wadebug.wa_actions.common import common_results
 
 
@@ -16,15 +26,31 @@ from wadebug.wa_actions.common import common_results
 Register all WAActions classes available in a dict
 using a metaclasses. If we decide to support only python3.6+
 it can be simplified
+
+Classes register themselves when their module is imported. Modules of built-in
+actions are found in action_manifest (see manifest.py), those of other packages
+through entry points, and only imported once an action is requested.
 """
 registry = {}
 user_facing_registry = {}
 
+# entry point group of actions from other packages, each entry point named
+# after the user_facing_name of its action, e.g. in setup.py:
+# entry_points={"wadebug.actions": ["check_proxy = wadebug_proxy:CheckProxy"]}
+PLUGIN_ENTRY_POINT_GROUP = "wadebug.actions"
+
+# actions for tests, not listed nor run by default
+UNLISTED_ACTIONS = ("DummyOKAction", "DummyProblemAction", "DummyWADebugErrorAction")
+
 
 class WAActionAlreadyRegisteredError(Exception):
     pass
 
 
+class WAActionDependencyCycleError(Exception):
+    pass
+
+
 def register_class(target_class):
     if target_class.user_facing_name in user_facing_registry:
         raise WAActionAlreadyRegisteredError(
@@ -59,43 +85,589 @@ class WAAction(with_metaclass(MetaRegistry)):
     # e.g.: ('db.host', 'auth.token')
     config_dependencies = ()
 
+    # tuple of user_facing_name of actions that must pass before this one runs.
+    # if any of them does not pass, this action is skipped
+    # e.g.: ('check_mysql_connection',)
+    prerequisites = ()
+
+    # seconds this action has to finish before it's reported as timed out.
+    # None uses the default timeout of the run (see --timeout)
+    timeout = None
+
+    # used to plan runs with a time budget (see --budget): actions with higher
+    # priority start first and, on ties, the ones expected to take fewer seconds
+    priority = 0
+    expected_cost = 1
+
+    # results can be reused while the containers, images and config_dependencies
+    # do not change (see result_cache). Actions depending on anything else, like
+    # the network or the database, should set it to False
+    cacheable = True
+
+    # actions doing their I/O with asyncio can implement
+    # `async def _arun(cls, config, *args, **kwargs)` as a classmethod.
+    # run_actions then executes them as coroutines on a shared event loop
+    # instead of on a thread of their own
+    _arun = None
+
     def __str__(self):
         return "{s.user_facing_name}: {s.short_description}".format(s=self)
 
     @classmethod
     def run(cls, config, *args, **kwargs):
-        invalid_dependencies = tuple(
-            c for c in cls.config_dependencies if not pydash.objects.has(config, c)
-        )
+        invalid_dependencies = cls.get_invalid_dependencies(config)
 
         if invalid_dependencies:
             return common_results.missing_config(cls, invalid_dependencies)
 
-        try:
-            return cls._run(config, *args, **kwargs)
-        except Exception as e:
-            return common_results.wadebug_error(cls, e, traceback.format_exc())
+        with run_stats.recording() as stats:
+            try:
+                res = cls._run(config, *args, **kwargs)
+            except Exception as e:
+                res = common_results.wadebug_error(cls, e, traceback.format_exc())
+        res.stats = stats.to_dict()
+        return res
+
+    @classmethod
+    async def arun(cls, config, *args, **kwargs):
+        """Coroutine version of run, for actions implementing _arun."""
+        invalid_dependencies = cls.get_invalid_dependencies(config)
+
+        if invalid_dependencies:
+            return common_results.missing_config(cls, invalid_dependencies)
+
+        # other coroutines run on the same thread in between, so its CPU time
+        # can't be attributed to this action
+        with run_stats.recording(measure_cpu=False) as stats:
+            try:
+                res = await cls._arun(config, *args, **kwargs)
+            except Exception as e:
+                res = common_results.wadebug_error(cls, e, traceback.format_exc())
+        res.stats = stats.to_dict()
+        return res
+
+    @classmethod
+    def get_invalid_dependencies(cls, config):
+        # pydash is slow to import and only needed once actions run
+        import pydash
+
+        return tuple(
+            c for c in cls.config_dependencies if not pydash.objects.has(config, c)
+        )
 
     @classmethod
     def _run(cls, config, *args, **kwargs):
         raise NotImplementedError("Action not implemented.")
 
 
-def get_all_actions():
-    from wadebug.wa_actions.implementations.dummy_action import (
-        DummyOKAction,
-        DummyProblemAction,
-        DummyWADebugErrorAction,
+def run_actions(
+    actions,
+    config,
+    jobs=1,
+    timeout=None,
+    budget=None,
+    isolate=False,
+    profile_dir=None,
+    cache=None,
+    reused_results=None,
+):
+    """Run actions as a DAG on up to `jobs` threads, yielding results as they finish.
+
+    An action starts once all of its prerequisites have finished, so independent
+    branches run at the same time. When a prerequisite does not pass, the actions
+    depending on it are skipped instead of executed. Prerequisites that are not
+    part of `actions` are ignored.
+
+    Each action must finish within its own `timeout`, or the `timeout` given here
+    when it does not set one. Actions past their deadline are reported as TimedOut
+    and abandoned: they no longer count towards `jobs`, and since they run on
+    daemon threads they do not keep wadebug from exiting. Threads cannot be
+    stopped, so they keep running and hold their connections to Docker, MySQL
+    and HTTP endpoints until they finish. The Docker client is shared by the
+    whole process and cannot be closed for one of them.
+
+    Actions implementing _arun run as coroutines on one event loop shared by the
+    whole run. They do not count towards `jobs`, and are cancelled when they time
+    out.
+
+    With `isolate`, each action runs in a process of its own instead, counting
+    towards `jobs`. Processes of actions past their deadline are killed.
+
+    With a `budget` in seconds, only the actions planned to fit in it are executed
+    (see plan_actions) and the run stops after `budget` seconds. Actions left out
+    are skipped.
+
+    With a `profile_dir`, each action runs under cProfile and its profile is
+    written there (see profiling). Profiles of concurrent actions would mix, so
+    actions then run one at a time, coroutines included.
+
+    With a `cache` (see result_cache.ResultCache), cacheable actions whose
+    inputs did not change since they were cached are not executed. Their
+    cached results come back instead.
+
+    Likewise, actions in `reused_results` ({user_facing_name: result}) are not
+    executed and their given result comes back, e.g. results of a previous run.
+
+    Results come back in completion order, not in the order of `actions`.
+    """
+    selected = {act.user_facing_name for act in actions}
+    prerequisites = {
+        act.user_facing_name: [p for p in act.prerequisites if p in selected]
+        for act in actions
+    }
+    check_for_dependency_cycles(prerequisites)
+
+    # actions that need a thread or process of their own, see takes_job
+    exclusive = isolate or profile_dir is not None
+    profile_paths = []
+    if profile_dir is not None:
+        jobs = 1
+        os.makedirs(profile_dir, exist_ok=True)
+
+    run_deadline = None
+    if budget:
+        actions, left_out = plan_actions(actions, budget, jobs)
+        for act in left_out:
+            yield common_results.not_in_budget(act, budget)
+        run_deadline = time.monotonic() + budget
+
+    fingerprint = None
+    # user_facing_name -> result to report instead of executing the action
+    cached = dict(reused_results or {})
+    if not any(getattr(act, "cacheable", False) for act in actions):
+        cache = None
+    if cache is not None:
+        cache.prune()
+        fingerprint = cache.get_environment_fingerprint()
+        if fingerprint is None:
+            # Docker is not reachable, the cache can't tell what changed
+            cache = None
+        else:
+            for act in actions:
+                if act.user_facing_name in cached:
+                    continue
+                res = cache.get(act, config, fingerprint)
+                if res is not None:
+                    cached[act.user_facing_name] = res
+
+    # actions of the run share e.g. the Docker inventory, see sessions
+    run_context = sessions.new_run_context()
+    pending = list(actions)
+    finished = {}
+    # future -> (action, timeout in seconds, deadline)
+    running = {}
+    event_loop = None
+    try:
+        while pending or running:
+            for act in list(pending):
+                required = prerequisites[act.user_facing_name]
+                if not all(p in finished for p in required):
+                    continue
+
+                failed = [p for p in required if not has_passed(finished[p])]
+                if failed:
+                    pending.remove(act)
+                    res = common_results.prerequisites_failed(act, failed)
+                    finished[act.user_facing_name] = res
+                    yield res
+                elif act.user_facing_name in cached:
+                    pending.remove(act)
+                    res = cached[act.user_facing_name]
+                    finished[act.user_facing_name] = res
+                    yield res
+                elif (
+                    not takes_job(act, exclusive)
+                    or count_jobs(running, exclusive) < jobs
+                ):
+                    pending.remove(act)
+                    act_timeout = get_action_timeout(act, timeout, run_deadline)
+                    if act_timeout is not None and act_timeout <= 0:
+                        res = common_results.not_in_budget(act, budget)
+                        finished[act.user_facing_name] = res
+                        yield res
+                        continue
+
+                    if profile_dir is not None:
+                        profile_path = profiling.get_profile_path(profile_dir, act)
+                        profile_paths.append(profile_path)
+                        future = run_context.run(
+                            start_action_job, act, config, isolate, profile_path
+                        )
+                    elif takes_job(act, isolate):
+                        future = run_context.run(
+                            start_action_job, act, config, isolate
+                        )
+                    else:
+                        event_loop = event_loop or EventLoopThread()
+                        future = run_context.run(event_loop.submit, act.arun(config))
+                    deadline = time.monotonic() + act_timeout if act_timeout else None
+                    running[future] = (act, act_timeout, deadline)
+
+            if not running:
+                # skipped actions may have unblocked others, schedule them
+                continue
+
+            deadlines = [d for _, _, d in running.values() if d is not None]
+            next_deadline = min(deadlines) if deadlines else None
+            wait(
+                running,
+                timeout=max(0, next_deadline - time.monotonic()) if deadlines else None,
+                return_when=FIRST_COMPLETED,
+            )
+
+            now = time.monotonic()
+            for future, (act, act_timeout, deadline) in list(running.items()):
+                if future.done():
+                    res = future.result()
+                elif deadline is not None and deadline <= now:
+                    # cancels coroutines and kills processes,
+                    # threads are left to finish on their own
+                    future.cancel()
+                    res = common_results.timed_out(act, act_timeout)
+                else:
+                    continue
+
+                del running[future]
+                finished[act.user_facing_name] = res
+                if cache:
+                    cache.put(act, config, fingerprint, res)
+                yield res
+
+        if profile_dir is not None:
+            profiling.write_summary(profile_dir, profile_paths)
+    finally:
+        for future in running:
+            future.cancel()
+        if event_loop:
+            event_loop.stop()
+
+
+def is_async_action(act):
+    return getattr(act, "_arun", None) is not None
+
+
+def takes_job(act, isolate=False):
+    """Whether act needs a thread or process of its own, instead of the event loop."""
+    return isolate or not is_async_action(act)
+
+
+def count_jobs(running, isolate=False):
+    return sum(1 for act, _, _ in running.values() if takes_job(act, isolate))
+
+
+def start_action_job(act, config, isolate=False, profile_path=None):
+    """Start act on a process if isolate, else on a thread.
+
+    With a profile_path, act runs under cProfile (async actions on an event loop
+    of their own) and its profile is written to profile_path.
+
+    Returns a concurrent.futures.Future of its result.
+    """
+    if isolate:
+        return run_in_process(act, config, profile_path)
+    if profile_path:
+        return run_in_thread(run_action_profiled, act, config, profile_path)
+    return run_in_thread(act.run, config)
+
+
+def run_action_profiled(act, config, profile_path):
+    if is_async_action(act):
+        return profiling.call_profiled(profile_path, asyncio.run, act.arun(config))
+    return profiling.call_profiled(profile_path, act.run, config)
+
+
+def get_action_timeout(act, default_timeout, run_deadline=None):
+    """Seconds act has to finish, also bound by what is left until run_deadline."""
+    act_timeout = act.timeout or default_timeout
+    if run_deadline is None:
+        return act_timeout
+
+    remaining = run_deadline - time.monotonic()
+    return min(act_timeout, remaining) if act_timeout else remaining
+
+
+def plan_actions(actions, budget, jobs=1):
+    """Choose the actions that fit in `budget` seconds when executed on `jobs` threads.
+
+    Actions are considered by descending priority then ascending expected_cost,
+    and only after their prerequisites. Execution is simulated with each action's
+    expected_cost: an action is planned when it's expected to finish within the
+    budget, and left out otherwise or when one of its prerequisites was left out.
+
+    Returns a tuple (planned, left_out). Actions in `planned` are in the order
+    they should be started.
+    """
+    selected = {act.user_facing_name for act in actions}
+    undecided = sorted(actions, key=lambda act: (-act.priority, act.expected_cost))
+    required = {
+        act.user_facing_name: [p for p in act.prerequisites if p in selected]
+        for act in actions
+    }
+    slots_free_at = [0.0] * jobs
+    finish_at = {}
+    decided = set()
+    planned, left_out = [], []
+
+    while undecided:
+        act = next(
+            act
+            for act in undecided
+            if all(p in decided for p in required[act.user_facing_name])
+        )
+        undecided.remove(act)
+        decided.add(act.user_facing_name)
+
+        if not all(p in finish_at for p in required[act.user_facing_name]):
+            left_out.append(act)
+            continue
+
+        slot = slots_free_at.index(min(slots_free_at))
+        prerequisites_finish_at = [finish_at[p] for p in required[act.user_facing_name]]
+        start = max([slots_free_at[slot]] + prerequisites_finish_at)
+        finish = start + act.expected_cost
+        if finish > budget:
+            left_out.append(act)
+            continue
+
+        slots_free_at[slot] = finish
+        finish_at[act.user_facing_name] = finish
+        planned.append(act)
+
+    return planned, left_out
+
+
+def run_in_thread(func, *args, **kwargs):
+    """Call func on a new daemon thread, returning a Future of its result.
+
+    func runs in a copy of the caller's context, so the action running in the
+    caller keeps accounting for the calls made by func (see run_stats).
+    """
+    future = Future()
+    context = contextvars.copy_context()
+
+    def target():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(context.run(func, *args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=target, daemon=True).start()
+    return future
+
+
+class ProcessFuture(Future):
+    """Future of an action running in a child process. Cancelling kills the process."""
+
+    def __init__(self, process):
+        super(ProcessFuture, self).__init__()
+        self.process = process
+
+    def cancel(self):
+        self.process.kill()
+        return super(ProcessFuture, self).cancel()
+
+
+def get_process_context():
+    # forking is much faster than spawning a new interpreter, which would have
+    # to import wadebug again for every action
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+def run_in_process(act, config, profile_path=None):
+    """Run act on a child process, returning a ProcessFuture of its result.
+
+    The result is sent back as a to_dict() payload and rebuilt in this process.
+    """
+    context = get_process_context()
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(
+        target=run_action_in_child_process,
+        args=(act, config, sender, profile_path),
+        daemon=True,
     )
+    process.start()
+    sender.close()
+
+    future = ProcessFuture(process)
+    future.set_running_or_notify_cancel()
+
+    def wait_for_result():
+        try:
+            future.set_result(results.from_dict(act, receiver.recv()))
+        except EOFError:
+            # the process exited without a result: it crashed or was killed
+            process.join()
+            e = Exception("Action process exited with code {}".format(process.exitcode))
+            future.set_result(common_results.wadebug_error(act, e, ""))
+        except Exception as e:
+            # e.g. the payload could not be unpickled or rebuilt into a result
+            process.join()
+            future.set_result(
+                common_results.wadebug_error(act, e, traceback.format_exc())
+            )
+        finally:
+            receiver.close()
+
+    threading.Thread(target=wait_for_result, daemon=True).start()
+    return future
+
+
+def run_action_in_child_process(act, config, sender, profile_path=None):
+    if profile_path:
+        res = run_action_profiled(act, config, profile_path)
+    elif is_async_action(act):
+        res = asyncio.run(act.arun(config))
+    else:
+        res = act.run(config)
+    sender.send(res.to_dict())
+    sender.close()
+
 
-    blacklisted_actions = {DummyOKAction, DummyProblemAction, DummyWADebugErrorAction}
-    ret = [v for v in registry.values() if v not in blacklisted_actions]
-    return ret
+class EventLoopThread(object):
+    """An asyncio event loop running on a daemon thread."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self._run_loop, daemon=True).start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_forever()
+        finally:
+            tasks = asyncio.all_tasks(self.loop)
+            for task in tasks:
+                task.cancel()
+            self.loop.run_until_complete(
+                asyncio.gather(*tasks, return_exceptions=True)
+            )
+            self.loop.close()
+
+    def submit(self, coroutine):
+        """Schedule coroutine on the loop, returning a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def stop(self):
+        """Stop the loop, cancelling the coroutines still running on it."""
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+def has_passed(result):
+    """Whether actions depending on the one that produced `result` can run."""
+    return isinstance(result, (results.OK, results.Warning))
+
+
+def check_for_dependency_cycles(prerequisites):
+    """Raise if the prerequisites graph ({name: [prerequisite names]}) has a cycle."""
+    visiting, visited = set(), set()
+
+    def visit(name, path):
+        if name in visited:
+            return
+        if name in visiting:
+            raise WAActionDependencyCycleError(
+                "Actions have circular prerequisites: {}".format(
+                    " -> ".join(path + [name])
+                )
+            )
+        visiting.add(name)
+        for prerequisite in prerequisites.get(name, ()):
+            visit(prerequisite, path + [name])
+        visiting.remove(name)
+        visited.add(name)
+
+    for name in prerequisites:
+        visit(name, [])
+
+
+def get_all_actions():
+    """Built-in actions followed by actions of plugins. Imports all of them.
+
+    Built-in actions are in the order of manifest.ACTION_MODULES.
+    """
+    return [get_action_by_name(name) for name in get_listed_action_names()]
+
+
+def get_action_descriptions():
+    """(user_facing_name, short_description) of each action of get_all_actions.
+
+    Descriptions of built-in actions are read from the manifest, without
+    importing their modules. Plugins are not imported either, they are
+    described by the package providing them until they are.
+    """
+    from wadebug.wa_actions.action_manifest import ACTIONS
+
+    descriptions = []
+    for name in get_listed_action_names():
+        if name in ACTIONS:
+            descriptions.append((name, ACTIONS[name]["short_description"]))
+        elif name in user_facing_registry:
+            descriptions.append((name, user_facing_registry[name].short_description))
+        else:
+            entry_point = get_plugin_entry_points()[name]
+            descriptions.append((name, get_plugin_description(entry_point)))
+    return descriptions
+
+
+def get_plugin_description(entry_point):
+    """Description of the action of entry_point, without loading it."""
+    dist = getattr(entry_point, "dist", None)
+    if dist is not None:
+        return "Action of the {} package".format(dist.name)
+    return "Action of {}".format(entry_point.value)
+
+
+def get_listed_action_names():
+    from wadebug.wa_actions.action_manifest import ACTIONS
+
+    names = [
+        name
+        for name, entry in ACTIONS.items()
+        if entry["class"] not in UNLISTED_ACTIONS
+    ]
+    # built-in actions take precedence over plugins using the same name
+    names.extend(name for name in get_plugin_entry_points() if name not in ACTIONS)
+    return names
 
 
 def get_action_by_classname(name):
+    from wadebug.wa_actions.action_manifest import ACTIONS
+
+    if name not in registry:
+        for entry in ACTIONS.values():
+            if entry["class"] == name:
+                importlib.import_module(entry["module"])
     return registry[name]
 
 
 def get_action_by_name(name):
+    """Action class of user_facing_name `name`, importing its module if needed.
+
+    Raises KeyError when no built-in action nor plugin has that name.
+    """
+    from wadebug.wa_actions.action_manifest import ACTIONS
+
+    if name not in user_facing_registry:
+        if name in ACTIONS:
+            importlib.import_module(ACTIONS[name]["module"])
+        elif name in get_plugin_entry_points():
+            get_plugin_entry_points()[name].load()
     return user_facing_registry[name]
+
+
+@functools.lru_cache(maxsize=None)
+def get_plugin_entry_points():
+    """Dict of user_facing_name -> entry point of actions of other packages."""
+    from importlib.metadata import entry_points
+
+    all_entry_points = entry_points()
+    if hasattr(all_entry_points, "select"):
+        plugins = all_entry_points.select(group=PLUGIN_ENTRY_POINT_GROUP)
+    else:
+        # python < 3.10 returns a dict of group -> entry points
+        plugins = all_entry_points.get(PLUGIN_ENTRY_POINT_GROUP, ())
+    return {entry_point.name: entry_point for entry_point in plugins}
@@ -19,6 +19,38 @@ def missing_config(cls, missing_configs):
     )
 
 
+def prerequisites_failed(cls, failed_prerequisites):
+    return results.Skipped(
+        cls,
+        "This check is skipped",
+        "Required check(s) did not pass:\n{}".format(
+            "\n".join("\t" + name for name in failed_prerequisites)
+        ),
+        "Please fix the issues reported by these checks and run wadebug again",
+    )
+
+
+def not_in_budget(cls, budget):
+    return results.Skipped(
+        cls,
+        "This check is skipped",
+        "It did not fit in the time budget of {:g} seconds".format(budget),
+        "Run wadebug again with a larger --budget, or run this check on its own "
+        "with `wadebug partial {}`".format(cls.user_facing_name),
+    )
+
+
+def timed_out(cls, timeout):
+    return results.TimedOut(
+        cls,
+        "This check did not finish in time",
+        "Check was stopped after {:g} seconds".format(round(timeout, 1)),
+        "Other checks may point to an unresponsive container, database or "
+        "webapp. If the host is just slow, run wadebug again with a longer "
+        "--timeout",
+    )
+
+
 def wadebug_error(cls, exception, trace):
     return results.WADebugError(
         cls,
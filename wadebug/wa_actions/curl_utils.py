@@ -7,6 +7,8 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 from enum import IntEnum
 
+from wadebug.wa_actions import run_stats
+
 
 class CURLTestResult(IntEnum):
     OK = 1
@@ -62,6 +64,7 @@ def __form_basic_exec_params(url, timeout):
 # returns tuple (CURLTestResult, response time in secs)
 def __exec_request_from_container(container, exec_params, ssl_cert_path=None):
     try:
+        run_stats.count_call(run_stats.DOCKER_EXEC)
         exec_result = container.exec_run(exec_params)
 
         exit_code = exec_result[0]  # https://ec.haxx.se/usingcurl-returns.html
@@ -86,6 +89,7 @@ def __exec_request_from_container(container, exec_params, ssl_cert_path=None):
 def __clean_up_cert_file_from_container(container, ssl_cert_path=None):
     if ssl_cert_path:
         try:
+            run_stats.count_call(run_stats.DOCKER_EXEC)
             container.exec_run(["rm", "-f", ssl_cert_path])
         except Exception:
             pass
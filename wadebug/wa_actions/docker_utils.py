@@ -5,15 +5,23 @@
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import copy
 import os
 import tarfile
 import tempfile
+import threading
 from datetime import datetime, timedelta
 from enum import Enum
 
-import docker
 from six import BytesIO
-from wadebug.wa_actions.models.wa_container import WAContainer
+from wadebug.config import Config
+from wadebug.wa_actions import run_stats, sessions
+from wadebug.wa_actions.models.wa_container import (
+    ROLE_LABEL,
+    WAContainer,
+    get_first_release,
+    get_role_and_version,
+)
 
 
 WA_WEBAPP_CONTAINER_TAG = "whatsapp.biz/web"
@@ -25,11 +33,229 @@ EXPIRED_DATE_FORMAT = "%Y-%m-%d"
 LIFETIME_OF_BETA_BUILD_IN_DAYS = 45
 LIFETIME_OF_BUILD_IN_DAYS = 180
 TEMP_TAR_FILENAME = "temp.tar"
+DOCKER_INVENTORY_KEY = "docker_inventory"
+# path components before the repository of images matched by the daemon, e.g.
+# 2 for gcr.io/project/mysql
+REFERENCE_DEPTH = 3
+# "reference" filters of the images of WhatsApp Business API and MySQL
+# containers, like the repo tags matched by get_role_and_version. A "*" does
+# not match "/", so each pattern is repeated under REFERENCE_DEPTH components.
+WA_IMAGE_REFERENCES = tuple(
+    "*/" * depth + pattern
+    for pattern in (
+        "*whatsapp.biz/coreapp*",
+        "*whatsapp.biz/web*",
+        "*mysql*",
+        "*mysql*/*",
+    )
+    for depth in range(REFERENCE_DEPTH + 1)
+)
+
+_docker_client_lock = threading.Lock()
+# (client, pid of the process that created it), see get_docker_client
+_docker_client = (None, None)
+
+
+def get_docker_client():
+    """Docker client of this process, created on first use.
+
+    All helpers and threads share it, and with it a pool of connections to
+    the daemon (see create_docker_client). Processes forked with --isolate
+    create their own.
+    """
+    global _docker_client
+    with _docker_client_lock:
+        client, pid = _docker_client
+        if client is None or pid != os.getpid():
+            client = create_docker_client()
+            _docker_client = (client, os.getpid())
+        return client
+
+
+def forget_docker_client():
+    """Create the client again on next use, e.g. after DOCKER_HOST changed."""
+    global _docker_client
+    with _docker_client_lock:
+        _docker_client = (None, None)
+
+
+def _reset_docker_client_lock_after_fork():
+    # another thread of the parent may have held it when forking (see --isolate)
+    global _docker_client_lock
+    _docker_client_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_docker_client_lock_after_fork)
 
 
-def get_all_containers():
-    client = docker.from_env()
-    return client.containers.list(all=True)
+def create_docker_client():
+    """docker.from_env() counting its requests to the Docker API in run_stats.
+
+    Its connection pool size, timeout and keep-alive come from Config.
+    """
+    # imported on first use, so that commands not talking to Docker start fast
+    import docker
+
+    config = Config()
+    client = docker.from_env(
+        max_pool_size=config.docker_pool_size, timeout=config.docker_timeout
+    )
+    if not config.docker_keep_alive:
+        client.api.headers["Connection"] = "close"
+    client.api.hooks["response"].append(count_docker_api_call)
+    return client
+
+
+def count_docker_api_call(response, *args, **kwargs):
+    run_stats.count_call(run_stats.DOCKER_API)
+
+
+def get_all_containers(filters=None):
+    client = get_docker_client()
+    return client.containers.list(all=True, filters=filters)
+
+
+def get_all_images(filters=None):
+    client = get_docker_client()
+    return client.api.images(filters=filters)
+
+
+def get_inventory():
+    """DockerInventory of the run in progress, shared by its actions.
+
+    Outside of a run (see sessions.new_run_context) a new one every time.
+    """
+    return sessions.get_or_create_for_run(DOCKER_INVENTORY_KEY, DockerInventory)
+
+
+def get_run_inventory():
+    """DockerInventory of the run in progress, None outside of a run.
+
+    Helpers about a single container use it to avoid asking the daemon again.
+    Outside of a run they ask for that container only, rather than listing
+    every container and image into an inventory used once.
+    """
+    if not sessions.is_in_run():
+        return None
+    return get_inventory()
+
+
+class DockerInventory(object):
+    """WhatsApp containers and images of the Docker host, listed once.
+
+    The daemon filters them: images by WA_IMAGE_REFERENCES, containers by
+    those images or by ROLE_LABEL, so that unrelated containers and images
+    of the host are neither transferred nor inspected. When none of those
+    is a WhatsApp container, e.g. images are named deeper than
+    REFERENCE_DEPTH, all containers and images are listed instead.
+    Containers are listed with their inspect data and classified from the
+    repo tags of their image.
+    Helpers of this module read from it instead of asking the daemon again
+    for every container.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._containers = None
+        self._images = None
+        # container id -> inspect data
+        self._attrs = None
+        # container id -> environment, see parse_env
+        self._env = None
+        # container id -> repo tags of its image
+        self._repo_tags = None
+        self._wa_containers = None
+
+    def _take(self):
+        with self._lock:
+            if self._containers is not None:
+                return
+            images = get_all_images(filters={"reference": list(WA_IMAGE_REFERENCES)})
+            image_ids = [image["Id"] for image in images]
+            containers = get_wa_candidate_containers(image_ids)
+            repo_tags = get_repo_tags_by_container(containers, images)
+            wa_containers = [WAContainer(c, repo_tags[c.id]) for c in containers]
+            if not any(c.role is not None for c in wa_containers):
+                images = get_all_images()
+                containers = get_all_containers()
+                repo_tags = get_repo_tags_by_container(containers, images)
+                wa_containers = [WAContainer(c, repo_tags[c.id]) for c in containers]
+
+            self._images = images
+            self._attrs = {c.id: c.attrs for c in containers}
+            self._env = {
+                c.id: parse_env(c.attrs["Config"].get("Env")) for c in containers
+            }
+            self._repo_tags = repo_tags
+            self._wa_containers = [c for c in wa_containers if c.role is not None]
+            self._containers = containers
+
+    @property
+    def containers(self):
+        self._take()
+        return self._containers
+
+    @property
+    def images(self):
+        """Images as listed by the Docker API, see APIClient.images."""
+        self._take()
+        return self._images
+
+    @property
+    def wa_containers(self):
+        self._take()
+        return self._wa_containers
+
+    def get_repo_tags(self, container):
+        """Repo tags of the image of container, None if not in the inventory."""
+        self._take()
+        return self._repo_tags.get(container.id)
+
+    def get_env(self, container):
+        """Environment of container as a dict, None if not in the inventory."""
+        self._take()
+        return self._env.get(container.id)
+
+    def get_attrs(self, container):
+        """Inspect data of container, None if not in the inventory."""
+        self._take()
+        return self._attrs.get(container.id)
+
+
+def get_repo_tags_by_container(containers, images):
+    """Dict of container id -> repo tags of its image, [] if it has none."""
+    from docker.errors import ImageNotFound
+
+    images_by_id = {image["Id"]: image for image in images}
+    repo_tags = {}
+    for container in containers:
+        image = images_by_id.get(container.attrs["Image"])
+        if image is not None:
+            repo_tags[container.id] = image["RepoTags"] or []
+            continue
+        # e.g. a labeled container, or an image listed after the containers
+        try:
+            repo_tags[container.id] = container.image.attrs["RepoTags"] or []
+        except ImageNotFound:
+            # its image was removed, e.g. dangling after a pull
+            repo_tags[container.id] = []
+    return repo_tags
+
+
+def get_wa_candidate_containers(image_ids):
+    """Containers of the images of image_ids, or labeled with ROLE_LABEL."""
+    containers = []
+    if image_ids:
+        # an empty "ancestor" filter would list every container
+        containers = get_all_containers(filters={"ancestor": image_ids})
+    listed_ids = {c.id for c in containers}
+    containers += [
+        c
+        for c in get_all_containers(filters={"label": ROLE_LABEL})
+        if c.id not in listed_ids
+    ]
+    return containers
 
 
 def get_container_logs(container, since_datetime=None, until_datetime=None):
@@ -37,8 +263,7 @@ def get_container_logs(container, since_datetime=None, until_datetime=None):
 
 
 def get_inspect_result(container):
-    client = docker.from_env()
-    res = client.api.inspect_container(container.short_id)
+    res = copy.deepcopy(get_container_inspect_data(container))
     # hide password
     for index, value in enumerate(res["Config"]["Env"]):
         if value.lower().find("password") != -1:
@@ -47,8 +272,18 @@ def get_inspect_result(container):
     return res
 
 
+def get_container_inspect_data(container):
+    """Inspect data of container, from the inventory of the run when possible."""
+    inventory = get_run_inventory()
+    attrs = inventory.get_attrs(container) if inventory is not None else None
+    if attrs is not None:
+        return attrs
+    client = get_docker_client()
+    return client.api.inspect_container(container.short_id)
+
+
 def get_core_dump_logs(container):
-    client = docker.from_env()
+    client = get_docker_client()
     files_changed = client.api.diff(container.short_id)
     coredump_logs = []
     for file_change in files_changed:
@@ -116,7 +351,17 @@ def write_to_file(path, content):
 
 
 def get_wa_version_from_container(container):
-    return get_version(container.image.attrs["RepoTags"][0].split(":")[1])
+    return get_version(get_image_repo_tags(container)[0].split(":")[1])
+
+
+def get_image_repo_tags(container):
+    """Repo tags of the image of container, from the inventory of the run when
+    possible."""
+    inventory = get_run_inventory()
+    repo_tags = inventory.get_repo_tags(container) if inventory is not None else None
+    if repo_tags is None:
+        repo_tags = container.image.attrs["RepoTags"]
+    return repo_tags
 
 
 def get_running_wacore_containers():
@@ -133,24 +378,16 @@ def get_running_wa_containers():
 
 def get_wa_containers():
     """Return all probably relevant containers, including MySQL, if exists."""
-    return [WAContainer(c) for c in get_all_containers() if is_wa_container(c)]
+    return list(get_inventory().wa_containers)
 
 
 def is_wa_container(container):
-    return (
-        len(
-            [
-                repo_tag
-                for repo_tag in container.image.attrs["RepoTags"]
-                if (
-                    repo_tag.find(WA_WEBAPP_CONTAINER_TAG) > -1
-                    or repo_tag.find(WA_COREAPP_CONTAINER_TAG) > -1
-                    or repo_tag.find(MYSQL_CONTAINER_TAG) > -1
-                )
-            ]
-        )
-        > 0
-    )
+    return is_wa_image(container.image.attrs["RepoTags"])
+
+
+def is_wa_image(repo_tags):
+    role, _ = get_role_and_version(repo_tags)
+    return role is not None
 
 
 def is_container_running(container):
@@ -162,23 +399,36 @@ def get_all_running_wa_containers_except_db():
 
 
 def get_mysql_password(wa_container):
-    client = docker.from_env()
-    res = client.api.inspect_container(wa_container.container.short_id)
-    for _, value in enumerate(res["Config"]["Env"]):
-        if value.find("MYSQL_ROOT_PASSWORD") != -1:
-            arr = value.split("=")
-            return arr[1]
-    return ""
+    return get_container_env(wa_container.container).get("MYSQL_ROOT_PASSWORD", "")
 
 
 def get_value_by_inspecting_container_environment(container, key_in_config):
-    client = docker.from_env()
-    res = client.api.inspect_container(container.short_id)
-    for _, value in enumerate(res["Config"]["Env"]):
-        if value.find(key_in_config) != -1:
-            arr = value.split("=")
-            return arr[1]
-    return ""
+    return get_container_env(container).get(key_in_config, "")
+
+
+def get_container_env_values(container, keys):
+    """Dict of key -> value in the environment of container, "" when unset."""
+    env = get_container_env(container)
+    return {key: env.get(key, "") for key in keys}
+
+
+def get_container_env(container):
+    """Environment of container as a dict, from the inventory of the run when
+    possible."""
+    inventory = get_run_inventory()
+    env = inventory.get_env(container) if inventory is not None else None
+    if env is None:
+        env = parse_env(get_container_inspect_data(container)["Config"]["Env"])
+    return env
+
+
+def parse_env(env):
+    """Dict of the "KEY=value" items of the Config.Env of a container."""
+    parsed = {}
+    for item in env or ():
+        key, _, value = item.partition("=")
+        parsed[key] = value
+    return parsed
 
 
 def get_container_port_bindings(container):
@@ -220,12 +470,12 @@ def get_expiration_map():
                 or repo_tag.find(WA_COREAPP_CONTAINER_TAG) > -1
             )
 
-    client = docker.from_env()
-    images = client.api.images()
+    images = get_inventory().images
     expiration_map = {}
     for image in images:
-        if is_wa_image(image):
-            ver = get_version(image["RepoTags"][0].split(":")[1])
+        release = get_first_release(image["RepoTags"] or [])
+        if is_wa_image(image) and release is not None:
+            ver = get_version(release)
             if ver[0] not in expiration_map:
                 if "Labels" in image and "EXPIRES_ON" in image["Labels"]:
                     dt_ts = datetime.strptime(
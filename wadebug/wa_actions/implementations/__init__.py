@@ -5,38 +5,5 @@
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
-from wadebug.wa_actions.implementations.check_containers import (  # noqa: F401
-    CheckContainersAreUp,
-)
-from wadebug.wa_actions.implementations.check_db_settings_exist import (  # noqa: F401
-    CheckDbSettingsExist,
-)
-from wadebug.wa_actions.implementations.check_mysql_connection import (  # noqa: F401
-    CheckMySQLConnection,
-)
-from wadebug.wa_actions.implementations.check_mysql_password import (  # noqa: F401
-    CheckMySQLPassword,
-)
-from wadebug.wa_actions.implementations.check_mysql_permissions import (  # noqa: F401
-    CheckMySQLPermissions,
-)
-from wadebug.wa_actions.implementations.check_mysql_version import (  # noqa: F401
-    CheckMySQLVersion,
-)
-from wadebug.wa_actions.implementations.check_network import (  # noqa: F401
-    CheckNetworkAction,
-)
-from wadebug.wa_actions.implementations.check_software_version import (  # noqa: F401
-    CheckSoftwareVersion,
-)
-from wadebug.wa_actions.implementations.check_webapp_port import (  # noqa: F401
-    CheckWebappPortAction,
-)
-from wadebug.wa_actions.implementations.check_webhook import (  # noqa: F401
-    CheckWebhookAction,
-)
-from wadebug.wa_actions.implementations.dummy_action import (  # noqa: F401
-    DummyOKAction,
-    DummyProblemAction,
-    DummyWADebugErrorAction,
-)
+# Modules of actions are imported when an action is requested, see
+# wa_actions.manifest. Adding a module here would import it for every command.
@@ -12,6 +12,8 @@ from wadebug.wa_actions.base import WAAction
 class CheckContainersAreUp(WAAction):
     user_facing_name = "containers_status"
     short_description = "Check if WA containers are running"
+    priority = 10
+    expected_cost = 1
 
     @classmethod
     def _run(cls, config, *args, **kwargs):
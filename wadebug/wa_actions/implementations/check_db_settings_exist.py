@@ -24,6 +24,8 @@ DB_SETTINGS_CONTAINER = [
 class CheckDbSettingsExist(WAAction):
     user_facing_name = "check_db_settings_exist"
     short_description = "Test if required db settings are passed"
+    priority = 5
+    expected_cost = 2
 
     @classmethod
     def _run(cls, config, *args, **kwargs):
@@ -31,11 +33,11 @@ class CheckDbSettingsExist(WAAction):
         containers = docker_utils.get_all_running_wa_containers_except_db()
 
         for container in containers:
+            values = docker_utils.get_container_env_values(
+                container, DB_SETTINGS_CONTAINER
+            )
             for item in DB_SETTINGS_CONTAINER:
-                value = docker_utils.get_value_by_inspecting_container_environment(
-                    container, item
-                )
-                if not value:
+                if not values[item]:
                     errors[container.name].append(item)
 
         if errors:
@@ -43,7 +45,12 @@ class CheckDbSettingsExist(WAAction):
             return results.Problem(
                 cls,
                 "Some required db settings are not passed",
-                "\n".join([err_str.format(key, value) for key, _ in errors.items()]),
+                "\n".join(
+                    [
+                        err_str.format(key, ", ".join(value))
+                        for key, value in errors.items()
+                    ]
+                ),
                 "Please make sure to pass required db configuration",
             )
         return results.OK(cls)
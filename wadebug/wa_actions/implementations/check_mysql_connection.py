@@ -14,6 +14,10 @@ class CheckMySQLConnection(WAAction):
     user_facing_name = "check_mysql_connection"
     short_description = "Test if MySQL database can be connected"
     config_dependencies = ("db.host", "db.port", "db.user", "db.password")
+    priority = 10
+    expected_cost = 1
+    # the database server is not covered by the result_cache fingerprint
+    cacheable = False
 
     @classmethod
     def _run(cls, config, *args, **kwargs):
@@ -17,6 +17,8 @@ class CheckMySQLPassword(WAAction):
     user_facing_name = "check_mysql_password"
     short_description = "Test if database password has any invalid characters"
     config_dependencies = ("db.password",)
+    priority = 3
+    expected_cost = 1
 
     @classmethod
     def _run(cls, config, *args, **kwargs):
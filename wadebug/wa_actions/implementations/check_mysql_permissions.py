@@ -29,6 +29,11 @@ class CheckMySQLPermissions(WAAction):
         "Test if the database have permissions to create database or tables"
     )
     config_dependencies = ("db.host", "db.port", "db.user", "db.password")
+    prerequisites = ("check_mysql_connection",)
+    priority = 3
+    expected_cost = 1
+    # grants can change without any container or config change
+    cacheable = False
 
     @classmethod
     def _run(cls, config, *args, **kwargs):
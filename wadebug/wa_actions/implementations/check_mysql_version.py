@@ -5,21 +5,26 @@
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
-from distutils.version import LooseVersion
+import re
 
 from wadebug import results
 from wadebug.wa_actions.base import WAAction
 from wadebug.wa_actions.mysql_utils import MySQLUtil
 
 
-MIN_MYSQL_VERSION = LooseVersion("5.7")
-MAX_MYSQL_VERSION = LooseVersion("8")
+MIN_MYSQL_VERSION = (5, 7)
+MAX_MYSQL_VERSION = (8,)
 
 
 class CheckMySQLVersion(WAAction):
     user_facing_name = "check_mysql_version"
     short_description = "Check MySQL version"
     config_dependencies = ("db.host", "db.port", "db.user", "db.password")
+    prerequisites = ("check_mysql_connection",)
+    priority = 3
+    expected_cost = 1
+    # MySQL may be upgraded on a host that is not running in Docker
+    cacheable = False
 
     @classmethod
     def _run(cls, config, *args, **kwargs):
@@ -42,5 +47,19 @@ class CheckMySQLVersion(WAAction):
 
 
 def is_version_valid(version):
-    semver = LooseVersion(version)
+    semver = get_version_numbers(version)
     return semver >= MIN_MYSQL_VERSION and semver < MAX_MYSQL_VERSION
+
+
+def get_version_numbers(version):
+    """Leading numbers of a version, e.g.: (5, 7, 30) for 5.7.30-log.
+
+    distutils' LooseVersion used to do this, but importing distutils slows
+    down the start of wadebug.
+    """
+    numbers = []
+    for part in re.split(r"[.\-+]", version):
+        if not part.isdigit():
+            break
+        numbers.append(int(part))
+    return tuple(numbers)
@@ -5,10 +5,16 @@
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import asyncio
 from enum import Enum
 
 from wadebug import results
-from wadebug.wa_actions import docker_utils, network_utils
+from wadebug.wa_actions import (
+    async_docker_utils,
+    docker_utils,
+    network_utils,
+    run_stats,
+)
 from wadebug.wa_actions.base import WAAction
 
 
@@ -32,6 +38,11 @@ WHATSAPP_SERVERS = [
 
 CONNECTION_TIMEOUT = 1
 
+# name of the observation of each host, 1 if reachable (see run_stats.observe)
+HOST_REACHABLE = "host_reachable"
+
+TROUBLESHOOTING_URL = "https://developers.facebook.com/docs/whatsapp/network-debugging"
+
 
 class CheckNetworkAction(WAAction):
     user_facing_name = "check_network"
@@ -39,53 +50,102 @@ class CheckNetworkAction(WAAction):
         "Test if required hosts can be reached on specific port "
         "from the first running coreapp container."
     )
+    prerequisites = ("containers_status",)
+    # without an event loop (see _run), every host is probed on up to 2 ports
+    # one at a time
+    timeout = 60
+    priority = 1
+    expected_cost = 3
+    # hosts can become unreachable at any time
+    cacheable = False
 
     @classmethod
     def _run(cls, config, *args, **kwargs):
         wacore_containers = docker_utils.get_running_wacore_containers()
 
         if not wacore_containers:
-            return results.Skipped(
-                cls,
-                "Network connectivity check was skipped",
-                "There is no wacore container running. Action skipped.",
-                "If this is unexpected, check results from other actions to diagnose. "
-                "If this is expected (e.g.: an HA/MC setup "
-                "across multiple hosts is under test), no actions are required.",
-            )
-
-        container = wacore_containers[0]
+            return _result_no_wacore_container(cls)
 
         hosts_not_reachable = get_hosts_not_reachable_from_container(
-            container, WHATSAPP_SERVERS
+            wacore_containers[0], WHATSAPP_SERVERS
         )
 
-        TROUBLESHOOTING_URL = (
-            "https://developers.facebook.com/docs/whatsapp/network-debugging"
+        return _result_hosts_not_reachable(cls, hosts_not_reachable)
+
+    @classmethod
+    async def _arun(cls, config, *args, **kwargs):
+        wacore_containers = await async_docker_utils.run_blocking(
+            docker_utils.get_running_wacore_containers
         )
 
-        if hosts_not_reachable:
-            error_message = format_error_message(hosts_not_reachable)
-            return results.Problem(
-                cls,
-                "Network connectivity check fails",
-                error_message,
-                "Please refer to {} for network requirements details.".format(
-                    TROUBLESHOOTING_URL
-                ),
-            )
+        if not wacore_containers:
+            return _result_no_wacore_container(cls)
 
+        hosts_not_reachable = await get_hosts_not_reachable_from_container_async(
+            wacore_containers[0], WHATSAPP_SERVERS
+        )
+
+        return _result_hosts_not_reachable(cls, hosts_not_reachable)
+
+
+def _result_no_wacore_container(cls):
+    return results.Skipped(
+        cls,
+        "Network connectivity check was skipped",
+        "There is no wacore container running. Action skipped.",
+        "If this is unexpected, check results from other actions to diagnose. "
+        "If this is expected (e.g.: an HA/MC setup "
+        "across multiple hosts is under test), no actions are required.",
+    )
+
+
+def _result_hosts_not_reachable(cls, hosts_not_reachable):
+    if not hosts_not_reachable:
         return results.OK(cls)
 
+    return results.Problem(
+        cls,
+        "Network connectivity check fails",
+        format_error_message(hosts_not_reachable),
+        "Please refer to {} for network requirements details.".format(
+            TROUBLESHOOTING_URL
+        ),
+    )
+
 
 def get_hosts_not_reachable_from_container(container, hosts):
     hosts_not_reachable = []
 
     for host in hosts:
         hostname, server_type, primary_port, secondary_port = host
-        if not is_host_reachable_from_container(
+        is_reachable = is_host_reachable_from_container(
             container, hostname, primary_port, secondary_port
-        ):
+        )
+        run_stats.observe(HOST_REACHABLE, int(is_reachable), host=hostname)
+        if not is_reachable:
+            hosts_not_reachable.append((hostname, server_type))
+
+    return hosts_not_reachable
+
+
+async def get_hosts_not_reachable_from_container_async(container, hosts):
+    """Coroutine version of get_hosts_not_reachable_from_container.
+
+    All hosts are checked at the same time.
+    """
+    reachable = await asyncio.gather(
+        *[
+            is_host_reachable_from_container_async(
+                container, hostname, primary_port, secondary_port
+            )
+            for hostname, _, primary_port, secondary_port in hosts
+        ]
+    )
+
+    hosts_not_reachable = []
+    for (hostname, server_type, _, _), is_reachable in zip(hosts, reachable):
+        run_stats.observe(HOST_REACHABLE, int(is_reachable), host=hostname)
+        if not is_reachable:
             hosts_not_reachable.append((hostname, server_type))
 
     return hosts_not_reachable
@@ -99,6 +159,16 @@ def is_host_reachable_from_container(container, hostname, primary_port, secondar
     )
 
 
+async def is_host_reachable_from_container_async(
+    container, hostname, primary_port, secondary_port
+):
+    return await network_utils.hostname_reachable_from_container_async(
+        container, hostname, primary_port, CONNECTION_TIMEOUT
+    ) or await network_utils.hostname_reachable_from_container_async(
+        container, hostname, secondary_port, CONNECTION_TIMEOUT
+    )
+
+
 def format_error_message(hosts):
     message = ""
     for hostname, server_type in hosts:
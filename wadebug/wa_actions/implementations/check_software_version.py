@@ -16,6 +16,8 @@ from wadebug.wa_actions.base import WAAction
 class CheckSoftwareVersion(WAAction):
     user_facing_name = "check_software_version"
     short_description = "Action to test whether software version is up-to-date"
+    priority = 5
+    expected_cost = 2
 
     @classmethod
     def _run(cls, config, *args, **kwargs):
@@ -27,14 +29,21 @@ class CheckSoftwareVersion(WAAction):
             wa_containers = docker_utils.get_wa_containers()
             versions_to_wa_containers_dict = defaultdict(lambda: defaultdict(list))
             for wa_container in wa_containers:
-                container = wa_container.container
-                container_type = wa_container.get_container_type()
-                if docker_utils.is_container_running(container):
-                    if wa_container.is_webapp() or wa_container.is_coreapp():
-                        version = docker_utils.get_wa_version_from_container(container)
-                        versions_to_wa_containers_dict[version][container_type].append(
-                            container
+                if not wa_container.is_running() or wa_container.is_db():
+                    continue
+                if wa_container.version is None:
+                    # e.g. only tagged "latest", its expiration is unknown
+                    warnings.append(
+                        "{}: Version of your container cannot be checked, its "
+                        "image is not tagged with a release (e.g. v2.31.4)".format(
+                            wa_container.name
                         )
+                    )
+                else:
+                    version = docker_utils.get_version(wa_container.version)
+                    versions_to_wa_containers_dict[version][wa_container.role].append(
+                        wa_container.container
+                    )
             return versions_to_wa_containers_dict
 
         def is_valid_version(version, wa_containers_dict):
@@ -122,8 +131,9 @@ class CheckSoftwareVersion(WAAction):
             warning_str = "Warning Message: {}\n"
             return results.Warning(
                 cls,
-                "Some of your WhatsApp conatiners are nearing expiration or "
-                "more than one valid version is running",
+                "Some of your WhatsApp conatiners are nearing expiration, "
+                "their version cannot be checked or more than one valid "
+                "version is running",
                 "\n".join([warning_str.format(w) for w in warnings]),
                 "Please find the following link to find latest version: "
                 "https://developers.facebook.com/docs/whatsapp/changelog\n"
@@ -19,6 +19,8 @@ class CheckWebappPortAction(WAAction):
     short_description = "Check if webapp maps container port {} to host".format(
         WEBAPP_PRIVATE_PORT
     )
+    priority = 5
+    expected_cost = 1
 
     @classmethod
     def _run(cls, config, *args, **kwargs):
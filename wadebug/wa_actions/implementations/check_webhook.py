@@ -15,7 +15,7 @@ from wadebug.exceptions import (
     WABizGeneralError,
     WABizNetworkError,
 )
-from wadebug.wa_actions import curl_utils, docker_utils
+from wadebug.wa_actions import curl_utils, docker_utils, run_stats
 from wadebug.wa_actions.base import WAAction
 from wadebug.wa_actions.curl_utils import CURLTestResult
 from wadebug.wa_actions.wabiz_api import WABizAPI
@@ -27,11 +27,19 @@ ACCEPTABLE_RESPONSE_TIME = 3
 TEST_POST_DATA_STRING = '{"wadebug_webhook_test":"test"}'
 DEST_PATH = "/usr/local/waent"
 
+# name of the observation of the response time in seconds (see run_stats.observe)
+WEBHOOK_RESPONSE_TIME = "webhook_response_seconds"
+
 
 class CheckWebhookAction(WAAction):
     user_facing_name = "check_webhook"
     short_description = "Test if the webhook is accessible and responsive"
     config_dependencies = ("webapp.baseUrl", "webapp.user", "webapp.password")
+    prerequisites = ("containers_status",)
+    priority = 1
+    expected_cost = 6
+    # the webhook may go down or slow down at any time
+    cacheable = False
 
     @classmethod
     def _run(cls, config, *args, **kwargs):
@@ -76,6 +84,9 @@ class CheckWebhookAction(WAAction):
             container, webhook_url, TEST_POST_DATA_STRING, REQ_TIMEOUT, dest_cert
         )
 
+        if response_time is not None:
+            run_stats.observe(WEBHOOK_RESPONSE_TIME, response_time)
+
         if result == CURLTestResult.CONNECTION_ERROR:
             return _result_webhook_could_not_connect(cls)
         elif result == CURLTestResult.SSL_CERT_UNKNOWN:
@@ -123,7 +134,7 @@ def _result_webhook_no_cert_uploaded(cls):
 
 
 def _result_get_webhook_error(cls, exception):
-    results.Problem(cls, "Unable to check webhook", str(exception), "")
+    return results.Problem(cls, "Unable to check webhook", str(exception), "")
 
 
 def _result_webhook_could_not_connect(cls):
@@ -0,0 +1,68 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import json
+import os
+
+from wadebug import results
+from wadebug.file_utils import write_json_atomically
+from wadebug.wa_actions.base import get_action_by_name
+
+
+"""
+Results of the last run, persisted so that `wadebug rerun` can run it again.
+"""
+
+LAST_RUN_FILE = "last_run.json"
+# results worth executing again with `wadebug rerun --failed`. Skipped actions,
+# e.g. whose prerequisites failed, are included so they get another chance too
+FAILED_RESULTS = ("problem", "warning", "wadebug_error", "timed_out", "skipped")
+
+
+def save(cache_dir, result):
+    """Persist result, the {user_facing_name: to_dict()} of a run, in its order."""
+    try:
+        write_json_atomically(
+            os.path.join(cache_dir, LAST_RUN_FILE),
+            {"results": list(result.values())},
+        )
+    except Exception:
+        # only needed by rerun, failing to save must not fail this run
+        pass
+
+
+def load(cache_dir):
+    """Results of the last run as a list of to_dict(), None if there is none."""
+    try:
+        with open(os.path.join(cache_dir, LAST_RUN_FILE), "r") as f:
+            return json.load(f)["results"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def get_actions_to_rerun(last_results, failed_only=False):
+    """Actions of the last run and the results to reuse for them.
+
+    Returns a tuple (actions, reused_results) for run_actions. With failed_only,
+    the results of actions that passed are reused instead of running them again.
+    Actions that no longer exist are left out.
+    """
+    actions = []
+    reused_results = {}
+    for payload in last_results:
+        try:
+            act = get_action_by_name(payload["user_facing_name"])
+        except KeyError:
+            continue
+        actions.append(act)
+
+        if failed_only and payload["result"].lower() not in FAILED_RESULTS:
+            res = results.from_dict(act, payload)
+            res.cached = True
+            reused_results[act.user_facing_name] = res
+
+    return actions, reused_results
@@ -11,10 +11,9 @@ import os
 import shutil
 from datetime import datetime, timedelta, timezone
 
-import docker
 from wadebug import exceptions
 from wadebug.config import Config
-from wadebug.wa_actions import docker_utils
+from wadebug.wa_actions import docker_utils, sessions
 from wadebug.wa_actions.wabiz_api import WABizAPI
 
 
@@ -82,6 +81,11 @@ def get_container_logs_start_end_datetimes(
 
 
 def get_logs(logs_start_dt, logs_end_dt):
+    # helpers share one docker_utils.DockerInventory for all containers
+    return sessions.new_run_context().run(collect_logs, logs_start_dt, logs_end_dt)
+
+
+def collect_logs(logs_start_dt, logs_end_dt):
     wa_containers = docker_utils.get_wa_containers()
     log_files = []
     errors = []
@@ -168,6 +172,8 @@ def get_webcontainer_logs(wa_container):
 
 
 def copy_additional_logs_for_webcontainer(container, path, file_name):
+    import docker
+
     try:
         logs = docker_utils.get_archive_from_container(container, path, file_name)
         path = os.path.join(OUTPUT_FOLDER, "{}-{}".format(container.name, file_name))
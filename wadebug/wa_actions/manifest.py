@@ -0,0 +1,112 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import importlib
+import inspect
+import json
+import os
+import pkgutil
+
+from wadebug.wa_actions import implementations
+from wadebug.wa_actions.base import WAAction
+
+
+"""
+Generates action_manifest.py, the index of built-in actions.
+
+The manifest maps the user_facing_name of each action of
+wa_actions.implementations to its module, class, description and config
+dependencies, so that actions can be listed and found without importing every
+module. Run after adding or changing an action:
+
+    $ python -m wadebug.wa_actions.manifest
+"""
+
+MANIFEST_PATH = os.path.join(os.path.dirname(__file__), "action_manifest.py")
+
+# modules of wa_actions.implementations, in the order their actions are listed
+# and run. Add new modules here, test_manifest checks none is missing.
+ACTION_MODULES = (
+    "check_containers",
+    "check_db_settings_exist",
+    "check_mysql_connection",
+    "check_mysql_password",
+    "check_mysql_permissions",
+    "check_mysql_version",
+    "check_network",
+    "check_software_version",
+    "check_webapp_port",
+    "check_webhook",
+    "dummy_action",
+)
+
+HEADER = """# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+# Generated by `python -m wadebug.wa_actions.manifest`, do not edit.
+# flake8: noqa
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+
+"""
+
+
+def build_manifest():
+    """Dict of user_facing_name -> details of each action in implementations.
+
+    Actions are in the order of ACTION_MODULES, then of their definition.
+    """
+    manifest = {}
+    for module_name in ACTION_MODULES:
+        module = importlib.import_module(
+            "{}.{}".format(implementations.__name__, module_name)
+        )
+        for act in get_module_actions(module):
+            manifest[act.user_facing_name] = {
+                "module": module.__name__,
+                "class": act.__name__,
+                "short_description": act.short_description,
+                "config_dependencies": list(act.config_dependencies),
+            }
+    return manifest
+
+
+def get_implementation_modules():
+    """Names of all modules of wa_actions.implementations."""
+    return {
+        module_info.name
+        for module_info in pkgutil.iter_modules(implementations.__path__)
+    }
+
+
+def get_module_actions(module):
+    """WAAction classes defined in module, in the order they are defined."""
+    return [
+        value
+        for value in vars(module).values()
+        if inspect.isclass(value)
+        and issubclass(value, WAAction)
+        and value is not WAAction
+        and value.__module__ == module.__name__
+    ]
+
+
+def render_manifest(manifest):
+    # json of these values is also a valid python literal
+    return HEADER + "ACTIONS = {}\n".format(json.dumps(manifest, indent=4))
+
+
+def write_manifest(path=MANIFEST_PATH):
+    with open(path, "w") as f:
+        f.write(render_manifest(build_manifest()))
+
+
+if __name__ == "__main__":
+    write_manifest()
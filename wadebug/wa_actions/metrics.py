@@ -0,0 +1,207 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from wadebug.wa_actions.implementations import check_network, check_webhook
+from wadebug.wa_actions.watch import run_periodically
+
+
+"""
+Results of actions as Prometheus gauges, for `wadebug serve-metrics`.
+
+A collector thread runs the actions every interval and renders the metrics
+once a run finishes. Scrapes are answered with the last rendered snapshot, so
+they never run actions nor wait for a run in progress. A run that fails is
+logged and sets wadebug_collector_up to 0, the collector keeps running.
+"""
+
+logger = logging.getLogger(__name__)
+
+METRICS_PATH = "/metrics"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# values of the status label of wadebug_action_status, see Result.result
+STATUSES = ("ok", "warning", "problem", "skipped", "timed_out", "wadebug_error")
+
+# help of the gauges made of what actions observe (see run_stats.observe)
+OBSERVATION_HELP = {
+    check_webhook.WEBHOOK_RESPONSE_TIME: "Seconds the webhook took to respond "
+    "to a test request sent from a coreapp container.",
+    check_network.HOST_REACHABLE: "1 if the host can be reached from a coreapp "
+    "container, 0 otherwise.",
+}
+
+
+class MetricsServer(ThreadingHTTPServer):
+    """HTTP server answering scrapes with the last published snapshot."""
+
+    daemon_threads = True
+
+    def __init__(self, server_address):
+        super(MetricsServer, self).__init__(server_address, MetricsRequestHandler)
+        # replaced as a whole by publish, scrapes never see a partial snapshot
+        self.snapshot = render_metrics([], runs=0)
+
+    def publish(self, snapshot):
+        self.snapshot = snapshot
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != METRICS_PATH:
+            self.send_error(404, "Metrics are served on {}".format(METRICS_PATH))
+            return
+
+        body = self.server.snapshot
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # a line per scrape would flood the output
+        pass
+
+
+def serve_metrics(actions, config, address, port, interval, **kwargs):
+    """Serve metrics of actions run every `interval` seconds until interrupted.
+
+    Other keyword arguments are passed to run_actions.
+    """
+    server = MetricsServer((address, port))
+    collector = threading.Thread(
+        target=collect_metrics,
+        args=(actions, config, interval, server.publish),
+        kwargs=kwargs,
+        name="wadebug-metrics-collector",
+    )
+    collector.daemon = True
+    collector.start()
+
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+def collect_metrics(actions, config, interval, publish, cycles=None, **kwargs):
+    """Run actions periodically, publishing the rendered metrics of each run.
+
+    After a failed run the results of the last successful one are published
+    again, with wadebug_collector_up set to 0.
+    """
+    last_results, runs, finished_at = [], 0, None
+    for _, cycle_results in run_periodically(
+        actions, config, interval, cycles, on_error=log_failed_run, **kwargs
+    ):
+        up = cycle_results is not None
+        if up:
+            last_results, runs, finished_at = cycle_results, runs + 1, time.time()
+        try:
+            publish(render_metrics(last_results, runs, finished_at, collector_up=up))
+        except Exception:
+            logger.exception("Could not render the metrics of the last run")
+
+
+def log_failed_run(exception):
+    logger.error("Run of the actions failed", exc_info=exception)
+
+
+def render_metrics(action_results, runs, finished_at=None, collector_up=True):
+    """Prometheus text exposition of the results of a run, as bytes."""
+    lines = []
+
+    def add_metric(name, help_text, samples, metric_type="gauge"):
+        lines.append("# HELP {} {}".format(name, help_text))
+        lines.append("# TYPE {} {}".format(name, metric_type))
+        for labels, value in samples:
+            lines.append("{}{} {}".format(name, format_labels(labels), value))
+
+    action_results = sorted(action_results, key=lambda r: r.action.user_facing_name)
+
+    add_metric(
+        "wadebug_collector_up",
+        "1 if the last run of the actions completed, 0 if it failed.",
+        [({}, int(collector_up))],
+    )
+    add_metric(
+        "wadebug_runs_total", "Runs of the actions completed.", [({}, runs)], "counter"
+    )
+    if finished_at is not None:
+        add_metric(
+            "wadebug_last_run_timestamp_seconds",
+            "Unix time the last run of the actions finished.",
+            [({}, format_value(finished_at))],
+        )
+
+    add_metric(
+        "wadebug_action_status",
+        "Result of the last run of the action, 1 for its current status.",
+        [
+            (
+                {"action": res.action.user_facing_name, "status": status},
+                int(res.result == status),
+            )
+            for res in action_results
+            for status in STATUSES
+        ],
+    )
+    add_metric(
+        "wadebug_action_duration_seconds",
+        "Seconds the last run of the action took.",
+        [
+            (
+                {"action": res.action.user_facing_name},
+                format_value(res.stats["duration_ms"] / 1000),
+            )
+            for res in action_results
+            if res.stats and res.stats.get("duration_ms") is not None
+        ],
+    )
+
+    observations = {}
+    for res in action_results:
+        for observation in (res.stats or {}).get("observations", ()):
+            labels = dict(observation["labels"], action=res.action.user_facing_name)
+            observations.setdefault(observation["name"], []).append(
+                (labels, format_value(observation["value"]))
+            )
+    for name in sorted(observations):
+        add_metric(
+            "wadebug_{}".format(name),
+            OBSERVATION_HELP.get(name, "Measured by the action."),
+            observations[name],
+        )
+
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{{{}}}".format(
+        ",".join(
+            '{}="{}"'.format(key, escape_label_value(labels[key]))
+            for key in sorted(labels)
+        )
+    )
+
+
+def escape_label_value(value):
+    return (
+        str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    )
+
+
+def format_value(value):
+    # repr keeps every digit of timestamps, where "{:g}" would round them
+    return repr(float(value)) if isinstance(value, float) else str(int(value))
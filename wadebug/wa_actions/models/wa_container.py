@@ -4,64 +4,176 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
+import re
+from types import MappingProxyType
+
 
 WA_WEB_CONTAINER_TAG = "whatsapp.biz/web"
 WA_COREAPP_CONTAINER_TAG = "whatsapp.biz/coreapp"
 MYSQL_CONTAINER_TAG = "mysql"
+CONTAINER_RUNNING = "running"
+# tags of images recognized, by precedence
+ROLES = (WA_COREAPP_CONTAINER_TAG, WA_WEB_CONTAINER_TAG, MYSQL_CONTAINER_TAG)
+# optional label of containers naming their role, e.g. whatsapp.biz/role=coreapp
+ROLE_LABEL = "whatsapp.biz/role"
+ROLE_LABEL_VALUES = {
+    "coreapp": WA_COREAPP_CONTAINER_TAG,
+    "web": WA_WEB_CONTAINER_TAG,
+    "mysql": MYSQL_CONTAINER_TAG,
+}
+# tags of WhatsApp Business API releases, see docker_utils.get_version
+VERSION_PATTERN = re.compile(r"v2\.\d+\.\d+")
 
 
-class WAContainer:
-    def __init__(self, docker_container):
-        self.container = docker_container
+class WAContainer(object):
+    """Immutable record of a WhatsApp Business API or MySQL container.
 
-    def __getattr__(self, attr):
-        if attr in self.__dict__:
-            return getattr(self, attr)
-        return getattr(self.container, attr)
+    Its fields are computed once, when containers are listed (see
+    docker_utils.DockerInventory), so reading them never asks the Docker
+    daemon.
 
-    def is_coreapp(self):
-        return (
-            len(
-                [
-                    repo_tag
-                    for repo_tag in self.image.attrs["RepoTags"]
-                    if WA_COREAPP_CONTAINER_TAG in repo_tag
-                ]
+    The SDK container stays in `container`: actions run commands in it, read
+    its logs and copy files out of it, and getting it again would cost a
+    request to the daemon each time. It is the object the inventory of the
+    run already holds, not a copy, and is released with it after the run.
+
+    role is the tag of its image it was recognized by (WA_COREAPP_CONTAINER_TAG,
+    WA_WEB_CONTAINER_TAG or MYSQL_CONTAINER_TAG), version the release its
+    image is tagged with for WhatsApp containers, e.g. "v2.31.4", None when
+    not tagged with one, e.g. "latest". Containers labeled with ROLE_LABEL
+    take their role from the label instead, whatever their image.
+    """
+
+    __slots__ = (
+        "container",
+        "id",
+        "name",
+        "role",
+        "version",
+        "status",
+        "port_bindings",
+    )
+
+    def __init__(self, docker_container, repo_tags=None):
+        if repo_tags is None:
+            # requests the image from Docker, DockerInventory gives repo_tags
+            repo_tags = docker_container.image.attrs["RepoTags"]
+        role, version = get_role_and_version(repo_tags)
+        label_role = get_label_role(docker_container.attrs)
+        if label_role is not None:
+            role = label_role
+            version = (
+                None if role == MYSQL_CONTAINER_TAG else get_first_release(repo_tags)
             )
-            > 0
-        )
+        host_config = docker_container.attrs.get("HostConfig") or {}
 
-    def is_webapp(self):
+        fields = {
+            "container": docker_container,
+            "id": docker_container.id,
+            "name": docker_container.name,
+            "role": role,
+            "version": version,
+            "status": docker_container.status,
+            "port_bindings": MappingProxyType(host_config.get("PortBindings") or {}),
+        }
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("WAContainer is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("WAContainer is immutable")
+
+    @property
+    def short_id(self):
+        return self.id[:12]
+
+    def __eq__(self, other):
+        if not isinstance(other, WAContainer):
+            return NotImplemented
         return (
-            len(
-                [
-                    repo_tag
-                    for repo_tag in self.image.attrs["RepoTags"]
-                    if WA_WEB_CONTAINER_TAG in repo_tag
-                ]
-            )
-            > 0
+            self.id == other.id
+            and self.status == other.status
+            and self.role == other.role
+            and self.version == other.version
+            and self.name == other.name
         )
 
-    def is_db(self):
-        return (
-            len(
-                [
-                    repo_tag
-                    for repo_tag in self.image.attrs["RepoTags"]
-                    if MYSQL_CONTAINER_TAG in repo_tag
-                ]
-            )
-            > 0
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __hash__(self):
+        # ids are unique, equal records have the same one
+        return hash(self.id)
+
+    def __repr__(self):
+        return "WAContainer(name={!r}, role={!r}, version={!r}, status={!r})".format(
+            self.name, self.role, self.version, self.status
         )
 
+    def is_coreapp(self):
+        return self.role == WA_COREAPP_CONTAINER_TAG
+
+    def is_webapp(self):
+        return self.role == WA_WEB_CONTAINER_TAG
+
+    def is_db(self):
+        return self.role == MYSQL_CONTAINER_TAG
+
     def is_running(self):
-        return self.status == "running"
+        return self.status == CONTAINER_RUNNING
 
     def get_container_type(self):
-        if self.is_coreapp():
-            return WA_COREAPP_CONTAINER_TAG
-        elif self.is_webapp():
-            return WA_WEB_CONTAINER_TAG
-        else:
-            return MYSQL_CONTAINER_TAG
+        return self.role
+
+
+def get_role_and_version(repo_tags):
+    """(role, version) of a container whose image has repo_tags.
+
+    The role is the first of ROLES found in repo_tags, None for other images.
+    The version is the first release among the repo tags of that role, e.g. of
+    an image tagged both "latest" and "v2.31.4", see get_release. It is None
+    for MySQL images.
+    """
+    for role in ROLES:
+        role_tags = [repo_tag for repo_tag in repo_tags if role in repo_tag]
+        if not role_tags:
+            continue
+        if role == MYSQL_CONTAINER_TAG:
+            return role, None
+        return role, get_first_release(role_tags)
+    return None, None
+
+
+def get_first_release(repo_tags):
+    """First release among repo_tags, see get_release, None if there is none."""
+    for repo_tag in repo_tags:
+        release = get_release(repo_tag)
+        if release is not None:
+            return release
+    return None
+
+
+def get_release(repo_tag):
+    """Tag of repo_tag if it is a release, e.g. "v2.31.4", None for "latest"."""
+    tag = get_tag(repo_tag)
+    if tag is None or not VERSION_PATTERN.fullmatch(tag):
+        return None
+    return tag
+
+
+def get_tag(repo_tag):
+    """Tag of repo_tag, e.g. "v2.31.4" for "whatsapp.biz/web:v2.31.4", or None."""
+    # the tag follows the last ":" of the last path component
+    repository, _, tag = repo_tag.rpartition(":")
+    if not repository or "/" in tag:
+        return None
+    return tag
+
+
+def get_label_role(attrs):
+    """Role named by the ROLE_LABEL of a container, None if not labeled."""
+    labels = (attrs.get("Config") or {}).get("Labels") or {}
+    return ROLE_LABEL_VALUES.get(labels.get(ROLE_LABEL))
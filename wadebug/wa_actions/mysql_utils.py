@@ -5,10 +5,13 @@
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
-import pymysql.cursors
+from wadebug.wa_actions import run_stats
 
 
 class MySQLUtil:
+    CONNECT_TIMEOUT = 10
+    READ_TIMEOUT = 20
+
     def __init__(self, host="", port=0, user="", password=""):
         if host and port and user and password:
             self.db_host = host
@@ -19,12 +22,17 @@ class MySQLUtil:
             raise ValueError("Wrong input parameters")
 
     def create_connection(self):
+        # imported here, only actions connecting to MySQL need pymysql
+        import pymysql.cursors
+
         connection = pymysql.connect(
             host=self.db_host,
             port=self.db_port,
             user=self.db_user,
             password=self.db_password,
             cursorclass=pymysql.cursors.DictCursor,
+            connect_timeout=self.CONNECT_TIMEOUT,
+            read_timeout=self.READ_TIMEOUT,
         )
         return connection
 
@@ -36,6 +44,7 @@ class MySQLUtil:
         connection = self.create_connection()
         with connection:
             cursor = connection.cursor()
+            run_stats.count_call(run_stats.SQL)
             cursor.execute("SELECT version()")
             result = cursor.fetchone()
             return result["version()"]
@@ -45,6 +54,7 @@ class MySQLUtil:
         with connection:
             cursor = connection.cursor()
             sql = "SELECT {} FROM mysql.user WHERE user=%s".format(",".join(privileges))
+            run_stats.count_call(run_stats.SQL)
             cursor.execute(sql, (user,))
             result = cursor.fetchone()
             return result
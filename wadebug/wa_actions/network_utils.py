@@ -5,9 +5,12 @@
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+from wadebug.wa_actions import async_docker_utils, run_stats
+
 
 def hostname_reachable_from_container(container, hostname, port, timeout):
     try:
+        run_stats.count_call(run_stats.DOCKER_EXEC)
         exec_result = container.exec_run(
             ["nc", "-zv", hostname, str(port), "-w", str(timeout)]
         )
@@ -17,5 +20,16 @@ def hostname_reachable_from_container(container, hostname, port, timeout):
         return False
 
 
+async def hostname_reachable_from_container_async(container, hostname, port, timeout):
+    try:
+        exec_result = await async_docker_utils.exec_run(
+            container, ["nc", "-zv", hostname, str(port), "-w", str(timeout)]
+        )
+        exit_code = exec_result[0]
+        return exit_code == 0
+    except Exception:
+        return False
+
+
 def hostname_not_reachable_from_container(container, hostname, port, timeout):
     return not hostname_reachable_from_container(container, hostname, port, timeout)
@@ -0,0 +1,65 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import cProfile
+import os
+import pstats
+
+
+"""
+Profiling of actions with cProfile (see --profile).
+
+Each action gets a <user_facing_name>.pstats file in the profile directory.
+Once the run is over, they are merged into merged.pstats and the functions
+taking the most time are listed in summary.txt.
+"""
+
+PROFILE_EXTENSION = ".pstats"
+MERGED_PROFILE_FILENAME = "merged" + PROFILE_EXTENSION
+SUMMARY_FILENAME = "summary.txt"
+SUMMARY_TOP_FUNCTIONS = 30
+# pstats sort keys of the summary, with their description
+SUMMARY_SORT_KEYS = (
+    ("cumulative", "cumulative time"),
+    ("tottime", "time spent in the function itself"),
+)
+
+
+def get_profile_path(profile_dir, act):
+    return os.path.join(profile_dir, act.user_facing_name + PROFILE_EXTENSION)
+
+
+def call_profiled(profile_path, func, *args, **kwargs):
+    """Call func under cProfile, writing its profile to profile_path."""
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args, **kwargs)
+    finally:
+        profiler.dump_stats(profile_path)
+
+
+def write_summary(profile_dir, profile_paths, top=SUMMARY_TOP_FUNCTIONS):
+    """Merge the profiles at profile_paths and summarize their hottest functions.
+
+    Profiles that were not written, e.g. of actions still running after timing
+    out, are left out. Returns the path of the summary, or None without profiles.
+    """
+    profile_paths = [p for p in profile_paths if os.path.exists(p)]
+    if not profile_paths:
+        return None
+
+    summary_path = os.path.join(profile_dir, SUMMARY_FILENAME)
+    with open(summary_path, "w") as summary:
+        stats = pstats.Stats(*profile_paths, stream=summary)
+        stats.dump_stats(os.path.join(profile_dir, MERGED_PROFILE_FILENAME))
+
+        summary.write("Profiles merged: {}\n".format(", ".join(profile_paths)))
+        for sort_key, description in SUMMARY_SORT_KEYS:
+            summary.write("\nTop {} functions by {}:\n".format(top, description))
+            stats.sort_stats(sort_key).print_stats(top)
+
+    return summary_path
@@ -0,0 +1,131 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import hashlib
+import json
+import os
+import time
+
+from wadebug import results
+from wadebug.file_utils import write_json_atomically
+from wadebug.wa_actions import docker_utils
+
+
+"""
+On-disk cache of action results, keyed by a fingerprint of their inputs.
+
+The fingerprint of a run covers the Docker containers (id, image and state)
+and the ids of the images on the host. Each action adds its name and the
+values of its config_dependencies. As long as none of them changes, and for
+up to MAX_AGE seconds, the action is not executed again.
+
+Only results of actions with `cacheable = True` are stored, and only when
+they are OK, Warning or Problem: errors and timeouts are worth retrying.
+"""
+
+RESULTS_FOLDER = "results"
+# bump when the format of cache entries changes
+CACHE_VERSION = 1
+MAX_AGE = 3600
+CACHEABLE_RESULTS = (results.OK, results.Warning, results.Problem)
+
+
+class ResultCache(object):
+    def __init__(self, cache_dir, max_age=MAX_AGE):
+        self.directory = os.path.join(cache_dir, RESULTS_FOLDER)
+        self.max_age = max_age
+
+    def get_environment_fingerprint(self):
+        """Hash of the containers and images on the host, None if Docker fails.
+
+        Uses two requests to the Docker API, instead of one for each container
+        like docker_utils.get_all_containers.
+        """
+        try:
+            client = docker_utils.get_docker_client()
+            containers = client.api.containers(all=True)
+            image_ids = client.api.images(quiet=True)
+        except Exception:
+            return None
+
+        return get_hash(
+            {
+                "containers": sorted(
+                    [c["Id"], c["ImageID"], c["State"]] for c in containers
+                ),
+                "images": sorted(image_ids),
+            }
+        )
+
+    def get(self, act, config, fingerprint):
+        """Cached result of act for this fingerprint and config, or None."""
+        if not is_cacheable(act):
+            return None
+
+        try:
+            with open(self.get_entry_path(act, config, fingerprint), "r") as f:
+                entry = json.load(f)
+            if time.time() - entry["created_at"] > self.max_age:
+                return None
+            res = results.from_dict(act, entry["result"])
+        except Exception:
+            # missing or unreadable, it will be overwritten
+            return None
+
+        res.cached = True
+        return res
+
+    def put(self, act, config, fingerprint, res):
+        if not is_cacheable(act) or not isinstance(res, CACHEABLE_RESULTS):
+            return
+
+        entry = {"created_at": time.time(), "result": res.to_dict()}
+        try:
+            write_json_atomically(self.get_entry_path(act, config, fingerprint), entry)
+        except Exception:
+            # the cache is an optimization, failing to write it is not an error
+            pass
+
+    def prune(self):
+        """Delete entries older than max_age."""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                if time.time() - os.path.getmtime(path) > self.max_age:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def get_entry_path(self, act, config, fingerprint):
+        import pydash
+
+        key = get_hash(
+            {
+                "version": CACHE_VERSION,
+                "action": act.__name__,
+                "environment": fingerprint,
+                "config": {
+                    dependency: pydash.get(config, dependency)
+                    for dependency in act.config_dependencies
+                },
+            }
+        )
+        return os.path.join(self.directory, "{}.json".format(key))
+
+
+def is_cacheable(act):
+    return getattr(act, "cacheable", False)
+
+
+def get_hash(value):
+    serialized = json.dumps(value, sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode()).hexdigest()
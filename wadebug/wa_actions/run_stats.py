@@ -0,0 +1,105 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import contextvars
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+
+"""
+Accounting of the time spent and the calls made to each backend by an action.
+
+WAAction.run records stats while the action executes. Helpers talking to a
+backend call count_call, which adds to the stats of the action running in the
+current thread or coroutine, if any. Actions can also record measurements of
+what they check with observe, e.g. the response time of the webhook.
+"""
+
+DOCKER_API = "docker_api"
+DOCKER_EXEC = "docker_exec"
+HTTP = "http"
+SQL = "sql"
+
+_current_stats = contextvars.ContextVar("wadebug_run_stats", default=None)
+
+
+class RunStats(object):
+    def __init__(
+        self, duration_ms=None, cpu_time_ms=None, calls=None, observations=None
+    ):
+        self.duration_ms = duration_ms
+        self.cpu_time_ms = cpu_time_ms
+        self.calls = Counter(calls or {})
+        self.observations = list(observations or [])
+        self._lock = threading.Lock()
+
+    def count_call(self, backend, count=1):
+        with self._lock:
+            self.calls[backend] += count
+
+    def observe(self, name, value, labels):
+        with self._lock:
+            self.observations.append({"name": name, "value": value, "labels": labels})
+
+    def to_dict(self):
+        ret = {
+            "duration_ms": self.duration_ms,
+            "cpu_time_ms": self.cpu_time_ms,
+            "calls": dict(self.calls),
+        }
+        # most actions observe nothing, keep their results short
+        if self.observations:
+            ret["observations"] = list(self.observations)
+        return ret
+
+    @classmethod
+    def from_dict(cls, payload):
+        return cls(
+            payload["duration_ms"],
+            payload["cpu_time_ms"],
+            payload["calls"],
+            payload.get("observations"),
+        )
+
+
+def count_call(backend, count=1):
+    """Count calls to backend for the action running in this thread or coroutine."""
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.count_call(backend, count)
+
+
+def observe(name, value, **labels):
+    """Record a measurement made by the action running in this thread or coroutine.
+
+    e.g.: observe("host_reachable", 1, host="graph.facebook.com")
+    """
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.observe(name, value, labels)
+
+
+@contextmanager
+def recording(measure_cpu=True):
+    """Record stats of the code executed in this block.
+
+    CPU time is measured for the current thread. Coroutines share their thread
+    with others, so pass measure_cpu=False for them.
+    """
+    stats = RunStats()
+    token = _current_stats.set(stats)
+    start = time.perf_counter()
+    cpu_start = time.thread_time() if measure_cpu else None
+    try:
+        yield stats
+    finally:
+        stats.duration_ms = round((time.perf_counter() - start) * 1000, 1)
+        if measure_cpu:
+            stats.cpu_time_ms = round((time.thread_time() - cpu_start) * 1000, 1)
+        _current_stats.reset(token)
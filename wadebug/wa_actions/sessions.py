@@ -0,0 +1,138 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+"""
+Reuse of clients and sessions between runs of actions in the same process.
+
+By default every helper creates its own clients: the HTTP session and the
+login to the WhatsApp Business API. Within `reusing()`, e.g. in `wadebug
+watch`, they are created once and shared by all actions instead. The Docker
+client is always shared by the whole process, see docker_utils.
+
+Objects describing the state of the host, e.g. its Docker containers, must not
+outlive a run. Those are shared by the actions of one run only, see
+get_or_create_for_run.
+"""
+
+_lock = threading.Lock()
+# key -> (object, time it was created), None when not reusing
+_objects = None
+# RunObjects of the run in progress, see new_run_context
+_run_objects = contextvars.ContextVar("run_objects", default=None)
+
+
+def get_or_create(key, factory, max_age=None):
+    """Object created by factory(), shared under key while reusing.
+
+    Outside reusing() a new object is created every time. Objects older than
+    `max_age` seconds are created again.
+    """
+    with _lock:
+        if _objects is None:
+            reuse = False
+        else:
+            reuse = True
+            obj, created_at = _objects.get(key, (None, None))
+            if created_at is not None and (
+                max_age is None or time.monotonic() - created_at < max_age
+            ):
+                return obj
+
+    obj = factory()
+    if reuse:
+        with _lock:
+            if _objects is not None:
+                _objects[key] = (obj, time.monotonic())
+    return obj
+
+
+class RunObjects(object):
+    def __init__(self):
+        self.objects = {}
+        self.pid = os.getpid()
+
+
+def get_or_create_for_run(key, factory):
+    """Object created by factory(), shared under key by the actions of a run.
+
+    Outside a run context (see new_run_context) a new object is created every
+    time. factory() is called with a lock held, it should not block.
+    """
+    run_objects = _run_objects.get()
+    if run_objects is None:
+        return factory()
+    with _lock:
+        if run_objects.pid != os.getpid():
+            # the objects of the parent process are not shared with --isolate
+            run_objects.objects.clear()
+            run_objects.pid = os.getpid()
+        if key not in run_objects.objects:
+            run_objects.objects[key] = factory()
+        return run_objects.objects[key]
+
+
+def is_in_run():
+    """Whether code runs in a run context, see new_run_context."""
+    return _run_objects.get() is not None
+
+
+def new_run_context():
+    """Copy of the current context with objects of its own for a run.
+
+    Code run in it, and in threads and coroutines started from it, shares the
+    objects of get_or_create_for_run.
+    """
+    context = contextvars.copy_context()
+    context.run(_run_objects.set, RunObjects())
+    return context
+
+
+def forget(key):
+    """Stop sharing the object under key, e.g. after it stopped working."""
+    with _lock:
+        if _objects is not None:
+            _objects.pop(key, None)
+
+
+def _forget_all_after_fork():
+    # the connections of the objects belong to the parent process (see --isolate)
+    global _lock
+    _lock = threading.Lock()
+    if _objects is not None:
+        _objects.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_all_after_fork)
+
+
+def is_reusing():
+    return _objects is not None
+
+
+@contextmanager
+def reusing():
+    """Share the objects created with get_or_create within this block."""
+    global _objects
+    with _lock:
+        _objects = {}
+    try:
+        yield
+    finally:
+        with _lock:
+            objects, _objects = _objects, None
+        for obj, _ in objects.values():
+            close = getattr(obj, "close", None)
+            if callable(close):
+                close()
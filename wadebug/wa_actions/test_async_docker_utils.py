@@ -0,0 +1,124 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import asyncio
+import json
+import os
+import struct
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+from wadebug import exceptions
+from wadebug.wa_actions import async_docker_utils
+
+
+def http_response(status, body, chunked=False):
+    head = "HTTP/1.1 {} OK\r\n".format(status)
+    if chunked:
+        head += "Transfer-Encoding: chunked\r\n\r\n"
+        return head.encode() + b"%x\r\n" % len(body) + body + b"\r\n0\r\n\r\n"
+    head += "Content-Length: {}\r\n\r\n".format(len(body))
+    return head.encode() + body
+
+
+def stream_frame(stream_type, data):
+    return struct.pack(">BxxxI", stream_type, len(data)) + data
+
+
+class MockDockerDaemon:
+    """Answers exec requests on a unix socket like the Docker Engine API does."""
+
+    def __init__(self, exit_code=0, output=b"", create_status=201):
+        self.exit_code = exit_code
+        self.output = output
+        self.create_status = create_status
+        self.requests = []
+
+    async def handle(self, reader, writer):
+        request_line = (await reader.readline()).decode()
+        method, path, _ = request_line.split(" ")
+        content_length = 0
+        while True:
+            line = (await reader.readline()).decode().strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            if name.lower() == "content-length":
+                content_length = int(value)
+        body = await reader.readexactly(content_length)
+        self.requests.append((method, path, json.loads(body) if body else None))
+
+        if path.endswith("/exec"):
+            response = http_response(self.create_status, b'{"Id": "exec-id"}')
+        elif path.endswith("/start"):
+            stdout = stream_frame(1, self.output)
+            response = b"HTTP/1.1 200 OK\r\n\r\n" + stdout
+        else:
+            details = json.dumps({"ExitCode": self.exit_code}).encode()
+            response = http_response(200, details, chunked=True)
+
+        writer.write(response)
+        await writer.drain()
+        writer.close()
+
+
+def exec_run_against(daemon, container, cmd):
+    async def run(socket_path):
+        server = await asyncio.start_unix_server(daemon.handle, path=socket_path)
+        try:
+            return await async_docker_utils.exec_run(container, cmd)
+        finally:
+            server.close()
+
+    with tempfile.TemporaryDirectory() as folder:
+        socket_path = os.path.join(folder, "docker.sock")
+        with patch.dict(os.environ, {"DOCKER_HOST": "unix://" + socket_path}):
+            return asyncio.run(run(socket_path))
+
+
+class TestExecRun(unittest.TestCase):
+    def test_should_return_exit_code_and_output(self):
+        daemon = MockDockerDaemon(exit_code=0, output=b"200:0.5")
+        container = Mock(id="container-id")
+
+        exit_code, output = exec_run_against(daemon, container, ["curl", "url"])
+
+        assert exit_code == 0
+        assert output == b"200:0.5"
+        assert daemon.requests[0] == (
+            "POST",
+            "/containers/container-id/exec",
+            {"AttachStdout": True, "AttachStderr": True, "Cmd": ["curl", "url"]},
+        )
+        assert [r[1] for r in daemon.requests[1:]] == [
+            "/exec/exec-id/start",
+            "/exec/exec-id/json",
+        ]
+
+    def test_should_raise_on_error_response(self):
+        daemon = MockDockerDaemon(create_status=404)
+
+        with self.assertRaises(exceptions.DockerAPIError):
+            exec_run_against(daemon, Mock(id="gone"), ["nc"])
+
+    @patch.dict(os.environ, {"DOCKER_HOST": "tcp://127.0.0.1:2375"})
+    def test_should_fall_back_to_sdk_without_unix_socket(self):
+        container = Mock()
+        container.exec_run.return_value = (1, b"")
+
+        exit_code, _ = asyncio.run(async_docker_utils.exec_run(container, ["nc"]))
+
+        assert exit_code == 1
+        container.exec_run.assert_called_with(["nc"])
+
+
+class TestDemultiplexStream(unittest.TestCase):
+    def test_should_join_stdout_and_stderr_frames(self):
+        stream = stream_frame(1, b"out ") + stream_frame(2, b"err")
+
+        assert async_docker_utils.demultiplex_stream(stream) == b"out err"
@@ -5,11 +5,21 @@
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import os
+import re
 import unittest
 
-from unittest.mock import patch
+from unittest.mock import Mock, call, patch
 
-from wadebug.wa_actions import docker_utils
+from docker.errors import ImageNotFound
+from wadebug.wa_actions import docker_utils, sessions
+from wadebug.wa_actions.models.wa_container import (
+    MYSQL_CONTAINER_TAG,
+    ROLE_LABEL,
+    WA_COREAPP_CONTAINER_TAG,
+    WA_WEB_CONTAINER_TAG,
+    WAContainer,
+)
 from wadebug.wa_actions.tests.stubs.mock_wa_container import (
     MockDockerContainer,
     MockStoppedWAContainer,
@@ -18,9 +28,79 @@ from wadebug.wa_actions.tests.stubs.mock_wa_container import (
 )
 
 
+class MockDaemon:
+    """Lists containers and images applying filters like the Docker daemon."""
+
+    def __init__(self, repo_tags_by_container):
+        self.containers = []
+        self.images = []
+        for index, repo_tags in enumerate(repo_tags_by_container):
+            container = MockDockerContainer(repo_tags=repo_tags)
+            container.attrs["Image"] = "sha256:{}".format(index)
+            container.attrs["Config"]["Labels"] = {}
+            self.containers.append(container)
+            self.images.append({"Id": container.attrs["Image"], "RepoTags": repo_tags})
+
+    def get_all_containers(self, filters=None):
+        filters = filters or {}
+        if "ancestor" in filters:
+            return [
+                c for c in self.containers if c.attrs["Image"] in filters["ancestor"]
+            ]
+        if "label" in filters:
+            return [
+                c
+                for c in self.containers
+                if filters["label"] in c.attrs["Config"]["Labels"]
+            ]
+        return list(self.containers)
+
+    def get_all_images(self, filters=None):
+        references = (filters or {}).get("reference")
+        return [
+            image
+            for image in self.images
+            if references is None or matches_references(image, references)
+        ]
+
+    def patch(self):
+        return patch.multiple(
+            docker_utils,
+            get_all_containers=Mock(side_effect=self.get_all_containers),
+            get_all_images=Mock(side_effect=self.get_all_images),
+        )
+
+
+def matches_references(image, references):
+    """Like the "reference" filter of the daemon, on repositories and repo tags."""
+    for repo_tag in image["RepoTags"]:
+        repository = repo_tag.rsplit(":", 1)[0]
+        for reference in references:
+            # "*" matches any characters but "/", like path.Match in Go
+            pattern = "[^/]*".join(re.escape(part) for part in reference.split("*"))
+            if re.fullmatch(pattern, repo_tag) or re.fullmatch(pattern, repository):
+                return True
+    return False
+
+
+class MockRemovedImageContainer(MockDockerContainer):
+    @property
+    def image(self):
+        raise ImageNotFound("No such image")
+
+    @image.setter
+    def image(self, value):
+        pass
+
+
 class TestIsWAContainer(unittest.TestCase):
     def test_should_return_true_if_is_wa_container(self):
-        assert docker_utils.is_wa_container(MockWACoreappContainer()) is True
+        assert (
+            docker_utils.is_wa_container(
+                MockDockerContainer(repo_tags=[WA_COREAPP_CONTAINER_TAG])
+            )
+            is True
+        )
 
     def test_should_return_false_if_is_not_wa_container(self):
         assert docker_utils.is_wa_container(MockDockerContainer()) is False
@@ -29,14 +109,14 @@ class TestIsWAContainer(unittest.TestCase):
 class TestGetWAContainers(unittest.TestCase):
     def test_should_only_return_wa_containers(self):
         mock_containers = [
-            MockWACoreappContainer(),
-            MockWAWebContainer(),
+            MockDockerContainer(repo_tags=[WA_COREAPP_CONTAINER_TAG]),
+            MockDockerContainer(repo_tags=[WA_WEB_CONTAINER_TAG]),
             MockDockerContainer(),
         ]
 
         with patch.object(
             docker_utils, "get_all_containers", return_value=mock_containers
-        ):
+        ), patch.object(docker_utils, "get_all_images", return_value=[]):
             wa_containers = docker_utils.get_wa_containers()
 
             assert len(wa_containers) == 2, "Expected to get exactly 2 WA containers"
@@ -64,3 +144,248 @@ class TestGetRunningWAContainers:
             assert (
                 not mock_containers[1] in running_wa_containers
             ), "Non-running containers should not be returned"
+
+
+class TestDockerInventory(unittest.TestCase):
+    def test_should_classify_containers_from_listed_images(self):
+        coreapp = MockDockerContainer(repo_tags=[])
+        coreapp.attrs["Image"] = "sha256:coreapp"
+        images = [
+            {
+                "Id": "sha256:coreapp",
+                "RepoTags": [WA_COREAPP_CONTAINER_TAG],
+                "RepoDigests": [],
+            },
+        ]
+
+        with patch.object(
+            docker_utils, "get_all_containers", return_value=[coreapp]
+        ) as mock_get_all_containers, patch.object(
+            docker_utils, "get_all_images", return_value=images
+        ):
+            run_context = sessions.new_run_context()
+            wa_containers = run_context.run(docker_utils.get_wa_containers)
+            run_context.run(docker_utils.get_expiration_map)
+
+        assert [c.container for c in wa_containers] == [coreapp]
+        assert wa_containers[0].is_coreapp()
+        # listed once for the run, filtered by the daemon
+        assert mock_get_all_containers.call_args_list == [
+            call(filters={"ancestor": ["sha256:coreapp"]}),
+            call(filters={"label": ROLE_LABEL}),
+        ]
+
+    def test_should_take_the_role_of_labeled_containers(self):
+        container = MockDockerContainer(repo_tags=["registry.example.com/wa:v2.31.4"])
+        container.attrs["Config"]["Labels"] = {ROLE_LABEL: "web"}
+
+        with patch.object(
+            docker_utils, "get_all_containers", return_value=[container]
+        ), patch.object(
+            docker_utils, "get_all_images", return_value=[]
+        ) as mock_get_all_images:
+            wa_containers = docker_utils.get_wa_containers()
+
+        assert [c.container for c in wa_containers] == [container]
+        assert wa_containers[0].is_webapp()
+        assert wa_containers[0].version == "v2.31.4"
+        mock_get_all_images.assert_called_once_with(
+            filters={"reference": list(docker_utils.WA_IMAGE_REFERENCES)}
+        )
+
+    def test_should_not_take_latest_for_the_version_of_labeled_containers(self):
+        daemon = MockDaemon([["mysql:5.7"], ["example.com/wa:latest"]])
+        daemon.containers[1].attrs["Config"]["Labels"][ROLE_LABEL] = "coreapp"
+
+        with daemon.patch():
+            wa_containers = docker_utils.get_wa_containers()
+
+        assert [c.role for c in wa_containers] == [
+            MYSQL_CONTAINER_TAG,
+            WA_COREAPP_CONTAINER_TAG,
+        ]
+        assert wa_containers[1].version is None
+
+    def test_should_find_images_named_under_registries(self):
+        daemon = MockDaemon(
+            [
+                ["gcr.io/project/mysql:8"],
+                ["registry/team/docker.whatsapp.biz/coreapp:v2.31.4"],
+            ]
+        )
+
+        with daemon.patch():
+            wa_containers = docker_utils.get_wa_containers()
+            # found by the filtered listing
+            docker_utils.get_all_images.assert_called_once()
+
+        assert [c.role for c in wa_containers] == [
+            MYSQL_CONTAINER_TAG,
+            WA_COREAPP_CONTAINER_TAG,
+        ]
+        assert wa_containers[1].version == "v2.31.4"
+
+    def test_should_list_all_containers_when_filters_find_none(self):
+        daemon = MockDaemon(
+            [
+                ["mirror/a/b/c/d/mysql:8"],
+                ["mirror/a/b/c/d/whatsapp.biz/coreapp:v2.31.4"],
+            ]
+        )
+
+        with daemon.patch():
+            wa_containers = docker_utils.get_wa_containers()
+            # filtered, then unfiltered
+            assert docker_utils.get_all_images.call_count == 2
+
+        assert [c.role for c in wa_containers] == [
+            MYSQL_CONTAINER_TAG,
+            WA_COREAPP_CONTAINER_TAG,
+        ]
+
+    def test_should_keep_labeled_containers_of_removed_images(self):
+        daemon = MockDaemon([["mysql:5.7"]])
+        container = MockRemovedImageContainer()
+        container.attrs["Image"] = "sha256:removed"
+        container.attrs["Config"]["Labels"] = {ROLE_LABEL: "web"}
+        daemon.containers.append(container)
+
+        with daemon.patch():
+            wa_containers = docker_utils.get_wa_containers()
+
+        assert [c.role for c in wa_containers] == [
+            MYSQL_CONTAINER_TAG,
+            WA_WEB_CONTAINER_TAG,
+        ]
+        assert wa_containers[1].version is None
+
+    def test_should_hide_passwords_of_inspect_data_from_inventory(self):
+        container = MockDockerContainer()
+        container.attrs["Config"]["Env"] = ["MYSQL_ROOT_PASSWORD=secret"]
+
+        with patch.object(
+            docker_utils, "get_all_containers", return_value=[container]
+        ), patch.object(docker_utils, "get_all_images", return_value=[]):
+            run_context = sessions.new_run_context()
+            res = run_context.run(docker_utils.get_inspect_result, container)
+            password = run_context.run(
+                docker_utils.get_mysql_password, WAContainer(container)
+            )
+
+        assert res["Config"]["Env"] == ["MYSQL_ROOT_PASSWORD*******"]
+        assert password == "secret"
+
+
+class TestGetExpirationMap(unittest.TestCase):
+    def test_should_take_the_release_among_tags_of_an_image(self):
+        image = {
+            "Id": "sha256:web",
+            "RepoTags": [
+                "docker.whatsapp.biz/web:latest",
+                "docker.whatsapp.biz/web:v2.31.4",
+            ],
+            "RepoDigests": ["docker.whatsapp.biz/web@sha256:web"],
+            "Labels": {"EXPIRES_ON": "2030-01-01"},
+            "Created": 0,
+        }
+
+        with patch.object(
+            docker_utils, "get_inventory", return_value=Mock(images=[image])
+        ):
+            expiration_map = docker_utils.get_expiration_map()
+
+        assert expiration_map == {"v2.31": "2030-01-01 00:00:00"}
+
+
+class TestContainerEnv(unittest.TestCase):
+    def test_should_parse_env_into_exact_keys(self):
+        env = docker_utils.parse_env(
+            [
+                "WA_DB_PASSWORD_FILE=/run/secrets/db",
+                "WA_DB_URL=mysql://h/db?a=b",
+                "EMPTY",
+            ]
+        )
+
+        assert env == {
+            "WA_DB_PASSWORD_FILE": "/run/secrets/db",
+            "WA_DB_URL": "mysql://h/db?a=b",
+            "EMPTY": "",
+        }
+        assert docker_utils.parse_env(None) == {}
+
+    def test_should_look_up_several_keys_of_one_env(self):
+        container = MockDockerContainer()
+        container.attrs["Config"]["Env"] = ["WA_DB_PORT=3306", "WA_DB_PASSWORD=x"]
+
+        with patch.object(
+            docker_utils, "get_all_containers", return_value=[container]
+        ), patch.object(docker_utils, "get_all_images", return_value=[]):
+            values = sessions.new_run_context().run(
+                docker_utils.get_container_env_values,
+                container,
+                ["WA_DB_PORT", "WA_DB_HOSTNAME"],
+            )
+
+        assert values == {"WA_DB_PORT": "3306", "WA_DB_HOSTNAME": ""}
+
+    def test_should_only_inspect_the_container_outside_of_a_run(self):
+        container = MockDockerContainer()
+        mock_client = Mock()
+        mock_client.api.inspect_container.return_value = {
+            "Config": {"Env": ["WA_DB_PORT=3306"]}
+        }
+
+        with patch.object(
+            docker_utils, "get_docker_client", return_value=mock_client
+        ), patch.object(
+            docker_utils, "get_all_containers"
+        ) as mock_get_all_containers, patch.object(
+            docker_utils, "get_all_images"
+        ) as mock_get_all_images:
+            env = docker_utils.get_container_env(container)
+
+        assert env == {"WA_DB_PORT": "3306"}
+        mock_client.api.inspect_container.assert_called_once_with(container.short_id)
+        mock_get_all_containers.assert_not_called()
+        mock_get_all_images.assert_not_called()
+
+
+class TestGetDockerClient(unittest.TestCase):
+    def setUp(self):
+        docker_utils.forget_docker_client()
+        self.addCleanup(docker_utils.forget_docker_client)
+
+    @patch("docker.from_env")
+    def test_should_create_one_client_per_process(self, mock_from_env):
+        mock_from_env.return_value.api.hooks = {"response": []}
+
+        client = docker_utils.get_docker_client()
+
+        assert docker_utils.get_docker_client() is client
+        mock_from_env.assert_called_once()
+
+    @unittest.skipUnless(hasattr(os, "fork"), "os.fork is not available")
+    def test_should_not_inherit_a_held_client_lock_when_forking(self):
+        with docker_utils._docker_client_lock:
+            pid = os.fork()
+            if pid == 0:
+                acquired = docker_utils._docker_client_lock.acquire(timeout=5)
+                os._exit(0 if acquired else 1)
+        _, status = os.waitpid(pid, 0)
+
+        assert os.WEXITSTATUS(status) == 0
+
+    @patch("docker.from_env")
+    def test_should_configure_client_from_config(self, mock_from_env):
+        mock_from_env.return_value.api.hooks = {"response": []}
+        mock_from_env.return_value.api.headers = {}
+        mock_config = Mock(
+            docker_pool_size=32, docker_timeout=5.0, docker_keep_alive=False
+        )
+
+        with patch.object(docker_utils, "Config", return_value=mock_config):
+            client = docker_utils.get_docker_client()
+
+        mock_from_env.assert_called_with(max_pool_size=32, timeout=5.0)
+        assert client.api.headers["Connection"] == "close"
@@ -0,0 +1,62 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import tempfile
+import unittest
+
+from wadebug import results
+from wadebug.wa_actions import last_run
+from wadebug.wa_actions.implementations.dummy_action import (
+    DummyOKAction,
+    DummyProblemAction,
+    DummyWADebugErrorAction,
+)
+
+
+def get_mock_last_results():
+    return [
+        results.OK(DummyOKAction).to_dict(),
+        results.Problem(DummyProblemAction, "", "", "").to_dict(),
+        results.WADebugError(DummyWADebugErrorAction, "", "", "").to_dict(),
+        {"user_facing_name": "removed_action", "result": "problem"},
+    ]
+
+
+class TestLastRun(unittest.TestCase):
+    def test_should_load_saved_results_in_order(self):
+        result = {
+            "dummy_problem_action": results.Problem(
+                DummyProblemAction, "", "", ""
+            ).to_dict(),
+            "dummy_ok_action": results.OK(DummyOKAction).to_dict(),
+        }
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            last_run.save(cache_dir, result)
+
+            assert last_run.load(cache_dir) == list(result.values())
+
+    def test_should_load_none_without_last_run(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            assert last_run.load(cache_dir) is None
+
+    def test_should_rerun_all_actions_that_still_exist(self):
+        actions, reused_results = last_run.get_actions_to_rerun(
+            get_mock_last_results()
+        )
+
+        assert actions == [DummyOKAction, DummyProblemAction, DummyWADebugErrorAction]
+        assert reused_results == {}
+
+    def test_should_only_rerun_failed_actions(self):
+        actions, reused_results = last_run.get_actions_to_rerun(
+            get_mock_last_results(), failed_only=True
+        )
+
+        assert actions == [DummyOKAction, DummyProblemAction, DummyWADebugErrorAction]
+        assert list(reused_results) == ["dummy_ok_action"]
+        assert isinstance(reused_results["dummy_ok_action"], results.OK)
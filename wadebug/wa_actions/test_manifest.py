@@ -0,0 +1,105 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import json
+import subprocess
+import sys
+import unittest
+from unittest.mock import patch
+
+from wadebug.wa_actions import base, manifest
+from wadebug.wa_actions.base import WAAction
+
+
+IMPORTED_IMPLEMENTATIONS = """
+import json, sys
+from wadebug import wa_actions
+{}
+print(json.dumps(sorted(
+    m for m in sys.modules if m.startswith("wadebug.wa_actions.implementations.")
+)))
+"""
+
+
+def get_imported_implementations(statement):
+    """Modules of actions imported by statement, in a fresh interpreter."""
+    output = subprocess.check_output(
+        [sys.executable, "-c", IMPORTED_IMPLEMENTATIONS.format(statement)]
+    )
+    return json.loads(output)
+
+
+class MockEntryPoint:
+    def __init__(self, name, load):
+        self.name = name
+        self.value = "wadebug_mock_plugin:MockPluginAction"
+        self.load = load
+
+
+def load_mock_plugin():
+    class MockPluginAction(WAAction):
+        user_facing_name = "mock_plugin_action"
+        short_description = "Action of another package"
+
+    return MockPluginAction
+
+
+class TestManifest(unittest.TestCase):
+    def test_manifest_should_be_up_to_date(self):
+        with open(manifest.MANIFEST_PATH) as f:
+            assert f.read() == manifest.render_manifest(manifest.build_manifest()), (
+                "Actions changed, run python -m wadebug.wa_actions.manifest"
+            )
+
+    def test_should_list_every_module_of_actions(self):
+        assert set(manifest.ACTION_MODULES) == manifest.get_implementation_modules()
+
+    def test_should_keep_the_order_of_actions(self):
+        assert [act.user_facing_name for act in base.get_all_actions()][:4] == [
+            "containers_status",
+            "check_db_settings_exist",
+            "check_mysql_connection",
+            "check_mysql_password",
+        ]
+
+    def test_should_only_import_the_module_of_the_action_requested(self):
+        imported = get_imported_implementations(
+            'wa_actions.get_action_by_name("check_mysql_version")'
+        )
+
+        assert imported == ["wadebug.wa_actions.implementations.check_mysql_version"]
+
+    def test_should_describe_actions_without_importing_them(self):
+        imported = get_imported_implementations("wa_actions.get_action_descriptions()")
+
+        assert imported == []
+
+
+class TestPlugins(unittest.TestCase):
+    def test_should_load_actions_of_plugins_on_request(self):
+        entry_point = MockEntryPoint("mock_plugin_action", load_mock_plugin)
+        with patch.object(
+            base,
+            "get_plugin_entry_points",
+            return_value={entry_point.name: entry_point},
+        ), patch.object(entry_point, "load", wraps=load_mock_plugin) as load:
+            assert "mock_plugin_action" in base.get_listed_action_names()
+            assert ("mock_plugin_action", "Action of " + entry_point.value) in (
+                base.get_action_descriptions()
+            )
+            base.get_action_by_name("check_mysql_version")
+            load.assert_not_called()
+
+            act = base.get_action_by_name("mock_plugin_action")
+
+        assert act.short_description == "Action of another package"
+        load.assert_called_once()
+
+    def test_should_raise_key_error_for_unknown_actions(self):
+        with patch.object(base, "get_plugin_entry_points", return_value={}):
+            with self.assertRaises(KeyError):
+                base.get_action_by_name("no_such_action")
@@ -0,0 +1,142 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from unittest.mock import Mock, patch
+
+from wadebug import results
+from wadebug.wa_actions import metrics
+
+
+class MockAction:
+    def __init__(self, user_facing_name):
+        self.__name__ = user_facing_name
+        self.user_facing_name = user_facing_name
+        self.short_description = ""
+        self.prerequisites = ()
+        self.timeout = None
+        self.run = Mock(side_effect=self._run)
+
+    def _run(self, config):
+        res = results.OK(self)
+        res.stats = {"duration_ms": 1500.0, "cpu_time_ms": 1.0, "calls": {}}
+        return res
+
+
+def get_samples(snapshot):
+    return [
+        line
+        for line in snapshot.decode("utf-8").splitlines()
+        if not line.startswith("#")
+    ]
+
+
+class TestRenderMetrics(unittest.TestCase):
+    def test_should_expose_status_and_duration_of_each_action(self):
+        action = MockAction("check_action")
+        problem = results.Problem(action, "message", "details", "remediation")
+        problem.stats = {"duration_ms": 120.0, "cpu_time_ms": 1.0, "calls": {}}
+
+        samples = get_samples(metrics.render_metrics([problem], runs=3))
+
+        assert "wadebug_runs_total 3" in samples
+        assert 'wadebug_action_status{action="check_action",status="ok"} 0' in samples
+        assert (
+            'wadebug_action_status{action="check_action",status="problem"} 1'
+            in samples
+        )
+        assert 'wadebug_action_duration_seconds{action="check_action"} 0.12' in samples
+
+    def test_should_expose_observations_as_gauges(self):
+        action = MockAction("check_network")
+        res = results.OK(action)
+        res.stats = {
+            "duration_ms": 1.0,
+            "cpu_time_ms": 1.0,
+            "calls": {},
+            "observations": [
+                {"name": "host_reachable", "value": 0, "labels": {"host": 'a"b'}}
+            ],
+        }
+
+        snapshot = metrics.render_metrics([res], runs=1, finished_at=1600000000.5)
+
+        assert "# TYPE wadebug_host_reachable gauge" in snapshot.decode("utf-8")
+        samples = get_samples(snapshot)
+        assert 'wadebug_host_reachable{action="check_network",host="a\\"b"} 0' in (
+            samples
+        )
+        assert "wadebug_last_run_timestamp_seconds 1600000000.5" in samples
+
+
+class TestMetricsServer(unittest.TestCase):
+    def setUp(self):
+        self.server = metrics.MetricsServer(("127.0.0.1", 0))
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.url = "http://127.0.0.1:{}".format(self.server.server_address[1])
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def scrape(self, path=metrics.METRICS_PATH):
+        with urllib.request.urlopen(self.url + path, timeout=5) as response:
+            return response.read()
+
+    def test_should_serve_the_last_published_snapshot(self):
+        assert b"wadebug_runs_total 0" in self.scrape()
+
+        action = MockAction("check_action")
+        metrics.collect_metrics(
+            [action], {}, 60, self.server.publish, cycles=2, sleep=Mock()
+        )
+
+        assert action.run.call_count == 2
+        assert b"wadebug_runs_total 2" in self.scrape()
+        assert b'duration_seconds{action="check_action"} 1.5' in self.scrape()
+
+    def test_scrapes_should_not_run_actions(self):
+        action = MockAction("check_action")
+        metrics.collect_metrics(
+            [action], {}, 60, self.server.publish, cycles=1, sleep=Mock()
+        )
+
+        for _ in range(3):
+            self.scrape()
+
+        assert action.run.call_count == 1
+
+    def test_should_keep_collecting_after_a_failed_run(self):
+        action = MockAction("check_action")
+        published = []
+
+        with patch("wadebug.wa_actions.watch.run_actions") as mock_run_actions:
+            mock_run_actions.side_effect = [
+                RuntimeError("docker is gone"),
+                [action._run({})],
+            ]
+            with self.assertLogs(metrics.logger, "ERROR"):
+                metrics.collect_metrics(
+                    [action], {}, 60, published.append, cycles=2, sleep=Mock()
+                )
+
+        failed, recovered = [get_samples(snapshot) for snapshot in published]
+        assert "wadebug_collector_up 0" in failed
+        assert "wadebug_runs_total 0" in failed
+        assert "wadebug_collector_up 1" in recovered
+        assert "wadebug_runs_total 1" in recovered
+
+    def test_should_not_serve_other_paths(self):
+        with self.assertRaises(urllib.error.HTTPError) as context:
+            self.scrape("/")
+
+        assert context.exception.code == 404
@@ -0,0 +1,101 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+from wadebug import results
+from wadebug.wa_actions import docker_utils
+from wadebug.wa_actions.result_cache import ResultCache
+
+
+class MockAction:
+    def __init__(self, cacheable=True):
+        self.__name__ = "MockAction"
+        self.user_facing_name = "mock_action"
+        self.short_description = ""
+        self.config_dependencies = ("db.host",)
+        self.cacheable = cacheable
+
+
+MOCK_CONFIG = {"db": {"host": "localhost"}}
+
+
+def mock_docker_client(state="running"):
+    client = Mock()
+    client.api.containers.return_value = [
+        {"Id": "container_id", "ImageID": "image_id", "State": state}
+    ]
+    client.api.images.return_value = ["image_id", "other_image_id"]
+    return client
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(self.cache_dir.name)
+        self.act = MockAction()
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def test_should_return_cached_results(self):
+        self.cache.put(
+            self.act, MOCK_CONFIG, "fingerprint", results.Problem(self.act, "", "", "")
+        )
+
+        res = self.cache.get(self.act, MOCK_CONFIG, "fingerprint")
+
+        assert isinstance(res, results.Problem)
+        assert res.cached
+
+    def test_should_miss_when_inputs_change(self):
+        self.cache.put(self.act, MOCK_CONFIG, "fingerprint", results.OK(self.act))
+
+        other_config = {"db": {"host": "other_host"}}
+        assert self.cache.get(self.act, MOCK_CONFIG, "other_fingerprint") is None
+        assert self.cache.get(self.act, other_config, "fingerprint") is None
+
+    def test_should_miss_when_results_are_too_old(self):
+        cache = ResultCache(self.cache_dir.name, max_age=-1)
+        cache.put(self.act, MOCK_CONFIG, "fingerprint", results.OK(self.act))
+
+        assert cache.get(self.act, MOCK_CONFIG, "fingerprint") is None
+
+    def test_should_not_cache_actions_that_opt_out(self):
+        act = MockAction(cacheable=False)
+        self.cache.put(act, MOCK_CONFIG, "fingerprint", results.OK(act))
+
+        assert self.cache.get(act, MOCK_CONFIG, "fingerprint") is None
+
+    def test_should_not_cache_errors(self):
+        for result_class in [results.TimedOut, results.WADebugError]:
+            res = result_class(self.act, "", "", "")
+            self.cache.put(self.act, MOCK_CONFIG, "fingerprint", res)
+
+            assert self.cache.get(self.act, MOCK_CONFIG, "fingerprint") is None
+
+    def test_fingerprint_should_change_with_containers(self):
+        with patch.object(
+            docker_utils, "get_docker_client", return_value=mock_docker_client()
+        ):
+            running = self.cache.get_environment_fingerprint()
+        with patch.object(
+            docker_utils,
+            "get_docker_client",
+            return_value=mock_docker_client(state="exited"),
+        ):
+            exited = self.cache.get_environment_fingerprint()
+
+        assert running and exited and running != exited
+
+    def test_fingerprint_should_be_none_without_docker(self):
+        with patch.object(
+            docker_utils, "get_docker_client", side_effect=Exception("no docker")
+        ):
+            assert self.cache.get_environment_fingerprint() is None
@@ -0,0 +1,83 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import asyncio
+import unittest
+
+from wadebug import results
+from wadebug.wa_actions import run_stats
+from wadebug.wa_actions.async_docker_utils import run_blocking
+from wadebug.wa_actions.base import WAAction
+
+
+class MockCallingAction(WAAction):
+    user_facing_name = "mock_calling_action"
+
+    @classmethod
+    def _run(cls, config, *args, **kwargs):
+        run_stats.count_call(run_stats.DOCKER_API, 2)
+        run_stats.count_call(run_stats.SQL)
+        return results.OK(cls)
+
+
+class MockAsyncCallingAction(WAAction):
+    user_facing_name = "mock_async_calling_action"
+
+    @classmethod
+    async def _arun(cls, config, *args, **kwargs):
+        run_stats.count_call(run_stats.DOCKER_EXEC)
+        # calls made on a thread on behalf of the coroutine are counted too
+        await run_blocking(run_stats.count_call, run_stats.HTTP)
+        return results.OK(cls)
+
+
+class TestRunStats(unittest.TestCase):
+    def test_should_count_calls_made_while_recording(self):
+        with run_stats.recording() as stats:
+            run_stats.count_call(run_stats.HTTP)
+            run_stats.count_call(run_stats.HTTP)
+
+        assert stats.calls == {run_stats.HTTP: 2}
+        assert stats.duration_ms >= 0
+        assert stats.cpu_time_ms >= 0
+
+    def test_should_ignore_calls_made_outside_recording(self):
+        run_stats.count_call(run_stats.HTTP)
+
+        with run_stats.recording() as stats:
+            pass
+        run_stats.count_call(run_stats.HTTP)
+
+        assert stats.calls == {}
+
+    def test_should_not_measure_cpu_when_asked(self):
+        with run_stats.recording(measure_cpu=False) as stats:
+            pass
+
+        assert stats.cpu_time_ms is None
+
+    def test_should_roundtrip_through_dict(self):
+        stats = run_stats.RunStats(12.5, 3.0, {run_stats.SQL: 1})
+
+        res = run_stats.RunStats.from_dict(stats.to_dict())
+
+        assert res.to_dict() == stats.to_dict()
+
+    def test_should_add_stats_to_results_of_actions(self):
+        res = MockCallingAction.run(config={})
+
+        res_dict = res.to_dict()
+        assert res_dict["calls"] == {run_stats.DOCKER_API: 2, run_stats.SQL: 1}
+        assert res_dict["duration_ms"] >= 0
+        assert res_dict["cpu_time_ms"] >= 0
+
+    def test_should_add_stats_to_results_of_async_actions(self):
+        res = asyncio.run(MockAsyncCallingAction.arun(config={}))
+
+        res_dict = res.to_dict()
+        assert res_dict["calls"] == {run_stats.DOCKER_EXEC: 1, run_stats.HTTP: 1}
+        assert res_dict["cpu_time_ms"] is None
@@ -0,0 +1,86 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import unittest
+from unittest.mock import Mock, patch
+
+from wadebug.wa_actions import sessions
+from wadebug.wa_actions.wabiz_api import WABizAPI
+
+
+MOCK_WEBAPP_CONFIG = {
+    "baseUrl": "https://localhost:9090",
+    "user": "wadebug",
+    "password": "secretdebugger",
+}
+
+
+class MockJSONResponse:
+    def __init__(self, json_data, status_code):
+        self.json_data = json_data
+        self.status_code = status_code
+
+    def json(self):
+        return self.json_data
+
+
+class TestSessions(unittest.TestCase):
+    def test_should_create_new_objects_when_not_reusing(self):
+        assert sessions.get_or_create("key", object) is not sessions.get_or_create(
+            "key", object
+        )
+
+    def test_should_share_objects_while_reusing(self):
+        with sessions.reusing():
+            first = sessions.get_or_create("key", object)
+
+            assert sessions.get_or_create("key", object) is first
+            assert sessions.get_or_create("other_key", object) is not first
+
+    def test_should_create_objects_again_once_too_old(self):
+        with sessions.reusing():
+            first = sessions.get_or_create("key", object, max_age=0)
+
+            assert sessions.get_or_create("key", object, max_age=0) is not first
+
+    def test_should_share_objects_within_a_run_only(self):
+        first_run = sessions.new_run_context()
+        first = first_run.run(sessions.get_or_create_for_run, "key", object)
+
+        assert first_run.run(sessions.get_or_create_for_run, "key", object) is first
+        assert (
+            sessions.new_run_context().run(sessions.get_or_create_for_run, "key", object)
+            is not first
+        )
+        assert sessions.get_or_create_for_run("key", object) is not first
+
+    def test_should_create_forgotten_objects_again(self):
+        with sessions.reusing():
+            first = sessions.get_or_create("key", object)
+            sessions.forget("key")
+
+            assert sessions.get_or_create("key", object) is not first
+
+    def test_should_close_objects_when_done_reusing(self):
+        closable = Mock()
+
+        with sessions.reusing():
+            sessions.get_or_create("key", lambda: closable)
+
+        closable.close.assert_called_once_with()
+        assert not sessions.is_reusing()
+
+    @patch(
+        "requests.Session.post",
+        return_value=MockJSONResponse({"users": [{"token": "token"}]}, 200),
+    )
+    def test_should_log_in_to_webapp_once_while_reusing(self, mock_post):
+        with sessions.reusing():
+            WABizAPI(**MOCK_WEBAPP_CONFIG)
+            WABizAPI(**MOCK_WEBAPP_CONFIG)
+
+        mock_post.assert_called_once()
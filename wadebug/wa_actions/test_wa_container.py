@@ -0,0 +1,102 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import unittest
+
+from wadebug.wa_actions.models.wa_container import (
+    MYSQL_CONTAINER_TAG,
+    ROLE_LABEL,
+    WA_COREAPP_CONTAINER_TAG,
+    WA_WEB_CONTAINER_TAG,
+    WAContainer,
+    get_role_and_version,
+)
+from wadebug.wa_actions.tests.stubs.mock_wa_container import MockDockerContainer
+
+
+class TestGetRoleAndVersion(unittest.TestCase):
+    def test_should_get_role_and_version_from_repo_tags(self):
+        assert get_role_and_version(["docker.whatsapp.biz/coreapp:v2.31.4"]) == (
+            WA_COREAPP_CONTAINER_TAG,
+            "v2.31.4",
+        )
+        assert get_role_and_version(["docker.whatsapp.biz/web:v2.31.4"]) == (
+            WA_WEB_CONTAINER_TAG,
+            "v2.31.4",
+        )
+        assert get_role_and_version(["mysql:5.7"]) == (MYSQL_CONTAINER_TAG, None)
+        assert get_role_and_version(["nginx:latest"]) == (None, None)
+
+    def test_should_only_take_releases_for_a_version(self):
+        assert get_role_and_version(["docker.whatsapp.biz/web:latest"]) == (
+            WA_WEB_CONTAINER_TAG,
+            None,
+        )
+
+    def test_should_take_the_release_among_several_tags_of_an_image(self):
+        repo_tags = [
+            "docker.whatsapp.biz/web:latest",
+            "docker.whatsapp.biz/web:v2.31.4",
+        ]
+
+        assert get_role_and_version(repo_tags) == (WA_WEB_CONTAINER_TAG, "v2.31.4")
+
+    def test_should_not_take_a_registry_port_for_a_version(self):
+        assert get_role_and_version(["registry:5000/whatsapp.biz/web"]) == (
+            WA_WEB_CONTAINER_TAG,
+            None,
+        )
+
+
+class TestWAContainer(unittest.TestCase):
+    def test_should_compute_fields_once(self):
+        docker_container = MockDockerContainer(
+            "wacore", ["docker.whatsapp.biz/coreapp:v2.31.4"]
+        )
+        docker_container.attrs["HostConfig"] = {"PortBindings": {"6250/tcp": []}}
+
+        wa_container = WAContainer(docker_container)
+        docker_container.status = "exited"
+
+        assert wa_container.is_coreapp()
+        assert not wa_container.is_webapp()
+        assert wa_container.get_container_type() == WA_COREAPP_CONTAINER_TAG
+        assert wa_container.version == "v2.31.4"
+        # as it was when listed
+        assert wa_container.is_running()
+        assert dict(wa_container.port_bindings) == {"6250/tcp": []}
+
+    def test_should_take_role_of_label_and_release_of_image(self):
+        docker_container = MockDockerContainer()
+        docker_container.attrs["Config"]["Labels"] = {ROLE_LABEL: "coreapp"}
+
+        wa_container = WAContainer(
+            docker_container,
+            repo_tags=["registry/wa:latest", "registry/wa:v2.31.4"],
+        )
+
+        assert wa_container.is_coreapp()
+        assert wa_container.version == "v2.31.4"
+
+    def test_should_be_immutable(self):
+        wa_container = WAContainer(MockDockerContainer(), repo_tags=["mysql:8"])
+
+        with self.assertRaises(AttributeError):
+            wa_container.status = "exited"
+        with self.assertRaises(TypeError):
+            wa_container.port_bindings["443/tcp"] = []
+        assert not hasattr(wa_container, "__dict__")
+
+    def test_should_compare_and_hash_by_fields(self):
+        docker_container = MockDockerContainer()
+
+        first = WAContainer(docker_container, repo_tags=["mysql:8"])
+        second = WAContainer(docker_container, repo_tags=["mysql:8"])
+
+        assert first == second
+        assert len({first, second}) == 1
+        assert first != WAContainer(MockDockerContainer(), repo_tags=["mysql:8"])
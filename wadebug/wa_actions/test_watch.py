@@ -0,0 +1,86 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import unittest
+from unittest.mock import Mock, patch
+
+from wadebug import results
+from wadebug.wa_actions import sessions
+from wadebug.wa_actions.watch import watch_actions
+
+
+class MockAction:
+    """Stand-in for a WAAction whose result is decided by `outcomes`, in order."""
+
+    def __init__(self, user_facing_name, outcomes):
+        self.__name__ = user_facing_name
+        self.user_facing_name = user_facing_name
+        self.short_description = ""
+        self.prerequisites = ()
+        self.timeout = None
+        self.outcomes = list(outcomes)
+
+    def run(self, config):
+        if self.outcomes.pop(0):
+            res = results.OK(self)
+        else:
+            res = results.Problem(self, "message", "details", "remediation")
+        # timings differ on every run and are not compared
+        res.stats = {"duration_ms": len(self.outcomes), "cpu_time_ms": 0, "calls": {}}
+        return res
+
+
+class TestWatchActions(unittest.TestCase):
+    def test_should_yield_all_results_then_only_changed_ones(self):
+        stable = MockAction("stable", [True, True, True])
+        flapping = MockAction("flapping", [True, False, False])
+
+        cycles = list(
+            watch_actions([stable, flapping], {}, 60, cycles=3, sleep=Mock())
+        )
+
+        changed = [[r.action.user_facing_name for r in res] for _, res in cycles]
+        assert changed == [["stable", "flapping"], ["flapping"], []]
+        assert isinstance(cycles[1][1][0], results.Problem)
+
+    def test_should_wait_for_the_interval_between_cycles(self):
+        sleep = Mock()
+        action = MockAction("action", [True, True, True])
+
+        list(watch_actions([action], {}, 60, cycles=3, sleep=sleep))
+
+        assert sleep.call_count == 2
+        assert all(0 < call[0][0] <= 60 for call in sleep.call_args_list)
+
+    def test_should_keep_watching_after_a_failed_run(self):
+        action = MockAction("action", [True, False])
+        errors = []
+
+        with patch("wadebug.wa_actions.watch.run_actions") as mock_run_actions:
+            mock_run_actions.side_effect = [
+                [action.run({})],
+                RuntimeError("docker is gone"),
+                [action.run({})],
+            ]
+            cycles = list(
+                watch_actions(
+                    [action], {}, 60, cycles=3, sleep=Mock(), on_error=errors.append
+                )
+            )
+
+        assert [(cycle, len(res)) for cycle, res in cycles] == [(0, 1), (2, 1)]
+        assert isinstance(cycles[1][1][0], results.Problem)
+        assert [str(e) for e in errors] == ["docker is gone"]
+
+    def test_should_reuse_sessions_during_cycles(self):
+        reusing = []
+
+        for _ in watch_actions([MockAction("a", [True])], {}, 60, cycles=1):
+            reusing.append(sessions.is_reusing())
+
+        assert reusing == [True]
+        assert not sessions.is_reusing()
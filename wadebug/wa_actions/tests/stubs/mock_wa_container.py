@@ -4,6 +4,7 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
+import itertools
 from unittest.mock import Mock
 
 from wadebug.wa_actions.models.wa_container import (
@@ -18,11 +19,16 @@ class MockDockerImage:
         self.attrs = {"RepoTags": repo_tags}
 
 
+_container_ids = itertools.count()
+
+
 class MockDockerContainer:
     def __init__(self, name="MockContainer", repo_tags=None, status="running"):
+        self.id = "mock_container_{}".format(next(_container_ids))
         self.name = name
         self.image = MockDockerImage(repo_tags if repo_tags else [])
         self.status = status
+        self.attrs = {"Image": "", "Config": {"Env": []}}
 
     def __getattr__(self, attr):
         if attr in ["short_id"]:
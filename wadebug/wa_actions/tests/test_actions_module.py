@@ -5,10 +5,102 @@
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import asyncio
+import multiprocessing
+import os
+import pstats
 import re
+import tempfile
+import threading
+import time
 import unittest
 
-from wadebug import wa_actions
+from unittest.mock import patch
+
+from wadebug import results, wa_actions
+from wadebug.wa_actions.base import WAActionDependencyCycleError, plan_actions
+
+
+class MockAction:
+    """Minimal stand-in for a WAAction class, without registering it."""
+
+    def __init__(
+        self,
+        user_facing_name,
+        barrier=None,
+        prerequisites=(),
+        passes=True,
+        blocker=None,
+        timeout=None,
+        priority=0,
+        expected_cost=1,
+    ):
+        self.__name__ = user_facing_name
+        self.user_facing_name = user_facing_name
+        self.short_description = ""
+        self.barrier = barrier
+        self.prerequisites = prerequisites
+        self.passes = passes
+        self.blocker = blocker
+        self.timeout = timeout
+        self.priority = priority
+        self.expected_cost = expected_cost
+        self.cacheable = True
+        self.executed = False
+
+    def run(self, config):
+        self.executed = True
+        if self.barrier:
+            self.barrier.wait()
+        if self.blocker:
+            self.blocker.wait()
+        if self.passes:
+            return results.OK(self)
+        return results.Problem(self, "", "", "")
+
+
+class MockAsyncAction(MockAction):
+    """Stand-in for a WAAction implementing _arun, sleeping for `duration` seconds."""
+
+    def __init__(self, user_facing_name, duration=0, **kwargs):
+        MockAction.__init__(self, user_facing_name, **kwargs)
+        self.duration = duration
+        self.cancelled = False
+
+    async def _arun(self, config):
+        self.executed = True
+        try:
+            await asyncio.sleep(self.duration)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return results.OK(self)
+
+    def arun(self, config):
+        return self._arun(config)
+
+
+class MockResultCache:
+    """In-memory stand-in for result_cache.ResultCache."""
+
+    def __init__(self, fingerprint="fingerprint"):
+        self.fingerprint = fingerprint
+        self.results = {}
+
+    def prune(self):
+        pass
+
+    def get_environment_fingerprint(self):
+        return self.fingerprint
+
+    def get(self, act, config, fingerprint):
+        res = self.results.get((act.user_facing_name, fingerprint))
+        if res:
+            res.cached = True
+        return res
+
+    def put(self, act, config, fingerprint, res):
+        self.results[(act.user_facing_name, fingerprint)] = res
 
 
 class TestActions(unittest.TestCase):
@@ -23,3 +115,291 @@ class TestActions(unittest.TestCase):
                 )
             )
         pass
+
+
+class TestRunActions(unittest.TestCase):
+    def test_should_run_all_actions_sequentially_with_one_job(self):
+        actions = [MockAction("first"), MockAction("second")]
+
+        res = list(wa_actions.run_actions(actions, {}, jobs=1))
+
+        assert [r.action.user_facing_name for r in res] == ["first", "second"]
+
+    def test_should_run_actions_at_the_same_time(self):
+        # the barrier only releases when both actions are running at once
+        barrier = threading.Barrier(2, timeout=5)
+        actions = [MockAction("first", barrier), MockAction("second", barrier)]
+
+        res = list(wa_actions.run_actions(actions, {}, jobs=2))
+
+        assert sorted(r.action.user_facing_name for r in res) == ["first", "second"]
+        assert all(isinstance(r, results.OK) for r in res)
+
+    def test_should_skip_actions_when_prerequisite_does_not_pass(self):
+        connection = MockAction("connection", passes=False)
+        version = MockAction("version", prerequisites=("connection",))
+        permissions = MockAction("permissions", prerequisites=("version",))
+
+        res = {
+            r.action.user_facing_name: r
+            for r in wa_actions.run_actions(
+                [permissions, version, connection], {}, jobs=2
+            )
+        }
+
+        assert isinstance(res["connection"], results.Problem)
+        assert isinstance(res["version"], results.Skipped)
+        assert isinstance(res["permissions"], results.Skipped)
+        assert not version.executed and not permissions.executed
+
+    def test_should_run_prerequisites_first(self):
+        containers = MockAction("containers")
+        network = MockAction("network", prerequisites=("containers",))
+
+        res = list(wa_actions.run_actions([network, containers], {}, jobs=2))
+
+        assert [r.action.user_facing_name for r in res] == ["containers", "network"]
+        assert isinstance(res[1], results.OK)
+
+    def test_should_ignore_prerequisites_not_requested(self):
+        version = MockAction("version", prerequisites=("connection",))
+
+        res = list(wa_actions.run_actions([version], {}))
+
+        assert isinstance(res[0], results.OK)
+
+    def test_should_raise_on_circular_prerequisites(self):
+        first = MockAction("first", prerequisites=("second",))
+        second = MockAction("second", prerequisites=("first",))
+
+        with self.assertRaises(WAActionDependencyCycleError):
+            list(wa_actions.run_actions([first, second], {}))
+
+    def test_should_time_out_actions_past_their_deadline(self):
+        blocker = threading.Event()
+        stuck = MockAction("stuck", blocker=blocker)
+        other = MockAction("other")
+        try:
+            res = {
+                r.action.user_facing_name: r
+                for r in wa_actions.run_actions([stuck, other], {}, 1, timeout=0.1)
+            }
+        finally:
+            blocker.set()
+
+        assert isinstance(res["stuck"], results.TimedOut)
+        # the abandoned action frees its slot for the rest of the run
+        assert isinstance(res["other"], results.OK)
+
+    def test_action_timeout_should_override_default_timeout(self):
+        blocker = threading.Event()
+        slow = MockAction("slow", blocker=blocker, timeout=5)
+        threading.Timer(0.2, blocker.set).start()
+
+        res = list(wa_actions.run_actions([slow], {}, timeout=0.1))
+
+        assert isinstance(res[0], results.OK)
+
+    def test_should_skip_actions_not_in_budget(self):
+        cheap = MockAction("cheap", expected_cost=1)
+        expensive = MockAction("expensive", expected_cost=60)
+
+        res = {
+            r.action.user_facing_name: r
+            for r in wa_actions.run_actions([expensive, cheap], {}, budget=10)
+        }
+
+        assert isinstance(res["cheap"], results.OK)
+        assert isinstance(res["expensive"], results.Skipped)
+        assert not expensive.executed
+
+
+class TestPlanActions(unittest.TestCase):
+    def test_should_plan_high_priority_and_cheap_actions_first(self):
+        low = MockAction("low", priority=1, expected_cost=1)
+        slow = MockAction("slow", priority=5, expected_cost=3)
+        fast = MockAction("fast", priority=5, expected_cost=1)
+
+        planned, left_out = plan_actions([low, slow, fast], budget=10)
+
+        assert planned == [fast, slow, low]
+        assert left_out == []
+
+    def test_should_leave_out_actions_that_do_not_fit(self):
+        first = MockAction("first", priority=2, expected_cost=4)
+        second = MockAction("second", priority=1, expected_cost=4)
+
+        planned, left_out = plan_actions([first, second], budget=5)
+
+        assert planned == [first]
+        assert left_out == [second]
+
+    def test_should_fit_more_actions_with_more_jobs(self):
+        acts = [MockAction(str(i), expected_cost=4) for i in range(4)]
+
+        planned, left_out = plan_actions(acts, budget=5, jobs=4)
+
+        assert len(planned) == 4
+
+    def test_should_leave_out_actions_whose_prerequisites_were_left_out(self):
+        connection = MockAction("connection", priority=0, expected_cost=20)
+        version = MockAction(
+            "version", priority=10, expected_cost=1, prerequisites=("connection",)
+        )
+
+        planned, left_out = plan_actions([version, connection], budget=10)
+
+        assert planned == []
+        assert left_out == [connection, version]
+
+    def test_should_plan_prerequisites_before_dependent_actions(self):
+        connection = MockAction("connection", priority=0)
+        version = MockAction("version", priority=10, prerequisites=("connection",))
+
+        planned, _ = plan_actions([version, connection], budget=10)
+
+        assert planned == [connection, version]
+
+
+class TestAsyncActions(unittest.TestCase):
+    def test_should_run_async_actions_on_one_event_loop(self):
+        # async actions do not take --jobs slots, so all sleep at the same time
+        actions = [MockAsyncAction(str(i), duration=0.2) for i in range(20)]
+
+        start = time.monotonic()
+        res = list(wa_actions.run_actions(actions, {}, jobs=1))
+
+        assert time.monotonic() - start < 2
+        assert len(res) == 20
+        assert all(isinstance(r, results.OK) for r in res)
+
+    def test_should_cancel_async_actions_that_time_out(self):
+        stuck = MockAsyncAction("stuck", duration=10)
+
+        res = list(wa_actions.run_actions([stuck], {}, timeout=0.1))
+
+        assert isinstance(res[0], results.TimedOut)
+        for _ in range(50):
+            if stuck.cancelled:
+                break
+            time.sleep(0.01)
+        assert stuck.cancelled
+
+
+class TestIsolatedActions(unittest.TestCase):
+    def test_should_run_isolated_actions_in_processes(self):
+        passing = MockAction("passing")
+        failing = MockAction("failing", passes=False)
+
+        res = {
+            r.action.user_facing_name: r
+            for r in wa_actions.run_actions([passing, failing], {}, 2, isolate=True)
+        }
+
+        assert isinstance(res["passing"], results.OK)
+        assert isinstance(res["failing"], results.Problem)
+        # actions ran in child processes, not in this one
+        assert not passing.executed and not failing.executed
+
+    def test_should_kill_isolated_actions_that_time_out(self):
+        # the event is never set in the child process, so the action hangs
+        stuck = MockAction("stuck", blocker=threading.Event())
+
+        res = list(wa_actions.run_actions([stuck], {}, timeout=0.5, isolate=True))
+
+        assert isinstance(res[0], results.TimedOut)
+        for _ in range(50):
+            if not multiprocessing.active_children():
+                break
+            time.sleep(0.1)
+        assert not multiprocessing.active_children()
+
+    def test_should_report_results_of_isolated_actions_that_cannot_be_read(self):
+        act = MockAction("unreadable")
+
+        with patch.object(results, "from_dict", side_effect=ValueError("bad")):
+            res = list(wa_actions.run_actions([act], {}, isolate=True))
+
+        assert isinstance(res[0], results.WADebugError)
+        assert "bad" in str(res[0].details)
+
+
+class TestCachedActions(unittest.TestCase):
+    def test_should_reuse_cached_results(self):
+        cache = MockResultCache()
+        list(wa_actions.run_actions([MockAction("action")], {}, cache=cache))
+
+        action = MockAction("action")
+        res = list(wa_actions.run_actions([action], {}, cache=cache))
+
+        assert not action.executed
+        assert res[0].cached
+
+    def test_should_execute_actions_again_when_fingerprint_changes(self):
+        cache = MockResultCache()
+        list(wa_actions.run_actions([MockAction("action")], {}, cache=cache))
+
+        cache.fingerprint = "other_fingerprint"
+        action = MockAction("action")
+        list(wa_actions.run_actions([action], {}, cache=cache))
+
+        assert action.executed
+
+    def test_should_report_reused_results_instead_of_executing(self):
+        passed = MockAction("passed")
+        reused = results.OK(passed)
+        dependent = MockAction("dependent", prerequisites=("passed",))
+
+        res = list(
+            wa_actions.run_actions(
+                [passed, dependent], {}, reused_results={"passed": reused}
+            )
+        )
+
+        assert res[0] is reused
+        assert not passed.executed and dependent.executed
+
+    def test_should_not_use_cache_without_fingerprint(self):
+        cache = MockResultCache(fingerprint=None)
+
+        list(wa_actions.run_actions([MockAction("action")], {}, cache=cache))
+
+        assert cache.results == {}
+
+
+class TestProfileActions(unittest.TestCase):
+    def test_should_write_a_profile_per_action_and_a_summary(self):
+        actions = [MockAction("first"), MockAsyncAction("second")]
+
+        with tempfile.TemporaryDirectory() as profile_dir:
+            res = list(wa_actions.run_actions(actions, {}, profile_dir=profile_dir))
+
+            assert all(isinstance(r, results.OK) for r in res)
+            assert sorted(os.listdir(profile_dir)) == [
+                "first.pstats",
+                "merged.pstats",
+                "second.pstats",
+                "summary.txt",
+            ]
+            merged = pstats.Stats(os.path.join(profile_dir, "merged.pstats"))
+            profiled_functions = {name for _, _, name in merged.stats}
+            assert "run" in profiled_functions and "_arun" in profiled_functions
+
+    def test_should_run_profiled_actions_one_at_a_time(self):
+        running = []
+        max_running = []
+
+        class MockCountingAction(MockAction):
+            def run(self, config):
+                running.append(self)
+                max_running.append(len(running))
+                time.sleep(0.05)
+                running.remove(self)
+                return results.OK(self)
+
+        actions = [MockCountingAction("first"), MockCountingAction("second")]
+
+        with tempfile.TemporaryDirectory() as profile_dir:
+            list(wa_actions.run_actions(actions, {}, 2, profile_dir=profile_dir))
+
+        assert max(max_running) == 1
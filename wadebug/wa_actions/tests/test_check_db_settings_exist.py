@@ -0,0 +1,65 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import unittest
+
+from unittest.mock import patch
+
+from wadebug import results
+from wadebug.wa_actions import sessions
+from wadebug.wa_actions.implementations import check_db_settings_exist
+from wadebug.wa_actions.implementations.check_db_settings_exist import docker_utils
+from wadebug.wa_actions.tests.stubs.mock_wa_container import MockDockerContainer
+
+ALL_DB_SETTINGS = [
+    "WA_DB_ENGINE=MYSQL",
+    "WA_DB_HOSTNAME=mysql",
+    "WA_DB_PORT=3306",
+    "WA_DB_USERNAME=root",
+    "WA_DB_PASSWORD=secret",
+]
+
+
+def mock_container(env):
+    container = MockDockerContainer("wacore")
+    container.attrs["Config"]["Env"] = env
+    return container
+
+
+class TestCheckDbSettingsExist(unittest.TestCase):
+    def run_action(self, containers):
+        with patch.object(
+            docker_utils,
+            "get_all_running_wa_containers_except_db",
+            return_value=containers,
+        ), patch.object(
+            docker_utils, "get_all_containers", return_value=containers
+        ), patch.object(
+            docker_utils, "get_all_images", return_value=[]
+        ):
+            return sessions.new_run_context().run(
+                check_db_settings_exist.CheckDbSettingsExist().run, config=None
+            )
+
+    def test_should_return_ok_if_all_settings_are_passed(self):
+        res = self.run_action([mock_container(ALL_DB_SETTINGS)])
+
+        assert isinstance(res, results.OK)
+
+    def test_should_return_problem_listing_missing_settings(self):
+        res = self.run_action([mock_container(ALL_DB_SETTINGS[:3])])
+
+        assert isinstance(res, results.Problem)
+        assert "WA_DB_USERNAME, WA_DB_PASSWORD" in res.details
+
+    def test_should_not_take_keys_with_a_common_prefix_for_a_setting(self):
+        env = ALL_DB_SETTINGS[:4] + ["WA_DB_PASSWORD_FILE=/run/secrets/db"]
+
+        res = self.run_action([mock_container(env)])
+
+        assert isinstance(res, results.Problem)
+        assert "WA_DB_PASSWORD" in res.details
@@ -0,0 +1,21 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import unittest
+
+from wadebug.wa_actions.implementations import check_mysql_version
+
+
+class TestCheckMySQLVersion(unittest.TestCase):
+    def test_should_accept_versions_from_5_7_until_8(self):
+        assert check_mysql_version.is_version_valid("5.7")
+        assert check_mysql_version.is_version_valid("5.7.30-log")
+        assert not check_mysql_version.is_version_valid("5.6.47")
+        assert not check_mysql_version.is_version_valid("8.0.21")
+
+    def test_should_reject_versions_without_numbers(self):
+        assert not check_mysql_version.is_version_valid("unknown")
@@ -5,6 +5,7 @@
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import asyncio
 import unittest
 
 from unittest.mock import ANY, patch
@@ -128,3 +129,27 @@ class TestCheckNetwork(unittest.TestCase):
 
         # check secondary port when not reachable on primary port
         assert mock_check.call_count == 2
+
+    @patch.object(
+        docker_utils, "get_running_wacore_containers", return_value=[MockContainer()]
+    )
+    @patch.object(
+        network_utils,
+        "hostname_reachable_from_container_async",
+        side_effect=lambda container, hostname, port, timeout: hostname != "host2",
+    )
+    def test_async_run_should_return_problem_with_hosts_not_reachable(self, *_):
+        mock_hosts = [
+            ("host1", WA_SERVER_TYPE.WA_SERVER, 443, 5222),
+            ("host2", WA_SERVER_TYPE.WA_REPOSITORY, 443, 5222),
+        ]
+        with patch.object(check_network, "WHATSAPP_SERVERS", mock_hosts):
+            res = asyncio.run(check_network.CheckNetworkAction.arun(config=None))
+
+        assert isinstance(res, results.Problem)
+        assert "host2" in res.details
+        assert "host1" not in res.details
+        assert res.stats["observations"] == [
+            {"name": "host_reachable", "value": 1, "labels": {"host": "host1"}},
+            {"name": "host_reachable", "value": 0, "labels": {"host": "host2"}},
+        ]
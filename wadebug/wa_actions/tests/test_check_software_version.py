@@ -0,0 +1,52 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import unittest
+
+from unittest.mock import patch
+
+from wadebug import results
+from wadebug.wa_actions.implementations import check_software_version
+from wadebug.wa_actions.implementations.check_software_version import docker_utils
+from wadebug.wa_actions.models.wa_container import WAContainer
+from wadebug.wa_actions.tests.stubs.mock_wa_container import MockDockerContainer
+
+
+def mock_wa_containers(tag):
+    return [
+        WAContainer(
+            MockDockerContainer(
+                "wacore", ["docker.whatsapp.biz/coreapp:{}".format(tag)]
+            )
+        ),
+        WAContainer(
+            MockDockerContainer("waweb", ["docker.whatsapp.biz/web:{}".format(tag)])
+        ),
+    ]
+
+
+class TestCheckSoftwareVersion(unittest.TestCase):
+    def run_action(self, wa_containers):
+        with patch.object(
+            docker_utils, "get_wa_containers", return_value=wa_containers
+        ), patch.object(
+            docker_utils,
+            "get_expiration_map",
+            return_value={"v2.31": "2999-01-01 00:00:00"},
+        ):
+            return check_software_version.CheckSoftwareVersion().run(config=None)
+
+    def test_should_return_ok_if_versions_are_not_expired(self):
+        res = self.run_action(mock_wa_containers("v2.31.4"))
+
+        assert isinstance(res, results.OK)
+
+    def test_should_warn_about_containers_without_a_release(self):
+        res = self.run_action(mock_wa_containers("latest"))
+
+        assert isinstance(res, results.Warning)
+        assert "wacore" in res.details and "waweb" in res.details
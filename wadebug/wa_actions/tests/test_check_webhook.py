@@ -136,3 +136,24 @@ class TestCheckWebhook(unittest.TestCase):
     def test_should_return_problem_if_warning_if_webhook_response_slow(self, *_):
         check_webhook.CheckWebhookAction().run(config=MOCK_COMPLETE_CONFIG)
         results.Warning.assert_called()
+
+    @patch("wadebug.wa_actions.wabiz_api.WABizAPI.__init__", return_value=None)
+    @patch(
+        "wadebug.wa_actions.wabiz_api.WABizAPI.get_webhook_url",
+        return_value=DUMMY_HTTPS_WEBHOOK,
+    )
+    @patch("wadebug.wa_actions.wabiz_api.WABizAPI.get_webhook_cert", return_value=None)
+    @patch.object(
+        docker_utils, "get_running_wacore_containers", return_value=[MockContainer()]
+    )
+    @patch.object(
+        curl_utils,
+        "https_post_request_from_container",
+        return_value=(CURLTestResult.OK, 0.25),
+    )
+    def test_should_observe_webhook_response_time(self, *_):
+        res = check_webhook.CheckWebhookAction().run(config=MOCK_COMPLETE_CONFIG)
+
+        assert res.stats["observations"] == [
+            {"name": "webhook_response_seconds", "value": 0.25, "labels": {}}
+        ]
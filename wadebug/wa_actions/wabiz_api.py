@@ -8,9 +8,8 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 import base64
 import warnings
 
-import requests
-from requests.packages.urllib3.exceptions import InsecureRequestWarning
 from wadebug import exceptions
+from wadebug.wa_actions import run_stats, sessions
 
 
 try:
@@ -24,6 +23,9 @@ class WABizAPI:
     SUPPORT_INFO_ENDPOINT = "/v1/support"
     APP_SETTINGS_ENDPOINT = "/v1/settings/application"
     WEBHOOK_CERTS_ENDPOINT = "/v1/certificates/webhooks/ca"
+    TIMEOUT = 20
+    # seconds a login is reused for while sessions are reused (see sessions)
+    LOGIN_MAX_AGE = 3600
 
     def __init__(self, **kwargs):
         baseUrl = kwargs.get("baseUrl")
@@ -31,29 +33,48 @@ class WABizAPI:
         password = kwargs.get("password")
 
         if baseUrl and user and password:
+            # imported here, requests takes long to import and is only needed
+            # by actions talking to the API
+            import requests
+            from requests.packages.urllib3.exceptions import InsecureRequestWarning
+
             self.api_baseUrl = baseUrl
             self.api_user = user
             self.api_password = password
 
             # suppress unverified https request warnings
             warnings.simplefilter("ignore", InsecureRequestWarning)
-            self.api_header = self.__gen_req_header()
+            # a shared session keeps connections alive between requests
+            if sessions.is_reusing():
+                self.http = sessions.get_or_create(
+                    ("wabiz_http", baseUrl), requests.Session
+                )
+            else:
+                self.http = requests
+            self.login_key = ("wabiz_login", baseUrl, user, password)
+            self.api_header = sessions.get_or_create(
+                self.login_key, self.__gen_req_header, max_age=self.LOGIN_MAX_AGE
+            )
         else:
             raise ValueError(
                 "One or more required params (baseUrl, user, password) are missing."
             )
 
     def __gen_req_header(self):
+        import requests
+
         # encode(): string -> byte, to use in b64encode()
         # decode(): byte -> string, to use in header
         encoded = base64.b64encode(
             "{}:{}".format(self.api_user, self.api_password).encode()
         ).decode()
         try:
-            res = requests.post(
+            run_stats.count_call(run_stats.HTTP)
+            res = self.http.post(
                 url=urljoin(self.api_baseUrl, self.LOGIN_USER_ENDPOINT),
                 headers={"AUTHORIZATION": "Basic {}".format(encoded)},
                 verify=False,  # disable ssl verification
+                timeout=self.TIMEOUT,
             )
             if res.status_code == 401:
                 raise exceptions.WABizAuthError(
@@ -77,14 +98,20 @@ class WABizAPI:
         }
 
     def __get(self, endpoint):
+        import requests
+
         try:
-            res = requests.get(
+            run_stats.count_call(run_stats.HTTP)
+            res = self.http.get(
                 url=urljoin(self.api_baseUrl, endpoint),
                 headers=self.api_header,
                 verify=False,  # disable ssl verification
+                timeout=self.TIMEOUT,
             )
 
             if res.status_code == 401:
+                # the login may have expired, log in again next time
+                sessions.forget(self.login_key)
                 raise exceptions.WABizAuthError(
                     "API authentication error.  Please check your configuration."
                 )
@@ -102,13 +129,16 @@ class WABizAPI:
             )
 
     def __get_raw(self, endpoint):
-        res = requests.get(
+        run_stats.count_call(run_stats.HTTP)
+        res = self.http.get(
             url=urljoin(self.api_baseUrl, endpoint),
             headers=self.api_header,
             verify=False,  # disable ssl verification
+            timeout=self.TIMEOUT,
         )
 
         if res.status_code == 401:
+            sessions.forget(self.login_key)
             raise exceptions.WABizAuthError(
                 "API authentication error.  Please check your configuration."
             )
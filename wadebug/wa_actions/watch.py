@@ -0,0 +1,85 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import time
+
+from wadebug import results
+from wadebug.wa_actions import sessions
+from wadebug.wa_actions.base import run_actions
+
+
+# fields of Result.to_dict() that may differ for the same outcome
+VOLATILE_FIELDS = (
+    results.STATS_FIELDS + results.OPTIONAL_STATS_FIELDS + ("cached",)
+)
+
+
+def run_periodically(
+    actions, config, interval, cycles=None, sleep=time.sleep, on_error=None, **kwargs
+):
+    """Run actions every `interval` seconds, yielding the results of each cycle.
+
+    Each cycle yields a tuple (cycle number, results), with results in the
+    order they finished. Clients and sessions are shared by all cycles (see
+    sessions.reusing). Runs `cycles` times, or until closed when None. An
+    exception raised by a run is passed to on_error when given, and that cycle
+    yields None as its results, otherwise it is raised. Other keyword
+    arguments are passed to run_actions.
+    """
+    cycle = 0
+    with sessions.reusing():
+        while cycles is None or cycle < cycles:
+            started_at = time.monotonic()
+            try:
+                cycle_results = list(run_actions(actions, config, **kwargs))
+            except Exception as e:
+                if on_error is None:
+                    raise
+                on_error(e)
+                cycle_results = None
+            yield cycle, cycle_results
+
+            cycle += 1
+            if cycles is None or cycle < cycles:
+                sleep(max(0, interval - (time.monotonic() - started_at)))
+
+
+def watch_actions(actions, config, interval, cycles=None, sleep=time.sleep, **kwargs):
+    """Run actions every `interval` seconds, yielding the results that changed.
+
+    Each cycle yields a tuple (cycle number, results), where results are the
+    ones that differ from the previous cycle, in the order of `actions`. The
+    first cycle yields every result. VOLATILE_FIELDS, like timings, are not
+    compared. Cycles whose run failed, see on_error of run_periodically, are
+    not yielded and the next one is compared with the last successful run.
+
+    Other arguments are the ones of run_periodically.
+    """
+    previous = {}
+    for cycle, cycle_results in run_periodically(
+        actions, config, interval, cycles, sleep, **kwargs
+    ):
+        if cycle_results is None:
+            continue
+        current = {res.action.user_facing_name: res for res in cycle_results}
+
+        changed = []
+        for act in actions:
+            res = current.get(act.user_facing_name)
+            if res is None:
+                continue
+            comparable = get_comparable_result(res)
+            if previous.get(act.user_facing_name) != comparable:
+                changed.append(res)
+            previous[act.user_facing_name] = comparable
+
+        yield cycle, changed
+
+
+def get_comparable_result(res):
+    """to_dict() of res without the fields that change on every run."""
+    return {k: v for k, v in res.to_dict().items() if k not in VOLATILE_FIELDS}